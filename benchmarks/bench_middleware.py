@@ -0,0 +1,161 @@
+"""
+요청당 관측(로그 + 메트릭) 미들웨어 오버헤드 벤치마크
+
+기존 구성(BaseHTTPMiddleware 기반 함수형 미들웨어 두 개, 동기 FileHandler 로깅)과
+현재 ObservabilityMiddleware를 같은 최소 앱 위에서 비교합니다.
+HTTP 서버를 거치지 않고 ASGI 앱을 직접 호출하므로 미들웨어 자체의 비용만 측정됩니다.
+
+사용법:
+    python -m benchmarks.bench_middleware --requests 20000
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prometheus_client import Counter, Histogram, CollectorRegistry
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from responser.logger import start_log_listener, stop_log_listener
+from responser.observability import ObservabilityMiddleware
+
+async def question(request):
+    return JSONResponse({"success": True, "question_id": int(request.path_params["question_id"])})
+
+def build_app() -> Starlette:
+    return Starlette(routes=[Route("/api/questions/{question_id}", question)])
+
+def build_legacy_app(log_path: str) -> Starlette:
+    """기존 logger.log_request_middleware + metrics.metrics_middleware 구성을 재현합니다."""
+    legacy_logger = logging.getLogger("narat.bench.legacy")
+    legacy_logger.setLevel(logging.INFO)
+    legacy_logger.propagate = False
+    handler = logging.FileHandler(log_path)
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    legacy_logger.addHandler(handler)
+
+    registry = CollectorRegistry()
+    request_count = Counter('legacy_http_requests_total', 'legacy', ['method', 'endpoint', 'status'], registry=registry)
+    request_latency = Histogram('legacy_http_request_duration_seconds', 'legacy', ['method', 'endpoint'], registry=registry)
+
+    app = build_app()
+
+    async def log_request_middleware(request, call_next):
+        start_time = time.time()
+        legacy_logger.info(f"Request: {request.method} {request.url}")
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        legacy_logger.info(
+            f"Response: {request.method} {request.url} - "
+            f"Status: {response.status_code} - "
+            f"Process Time: {process_time:.2f}s"
+        )
+        return response
+
+    async def metrics_middleware(request, call_next):
+        start_time = time.time()
+        response = await call_next(request)
+        duration = time.time() - start_time
+        request_count.labels(method=request.method, endpoint=request.url.path, status=response.status_code).inc()
+        request_latency.labels(method=request.method, endpoint=request.url.path).observe(duration)
+        return response
+
+    app.middleware("http")(log_request_middleware)
+    app.middleware("http")(metrics_middleware)
+    return app
+
+def build_current_app() -> Starlette:
+    app = build_app()
+    app.add_middleware(ObservabilityMiddleware)
+    return app
+
+def make_scope(question_id: int) -> dict:
+    path = f"/api/questions/{question_id}"
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+async def call(app, scope: dict):
+    """요청 본문을 한 번 전달하고, 응답이 끝난 뒤에는 연결 종료를 알리는 서버를 흉내냅니다."""
+    request_sent = False
+    response_done = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await response_done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and not message.get("more_body", False):
+            response_done.set()
+
+    await app(scope, receive, send)
+
+async def run(app, requests: int) -> list:
+    timings = []
+    for i in range(requests):
+        scope = make_scope(i % 1000 + 1)
+        started = time.perf_counter()
+        await call(app, scope)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+def summarize(name: str, timings: list, baseline: float = None) -> float:
+    timings = sorted(timings)
+    mean = statistics.mean(timings) * 1e6
+    p50 = timings[len(timings) // 2] * 1e6
+    p99 = timings[int(len(timings) * 0.99)] * 1e6
+    overhead = f"  overhead {mean - baseline:8.1f}us" if baseline is not None else ""
+    print(f"{name:<10} mean {mean:8.1f}us  p50 {p50:8.1f}us  p99 {p99:8.1f}us{overhead}")
+    return mean
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--warmup", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        start_log_listener()
+        apps = {
+            "bare": build_app(),
+            "before": build_legacy_app(os.path.join(tmp, "legacy.log")),
+            "after": build_current_app(),
+        }
+        loop = asyncio.new_event_loop()
+        results = {}
+        for name, app in apps.items():
+            loop.run_until_complete(run(app, args.warmup))
+            results[name] = loop.run_until_complete(run(app, args.requests))
+        loop.close()
+        stop_log_listener()
+
+    baseline = summarize("bare", results["bare"])
+    summarize("before", results["before"], baseline)
+    summarize("after", results["after"], baseline)
+
+if __name__ == "__main__":
+    main()
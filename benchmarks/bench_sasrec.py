@@ -0,0 +1,170 @@
+"""
+SasRec 추론 마이크로 벤치마크
+
+SasRec.forward (배치 추론)와 SasRecRecommender.recommend (요청 1건 경로: 시퀀스 변환, 추론, 제외 처리, top-k)의
+지연 시간과 처리량을 배치 크기, 시퀀스 길이, 문제 수(num_items), d_model/레이어 수, torch 스레드 수별로 측정합니다.
+CPU 인스턴스 크기를 정하거나 모델 변경이 서빙 비용을 늘리지 않았는지 확인할 때 사용합니다.
+
+사용법:
+    python -m benchmarks.bench_sasrec --batch-sizes 1,16,64 --seq-lengths 10,50 \\
+        --num-items 1200,20000 --d-models 64,128 --layers 2,4 --threads 1,2,4 \\
+        --csv sasrec.csv --json sasrec.json
+"""
+import argparse
+import csv
+import datetime
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+
+from models.sasrec import SasRec, SasRecRecommender
+
+FIELDS = [
+    "target", "threads", "num_items", "d_model", "num_layers", "batch_size", "seq_length",
+    "mean_ms", "p50_ms", "p95_ms", "p99_ms", "calls_per_s", "sequences_per_s"
+]
+
+def int_list(value: str) -> list:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+def random_sequences(batch_size: int, seq_length: int, max_seq_length: int, num_items: int, rng: random.Random) -> torch.Tensor:
+    """길이가 seq_length인 학습 기록을 max_seq_length에 맞춰 앞쪽을 0으로 채운 입력을 만듭니다."""
+    rows = []
+    for _ in range(batch_size):
+        items = [rng.randint(1, num_items) for _ in range(seq_length)]
+        rows.append([0] * (max_seq_length - seq_length) + items)
+    return torch.tensor(rows, dtype=torch.long)
+
+def measure(fn, warmup: int, repeat: int) -> list:
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+def summarize(timings: list, batch_size: int) -> dict:
+    timings = sorted(timings)
+    mean = sum(timings) / len(timings)
+    return {
+        "mean_ms": round(mean * 1000, 3),
+        "p50_ms": round(timings[len(timings) // 2] * 1000, 3),
+        "p95_ms": round(timings[min(int(len(timings) * 0.95), len(timings) - 1)] * 1000, 3),
+        "p99_ms": round(timings[min(int(len(timings) * 0.99), len(timings) - 1)] * 1000, 3),
+        "calls_per_s": round(1 / mean, 1),
+        "sequences_per_s": round(batch_size / mean, 1),
+    }
+
+def bench_forward(model: SasRec, input_seq: torch.Tensor, warmup: int, repeat: int) -> list:
+    with torch.no_grad():
+        return measure(lambda: model(input_seq), warmup, repeat)
+
+def bench_recommend(recommender: SasRecRecommender, sequence: list, top_k: int, warmup: int, repeat: int) -> list:
+    return measure(lambda: recommender.recommend(sequence, top_k=top_k), warmup, repeat)
+
+def run(args) -> list:
+    rng = random.Random(args.seed)
+    torch.manual_seed(args.seed)
+    rows = []
+
+    for threads, num_items, d_model, num_layers in itertools.product(args.threads, args.num_items, args.d_models, args.layers):
+        torch.set_num_threads(threads)
+        recommender = SasRecRecommender(
+            num_items=num_items,
+            max_seq_length=args.max_seq_length,
+            d_model=d_model,
+            nhead=args.nhead,
+            num_layers=num_layers,
+            device=args.device
+        )
+        model = recommender.model
+        model.eval()
+        config = {"threads": threads, "num_items": num_items, "d_model": d_model, "num_layers": num_layers}
+
+        for seq_length in args.seq_lengths:
+            seq_length = min(seq_length, args.max_seq_length)
+
+            for batch_size in args.batch_sizes:
+                input_seq = random_sequences(batch_size, seq_length, args.max_seq_length, num_items, rng).to(args.device)
+                timings = bench_forward(model, input_seq, args.warmup, args.repeat)
+                rows.append({"target": "forward", **config, "batch_size": batch_size, "seq_length": seq_length, **summarize(timings, batch_size)})
+                print_row(rows[-1])
+
+            sequence = [rng.randint(1, num_items) for _ in range(seq_length)]
+            timings = bench_recommend(recommender, sequence, args.top_k, args.warmup, args.repeat)
+            rows.append({"target": "recommend", **config, "batch_size": 1, "seq_length": seq_length, **summarize(timings, 1)})
+            print_row(rows[-1])
+
+    return rows
+
+def print_header():
+    print(
+        f"{'target':<10} {'thr':>3} {'items':>7} {'d':>4} {'L':>2} {'batch':>5} {'seq':>4} "
+        f"{'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'seq/s':>10}"
+    )
+
+def print_row(row: dict):
+    print(
+        f"{row['target']:<10} {row['threads']:>3} {row['num_items']:>7} {row['d_model']:>4} {row['num_layers']:>2} "
+        f"{row['batch_size']:>5} {row['seq_length']:>4} {row['mean_ms']:>7.3f}ms {row['p50_ms']:>7.3f}ms "
+        f"{row['p95_ms']:>7.3f}ms {row['p99_ms']:>7.3f}ms {row['sequences_per_s']:>10.1f}"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", type=int_list, default=[1, 16])
+    parser.add_argument("--seq-lengths", type=int_list, default=[10, 50], help="max-seq-length보다 길면 잘립니다")
+    parser.add_argument("--max-seq-length", type=int, default=50)
+    parser.add_argument("--num-items", type=int_list, default=[1200, 20000])
+    parser.add_argument("--d-models", type=int_list, default=[64])
+    parser.add_argument("--layers", type=int_list, default=[2])
+    parser.add_argument("--nhead", type=int, default=4)
+    parser.add_argument("--threads", type=int_list, default=[1, torch.get_num_threads()])
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--csv", help="결과를 저장할 CSV 파일")
+    parser.add_argument("--json", help="결과와 실행 환경을 저장할 JSON 파일")
+    args = parser.parse_args()
+    args.threads = sorted(set(args.threads))
+
+    print_header()
+    rows = run(args)
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "meta": {
+                    "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                    "torch": torch.__version__,
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "cpu_count": os.cpu_count(),
+                    "device": args.device,
+                    "max_seq_length": args.max_seq_length,
+                    "warmup": args.warmup,
+                    "repeat": args.repeat,
+                },
+                "results": rows
+            }, f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+대규모 합성 학습 데이터 생성기
+
+수십만 명의 사용자와 세션, 사용자별 시간순 학습 기록(userlogs) 수백만 건을 만들어
+PostgreSQL COPY로 여러 프로세스에서 병렬 적재합니다. --csv-dir를 주면 DB 대신 CSV 파일로 씁니다.
+
+- 사용자 활동량은 멱법칙(파레토) 분포를 따릅니다 (--activity-alpha가 작을수록 소수 사용자에 집중)
+- 문제 선택은 카테고리/난이도 가중치로 치우치게 할 수 있습니다
+- 정답 확률은 난이도별 기본 정답률에 사용자 실력 편차를 더해 정합니다
+- 풀이 시간(delaytime)은 난이도가 높을수록 길어지는 로그정규 분포입니다
+
+문제 데이터가 없으면 problem_database_fin.csv에서 먼저 적재합니다. 생성한 사용자의 google_id는 --prefix로 시작하며,
+--replace를 주면 같은 접두어의 기존 데이터를 지우고 새로 만듭니다.
+
+사용법:
+    python -m benchmarks.datagen --users 200000 --logs 5000000 --workers 8 --replace
+    python -m benchmarks.datagen --users 1000 --logs 50000 --csv-dir /tmp/narat-data
+"""
+import argparse
+import datetime
+import io
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from database import SQLALCHEMY_DATABASE_URL, SessionLocal, engine
+from models.models import (
+    Base, QuestionDB, RecommendationQuestionsDB, RecommendationsDB, ReviewBackfillDB, ReviewStateDB
+)
+from benchmarks.seed import seed_catalog
+
+USER_COLUMNS = ["google_id", "email", "display_name", "study_level", "created_at", "last_login"]
+SESSION_COLUMNS = ["session_id", "google_id", "created_at"]
+LOG_COLUMNS = ["google_id", "question_id", "correct", "delaytime", "created_at"]
+
+def weight_map(value: str) -> dict:
+    """"1=0.85,2=0.7" 형식의 문자열을 {정수: 실수} 딕셔너리로 바꿉니다."""
+    result = {}
+    for part in value.split(","):
+        key, _, weight = part.partition("=")
+        result[int(key)] = float(weight)
+    return result
+
+def activity_counts(users: int, logs: int, alpha: float, max_logs: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    사용자별 학습 기록 수를 파레토 분포로 뽑고 합계가 logs에 가깝도록 맞춥니다.
+    한 사용자의 기록 수는 max_logs를 넘지 않습니다.
+    """
+    weights = rng.pareto(alpha, users) + 1
+    counts = np.minimum(np.floor(weights / weights.sum() * logs), max_logs).astype(np.int64)
+    # 잘린 만큼은 활동량이 큰 순서대로 한도 안에서 다시 나눠줍니다
+    shortfall = logs - int(counts.sum())
+    for index in np.argsort(-weights):
+        if shortfall <= 0:
+            break
+        extra = min(max_logs - counts[index], shortfall)
+        counts[index] += extra
+        shortfall -= extra
+    return counts
+
+def question_probabilities(categories: np.ndarray, difficulties: np.ndarray, category_weights: dict, difficulty_weights: dict) -> np.ndarray:
+    """문제별 선택 확률. 각 카테고리/난이도의 전체 비중이 주어진 가중치를 따르도록 문제 수로 나눕니다."""
+    weights = np.zeros(len(categories))
+    for category in np.unique(categories):
+        for difficulty in np.unique(difficulties):
+            mask = (categories == category) & (difficulties == difficulty)
+            if mask.any():
+                weights[mask] = (
+                    category_weights.get(int(category), 1.0) * difficulty_weights.get(int(difficulty), 1.0) / mask.sum()
+                )
+    return weights / weights.sum()
+
+def csv_field(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, str) and any(c in value for c in ',"\n'):
+        return '"' + value.replace('"', '""') + '"'
+    return str(value)
+
+def csv_rows(rows) -> io.StringIO:
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(",".join(csv_field(value) for value in row))
+        buffer.write("\n")
+    buffer.seek(0)
+    return buffer
+
+# 워커 프로세스에서 공유하는 설정 (initializer에서 채웁니다)
+_config = None
+
+def init_worker(config: dict):
+    global _config
+    _config = config
+
+def generate_chunk(start: int, counts: np.ndarray, seed: int):
+    """start번째 사용자부터 len(counts)명의 사용자, 세션, 학습 기록 행을 만듭니다."""
+    config = _config
+    rng = np.random.default_rng(seed)
+    now = config["now"]
+    span = config["days"] * 86400.0
+    prefix = config["prefix"]
+
+    question_ids = config["question_ids"]
+    difficulties = config["difficulties"]
+    probabilities = config["probabilities"]
+    base_accuracy = config["base_accuracy"]
+    delay_median = config["delay_median"]
+
+    users, sessions, logs = [], [], []
+    for offset, count in enumerate(counts):
+        index = start + offset
+        google_id = f"{prefix}{index}"
+        first_seen = now - datetime.timedelta(seconds=float(rng.uniform(0, span)))
+        window = (now - first_seen).total_seconds()
+
+        skill = rng.normal(0, config["skill_sigma"])
+        speed = rng.lognormal(0, 0.3)
+        times = np.sort(rng.uniform(0, window, count))
+        picks = rng.choice(len(question_ids), size=count, p=probabilities)
+        accuracy = np.clip(base_accuracy[picks] + skill, 0.02, 0.98)
+        correct = rng.random(count) < accuracy
+        delays = rng.lognormal(np.log(delay_median[picks] * speed), config["delay_sigma"])
+
+        last_login = first_seen + datetime.timedelta(seconds=float(times[-1])) if count else first_seen
+        users.append((google_id, f"{google_id}@synthetic.local", f"synthetic {index}", "B", first_seen.isoformat(), last_login.isoformat()))
+        sessions.append((f"{prefix}session-{index}", google_id, last_login.isoformat()))
+        for position in range(count):
+            logs.append((
+                google_id,
+                int(question_ids[picks[position]]),
+                "true" if correct[position] else "false",
+                round(float(delays[position]), 2),
+                (first_seen + datetime.timedelta(seconds=float(times[position]))).isoformat()
+            ))
+    return users, sessions, logs
+
+def write_chunk(args) -> int:
+    """한 덩어리를 만들어 COPY(또는 CSV 파일)로 씁니다. 쓴 학습 기록 수를 반환합니다."""
+    chunk_index, start, counts, seed = args
+    users, sessions, logs = generate_chunk(start, counts, seed)
+
+    if _config["csv_dir"]:
+        for name, rows in (("users", users), ("sessions", sessions), ("userlogs", logs)):
+            path = os.path.join(_config["csv_dir"], f"{name}.{chunk_index:05d}.csv")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(csv_rows(rows).getvalue())
+        return len(logs)
+
+    worker_engine = create_engine(SQLALCHEMY_DATABASE_URL, poolclass=NullPool)
+    connection = worker_engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        # 사용자와 세션이 먼저 있어야 외래 키가 맞으므로 한 트랜잭션 안에서 순서대로 씁니다
+        for table, columns, rows in (
+            ("users", USER_COLUMNS, users),
+            ("sessions", SESSION_COLUMNS, sessions),
+            ("userlogs", LOG_COLUMNS, logs)
+        ):
+            cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", csv_rows(rows))
+        connection.commit()
+    finally:
+        connection.close()
+        worker_engine.dispose()
+    return len(logs)
+
+def delete_existing(prefix: str):
+    with engine.begin() as conn:
+        params = {"pattern": f"{prefix}%"}
+        conn.execute(text(
+            f"DELETE FROM {RecommendationQuestionsDB.__tablename__} WHERE rec_id IN "
+            f"(SELECT rec_id FROM {RecommendationsDB.__tablename__} WHERE google_id LIKE :pattern)"
+        ), params)
+        tables = (
+            RecommendationsDB.__tablename__, "userlogs", ReviewStateDB.__tablename__, ReviewBackfillDB.__tablename__,
+            "sessions", "users"
+        )
+        for table in tables:
+            conn.execute(text(f"DELETE FROM {table} WHERE google_id LIKE :pattern"), params)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200000)
+    parser.add_argument("--logs", type=int, default=5000000, help="전체 학습 기록 수 (근사값)")
+    parser.add_argument("--max-logs-per-user", type=int, default=20000)
+    parser.add_argument("--activity-alpha", type=float, default=1.2, help="활동량 파레토 분포의 형상 모수")
+    parser.add_argument("--category-weights", type=weight_map, default=weight_map("0=0.6,1=0.25,2=0.15"))
+    parser.add_argument("--difficulty-weights", type=weight_map, default=weight_map("1=0.15,2=0.3,3=0.3,4=0.2,5=0.05"))
+    parser.add_argument("--accuracy", type=weight_map, default=weight_map("1=0.9,2=0.8,3=0.65,4=0.5,5=0.35"),
+                        help="난이도별 기본 정답률")
+    parser.add_argument("--skill-sigma", type=float, default=0.1, help="사용자 실력 편차 (정답률에 더해짐)")
+    parser.add_argument("--delay-median", type=float, default=4.0, help="난이도 1 문제의 풀이 시간 중앙값 (초)")
+    parser.add_argument("--delay-step", type=float, default=0.25, help="난이도가 1 오를 때마다 늘어나는 중앙값 비율")
+    parser.add_argument("--delay-sigma", type=float, default=0.5, help="풀이 시간 로그정규 분포의 sigma")
+    parser.add_argument("--days", type=float, default=180, help="기록이 분포할 기간 (일)")
+    parser.add_argument("--prefix", default="synthetic-user-")
+    parser.add_argument("--chunk-users", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--replace", action="store_true", help="같은 접두어로 만든 기존 데이터를 먼저 지웁니다")
+    parser.add_argument("--csv-dir", help="DB 대신 CSV 파일로 씁니다")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed_catalog(db)
+        questions = db.query(QuestionDB.question_id, QuestionDB.category_id, QuestionDB.difficulty_level).order_by(QuestionDB.question_id).all()
+    finally:
+        db.close()
+
+    question_ids = np.array([row.question_id for row in questions])
+    categories = np.array([row.category_id for row in questions])
+    difficulties = np.array([row.difficulty_level for row in questions])
+
+    rng = np.random.default_rng(args.seed)
+    counts = activity_counts(args.users, args.logs, args.activity_alpha, args.max_logs_per_user, rng)
+
+    config = {
+        "now": datetime.datetime.now(datetime.timezone.utc),
+        "days": args.days,
+        "prefix": args.prefix,
+        "skill_sigma": args.skill_sigma,
+        "delay_sigma": args.delay_sigma,
+        "question_ids": question_ids,
+        "difficulties": difficulties,
+        "probabilities": question_probabilities(categories, difficulties, args.category_weights, args.difficulty_weights),
+        "base_accuracy": np.array([args.accuracy.get(int(d), 0.6) for d in difficulties]),
+        "delay_median": args.delay_median * (1 + args.delay_step * (difficulties - 1)),
+        "csv_dir": args.csv_dir,
+    }
+
+    if args.csv_dir:
+        os.makedirs(args.csv_dir, exist_ok=True)
+    elif args.replace:
+        delete_existing(args.prefix)
+
+    chunks = [
+        (chunk_index, start, counts[start:start + args.chunk_users], args.seed + 1 + chunk_index)
+        for chunk_index, start in enumerate(range(0, args.users, args.chunk_users))
+    ]
+
+    started = time.perf_counter()
+    written = 0
+    with multiprocessing.Pool(args.workers, initializer=init_worker, initargs=(config,)) as pool:
+        for done, logs in enumerate(pool.imap_unordered(write_chunk, chunks), 1):
+            written += logs
+            elapsed = time.perf_counter() - started
+            print(f"\r{done}/{len(chunks)} chunks, {written} logs ({written / elapsed:,.0f} logs/s)", end="", flush=True)
+    print()
+
+    if not args.csv_dir:
+        with engine.connect() as conn:
+            conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+            for table in ("users", "sessions", "userlogs"):
+                conn.execute(text(f"ANALYZE {table}"))
+
+    print(f"사용자 {args.users}명, 학습 기록 {written}개를 {time.perf_counter() - started:.1f}초 동안 만들었습니다.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Google 서명 인증서 대역 서버
+
+로그인(/api/auth/google)을 실제 Google 없이 테스트/부하 측정할 수 있도록
+Google 인증서 엔드포인트와 같은 형식({kid: x509 PEM})으로 인증서를 제공하고, 같은 키로 ID 토큰을 발급합니다.
+키와 인증서는 --key-dir에 저장되므로 serve와 mint를 따로 실행해도 같은 키를 사용합니다.
+
+사용법:
+    python -m benchmarks.google_certs_stub serve --port 8900 --max-age 3600
+    GOOGLE_CERTS_URL=http://127.0.0.1:8900/certs GOOGLE_CLIENT_ID=bench-client uvicorn main:app
+    python -m benchmarks.google_certs_stub mint --email user@bench.local --audience bench-client
+"""
+import argparse
+import datetime
+import json
+import os
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from google.auth import crypt, jwt
+
+KEY_ID = "bench-key"
+DEFAULT_KEY_DIR = "/tmp/narat-google-stub"
+
+def load_or_create_key(key_dir: str):
+    """RSA 키와 자체 서명 인증서를 key_dir에서 읽고, 없으면 만듭니다. (키 PEM, 인증서 PEM)을 반환합니다."""
+    key_path = os.path.join(key_dir, "key.pem")
+    cert_path = os.path.join(key_dir, "cert.pem")
+    if os.path.exists(key_path) and os.path.exists(cert_path):
+        with open(key_path, "rb") as f, open(cert_path, "rb") as g:
+            return f.read(), g.read()
+
+    os.makedirs(key_dir, exist_ok=True)
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "narat-bench")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=365))
+        .sign(key, hashes.SHA256())
+    )
+    key_pem = key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    cert_pem = cert.public_bytes(serialization.Encoding.PEM)
+    with open(key_path, "wb") as f:
+        f.write(key_pem)
+    with open(cert_path, "wb") as f:
+        f.write(cert_pem)
+    return key_pem, cert_pem
+
+def mint_token(key_dir: str, email: str, name: str, audience: str, lifetime: int = 3600) -> str:
+    """대역 키로 서명한 Google 형식 ID 토큰을 만듭니다."""
+    key_pem, _ = load_or_create_key(key_dir)
+    signer = crypt.RSASigner.from_string(key_pem, key_id=KEY_ID)
+    now = int(time.time())
+    payload = {
+        "iss": "https://accounts.google.com",
+        "aud": audience,
+        "sub": email,
+        "email": email,
+        "name": name,
+        "iat": now,
+        "exp": now + lifetime
+    }
+    return jwt.encode(signer, payload).decode("ascii")
+
+def serve(key_dir: str, host: str, port: int, max_age: int):
+    _, cert_pem = load_or_create_key(key_dir)
+    body = json.dumps({KEY_ID: cert_pem.decode("ascii")}).encode("utf-8")
+    requests_served = [0]
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/certs":
+                self.send_error(404)
+                return
+            requests_served[0] += 1
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=UTF-8")
+            self.send_header("Cache-Control", f"public, max-age={max_age}, must-revalidate, no-transform")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            print(f"certs request #{requests_served[0]}: {format % args}", flush=True)
+
+    print(f"serving http://{host}:{port}/certs (max-age={max_age})", flush=True)
+    ThreadingHTTPServer((host, port), Handler).serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--key-dir", default=DEFAULT_KEY_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="인증서 엔드포인트 실행")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8900)
+    serve_parser.add_argument("--max-age", type=int, default=3600, help="Cache-Control max-age (초)")
+
+    mint_parser = commands.add_parser("mint", help="ID 토큰 발급")
+    mint_parser.add_argument("--email", required=True)
+    mint_parser.add_argument("--name", default="bench user")
+    mint_parser.add_argument("--audience", required=True, help="GOOGLE_CLIENT_ID와 같은 값")
+    mint_parser.add_argument("--lifetime", type=int, default=3600)
+
+    args = parser.parse_args()
+    if args.command == "serve":
+        serve(args.key_dir, args.host, args.port, args.max_age)
+    else:
+        print(mint_token(args.key_dir, args.email, args.name, args.audience, args.lifetime))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""
+엔드포인트 부하 테스트
+
+실행 중인 API 서버에 실제 사용 패턴과 비슷한 요청 조합(문제 조회, 풀이 제출, 통계, 추천 생성/조회)을
+여러 스레드로 보내고, 엔드포인트별 p50/p95/p99 지연 시간과 RPS, 오류율을 출력합니다.
+결과는 JSON으로 저장할 수 있으며, 저장된 기준 결과(baseline)와 비교해 성능 저하를 표시합니다.
+
+먼저 benchmarks.seed로 합성 사용자를 만들어 두어야 합니다 (--users 값을 같게 맞춥니다).
+
+사용법:
+    python -m benchmarks.loadtest --base-url http://localhost:8000 --concurrency 32 --duration 60 \\
+        --output bench-result.json --baseline benchmarks/baseline.json
+    python -m benchmarks.loadtest --mix submit=6,question=3,stats=1
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from benchmarks.seed import bench_session_token
+
+# 시나리오별 기본 가중치. 실제 트래픽처럼 문제 조회와 풀이 제출이 대부분을 차지합니다
+DEFAULT_MIX = {
+    "question_list": 3,
+    "question_detail": 4,
+    "question_random": 2,
+    "submit": 6,
+    "stats": 1,
+    "recommendation": 1,
+}
+
+class Recorder:
+    """엔드포인트별 지연 시간과 오류 수를 모읍니다. 여러 스레드에서 함께 사용합니다."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.recording = False
+
+    def add(self, endpoint: str, seconds: float, ok: bool):
+        if not self.recording:
+            return
+        with self.lock:
+            self.latencies[endpoint].append(seconds)
+            if not ok:
+                self.errors[endpoint] += 1
+
+class Client:
+    """스레드 하나가 쓰는 HTTP 클라이언트 (keep-alive 연결 재사용)"""
+    def __init__(self, base_url: str, recorder: Recorder, timeout: float):
+        self.base_url = base_url.rstrip("/")
+        self.recorder = recorder
+        self.timeout = timeout
+        self.http = requests.Session()
+
+    def request(self, endpoint: str, method: str, path: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = self.http.request(method, self.base_url + path, timeout=self.timeout, **kwargs)
+        except requests.RequestException:
+            self.recorder.add(endpoint, time.perf_counter() - started, False)
+            return None
+        self.recorder.add(endpoint, time.perf_counter() - started, response.status_code < 400)
+        return response
+
+def scenario_question_list(client: Client, ctx: dict, rng: random.Random):
+    params = {"limit": 20, "offset": rng.randrange(0, max(ctx["questions"] - 20, 1), 20)}
+    if rng.random() < 0.5:
+        params["category_id"] = rng.randint(0, 2)
+    client.request("GET /api/questions/", "GET", "/api/questions/", params=params)
+
+def scenario_question_detail(client: Client, ctx: dict, rng: random.Random):
+    client.request("GET /api/questions/{question_id}", "GET", f"/api/questions/{rng.choice(ctx['question_ids'])}")
+
+def scenario_question_random(client: Client, ctx: dict, rng: random.Random):
+    client.request("GET /api/questions/random", "GET", "/api/questions/random")
+
+def scenario_submit(client: Client, ctx: dict, rng: random.Random):
+    client.request("POST /api/study/submit", "POST", "/api/study/submit", json={
+        "session_token": bench_session_token(rng.randrange(ctx["users"])),
+        "question_id": rng.choice(ctx["question_ids"]),
+        "correct": rng.random() < 0.7,
+        "delaytime": round(rng.expovariate(1 / 4.0), 2)
+    })
+
+def scenario_submit_batch(client: Client, ctx: dict, rng: random.Random):
+    """퀴즈 한 번(문제 20개)의 결과를 한 요청으로 제출합니다."""
+    client.request("POST /api/study/submit-batch", "POST", "/api/study/submit-batch", json={
+        "session_token": bench_session_token(rng.randrange(ctx["users"])),
+        "answers": [
+            {
+                "question_id": rng.choice(ctx["question_ids"]),
+                "correct": rng.random() < 0.7,
+                "delaytime": round(rng.expovariate(1 / 4.0), 2)
+            }
+            for _ in range(20)
+        ]
+    })
+
+def scenario_stats(client: Client, ctx: dict, rng: random.Random):
+    client.request("POST /api/study/stats", "POST", "/api/study/stats", json={
+        "session_token": bench_session_token(rng.randrange(ctx["users"]))
+    })
+
+def scenario_recommendation(client: Client, ctx: dict, rng: random.Random):
+    """추천 생성 후 결과 조회, 이미 계산된 결과 재조회까지 한 흐름으로 실행합니다."""
+    response = client.request("POST /api/recommendations/", "POST", "/api/recommendations/", json={
+        "session_token": bench_session_token(rng.randrange(ctx["users"]))
+    })
+    if response is None or response.status_code != 200:
+        return
+    rec_id = response.json()["rec_id"]
+    client.request("POST /api/recommendations/success", "POST", "/api/recommendations/success", json={"rec_id": rec_id})
+    client.request("POST /api/recommendations/success (cached)", "POST", "/api/recommendations/success", json={"rec_id": rec_id})
+
+SCENARIOS = {
+    "question_list": scenario_question_list,
+    "question_detail": scenario_question_detail,
+    "question_random": scenario_question_random,
+    "submit": scenario_submit,
+    "submit_batch": scenario_submit_batch,
+    "stats": scenario_stats,
+    "recommendation": scenario_recommendation,
+}
+
+def parse_mix(value: str) -> dict:
+    """"submit=6,question_detail=3" 형식의 문자열을 가중치 딕셔너리로 바꿉니다."""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"unknown scenario: {name} (choose from {', '.join(SCENARIOS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+def load_context(base_url: str, users: int) -> dict:
+    """서버에서 문제 ID 목록을 받아 시나리오가 공유할 정보를 만듭니다."""
+    question_ids = []
+    offset = 0
+    while True:
+        response = requests.get(f"{base_url.rstrip('/')}/api/questions/", params={"limit": 50, "offset": offset}, timeout=30)
+        response.raise_for_status()
+        body = response.json()
+        question_ids.extend(question["question_id"] for question in body["questions"])
+        offset += 50
+        if offset >= body["total"]:
+            break
+    if not question_ids:
+        raise SystemExit("문제가 없습니다. 먼저 python -m benchmarks.seed 를 실행하세요.")
+    return {"users": users, "question_ids": question_ids, "questions": len(question_ids)}
+
+def worker(client: Client, ctx: dict, mix: dict, deadline: float, seed: int):
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    while time.perf_counter() < deadline:
+        SCENARIOS[rng.choices(names, weights)[0]](client, ctx, rng)
+
+def percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(len(sorted_values) * q), len(sorted_values) - 1)
+    return sorted_values[index]
+
+def summarize(recorder: Recorder, elapsed: float) -> dict:
+    endpoints = {}
+    for endpoint, values in sorted(recorder.latencies.items()):
+        values = sorted(values)
+        endpoints[endpoint] = {
+            "requests": len(values),
+            "errors": recorder.errors[endpoint],
+            "error_rate": round(recorder.errors[endpoint] / len(values), 4),
+            "rps": round(len(values) / elapsed, 2),
+            "p50_ms": round(percentile(values, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(values, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(values, 0.99) * 1000, 2),
+        }
+    total = sum(item["requests"] for item in endpoints.values())
+    return {
+        "total": {
+            "requests": total,
+            "errors": sum(item["errors"] for item in endpoints.values()),
+            "rps": round(total / elapsed, 2)
+        },
+        "endpoints": endpoints
+    }
+
+def compare(result: dict, baseline: dict, threshold: float) -> list:
+    """
+    기준 결과와 비교해 p95가 threshold% 넘게 늘었거나 RPS가 threshold% 넘게 줄어든 엔드포인트를 반환합니다.
+    """
+    regressions = []
+    for endpoint, current in result["endpoints"].items():
+        previous = baseline["endpoints"].get(endpoint)
+        if previous is None:
+            continue
+        if previous["p95_ms"] > 0:
+            change = (current["p95_ms"] - previous["p95_ms"]) / previous["p95_ms"] * 100
+            if change > threshold:
+                regressions.append(f"{endpoint}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms (+{change:.1f}%)")
+        if previous["rps"] > 0:
+            change = (current["rps"] - previous["rps"]) / previous["rps"] * 100
+            if change < -threshold:
+                regressions.append(f"{endpoint}: rps {previous['rps']} -> {current['rps']} ({change:.1f}%)")
+    return regressions
+
+def print_report(result: dict, baseline: dict = None):
+    print(f"{'endpoint':<45} {'reqs':>7} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'err%':>6}  {'p95 vs base':>11}")
+    for endpoint, item in result["endpoints"].items():
+        delta = ""
+        previous = baseline["endpoints"].get(endpoint) if baseline else None
+        if previous and previous["p95_ms"] > 0:
+            delta = f"{(item['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100:+.1f}%"
+        print(
+            f"{endpoint:<45} {item['requests']:>7} {item['rps']:>8.1f} {item['p50_ms']:>8.1f} "
+            f"{item['p95_ms']:>8.1f} {item['p99_ms']:>8.1f} {item['error_rate'] * 100:>6.2f}  {delta:>11}"
+        )
+    total = result["total"]
+    print(f"{'total':<45} {total['requests']:>7} {total['rps']:>8.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=os.environ.get("BENCH_BASE_URL", "http://localhost:8000"))
+    parser.add_argument("--users", type=int, default=500, help="benchmarks.seed로 만든 합성 사용자 수")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="측정 시간 (초)")
+    parser.add_argument("--warmup", type=float, default=5.0, help="측정 전 예열 시간 (초)")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="시나리오 가중치 (예: submit=6,stats=1)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일")
+    parser.add_argument("--baseline", help="비교할 기준 결과 JSON 파일")
+    parser.add_argument("--threshold", type=float, default=10.0, help="성능 저하로 판단할 변화율 (%%)")
+    args = parser.parse_args()
+
+    ctx = load_context(args.base_url, args.users)
+    recorder = Recorder()
+
+    warmup_end = time.perf_counter() + args.warmup
+    deadline = warmup_end + args.duration
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(Client(args.base_url, recorder, args.timeout), ctx, args.mix, deadline, args.seed + i),
+            daemon=True
+        )
+        for i in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+
+    time.sleep(max(warmup_end - time.perf_counter(), 0))
+    recorder.recording = True
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    result = summarize(recorder, elapsed)
+    result["meta"] = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "base_url": args.base_url,
+        "concurrency": args.concurrency,
+        "duration": round(elapsed, 2),
+        "users": args.users,
+        "mix": args.mix,
+    }
+
+    baseline = None
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print_report(result, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+    if baseline is not None:
+        regressions = compare(result, baseline, args.threshold)
+        if regressions:
+            print(f"\n기준 대비 {args.threshold}% 넘게 느려진 엔드포인트:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\n기준 대비 {args.threshold}% 넘는 성능 저하 없음")
+
+if __name__ == "__main__":
+    main()
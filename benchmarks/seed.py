@@ -0,0 +1,159 @@
+"""
+부하 테스트용 데이터 시드
+
+problem_database_fin.csv의 문제와 카테고리를 적재하고, 합성 사용자/세션/학습 기록을 만듭니다.
+대상 DB는 database.py와 같은 설정(DATABASE_URL 또는 DB_*)을 따릅니다.
+합성 사용자는 google_id가 "bench-user-"로 시작하며, 다시 실행하면 기존 합성 데이터를 지우고 새로 만듭니다.
+세션 토큰은 "bench-session-{번호}" 형식이라 loadtest가 --users 값만으로 재구성할 수 있습니다.
+
+사용법:
+    python -m benchmarks.seed --users 500 --max-logs 120
+"""
+import argparse
+import csv
+import datetime
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SessionLocal, engine
+from models.models import (
+    Base, CategoryDB, QuestionDB, RecommendationQuestionsDB, RecommendationsDB, ReviewBackfillDB, ReviewStateDB,
+    SessionDB, UserDB, UserLogDB
+)
+
+CSV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "problem_database_fin.csv")
+USER_PREFIX = "bench-user-"
+SESSION_PREFIX = "bench-session-"
+
+CATEGORIES = {
+    0: "문법적으로 틀린 단어/구절",
+    1: "용례가 다른 단어/구절",
+    2: "띄어쓰기 문제"
+}
+
+def bench_user_id(index: int) -> str:
+    return f"{USER_PREFIX}{index}"
+
+def bench_session_token(index: int) -> str:
+    return f"{SESSION_PREFIX}{index}"
+
+def seed_catalog(db) -> int:
+    """문제 테이블이 비어 있으면 CSV에서 카테고리와 문제를 적재합니다. 문제 수를 반환합니다."""
+    count = db.query(QuestionDB).count()
+    if count > 0:
+        return count
+
+    for category_id, description in CATEGORIES.items():
+        if db.query(CategoryDB).filter(CategoryDB.category_id == category_id).first() is None:
+            db.add(CategoryDB(category_id=category_id, name=f"Category {category_id}", description=description))
+    db.commit()
+
+    with open(CSV_PATH, encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    db.bulk_insert_mappings(QuestionDB, [
+        {
+            "question_id": int(row["item_id"]),
+            "category_id": int(row["category"]),
+            "wrong_sentence": row["Wrong_S"].strip('" '),
+            "right_sentence": row["Right_S"].strip('" '),
+            "wrong_word": row["Wrong_W"].strip('" '),
+            "right_word": row["Right_W"].strip('" '),
+            "location": row["loc"].strip('" '),
+            "difficulty_level": int(row["difficulty"]),
+            "explanation": row["reason"],
+            "daily_stats": {}
+        }
+        for row in rows
+    ])
+    db.commit()
+    return len(rows)
+
+def clear_bench_users(db):
+    """이전에 만든 합성 사용자와 그 사용자의 세션/기록/추천/복습 일정을 지웁니다."""
+    bench_users = db.query(UserDB.google_id).filter(UserDB.google_id.like(f"{USER_PREFIX}%"))
+    bench_recs = db.query(RecommendationsDB.rec_id).filter(RecommendationsDB.google_id.in_(bench_users))
+    db.query(RecommendationQuestionsDB).filter(
+        RecommendationQuestionsDB.rec_id.in_(bench_recs)
+    ).delete(synchronize_session=False)
+    db.query(RecommendationsDB).filter(RecommendationsDB.google_id.in_(bench_users)).delete(synchronize_session=False)
+    db.query(UserLogDB).filter(UserLogDB.google_id.in_(bench_users)).delete(synchronize_session=False)
+    db.query(ReviewStateDB).filter(ReviewStateDB.google_id.in_(bench_users)).delete(synchronize_session=False)
+    db.query(ReviewBackfillDB).filter(ReviewBackfillDB.google_id.in_(bench_users)).delete(synchronize_session=False)
+    db.query(SessionDB).filter(SessionDB.google_id.in_(bench_users)).delete(synchronize_session=False)
+    db.query(UserDB).filter(UserDB.google_id.like(f"{USER_PREFIX}%")).delete(synchronize_session=False)
+    db.commit()
+
+def seed_users(db, users: int, max_logs: int, question_ids: list, rng: random.Random) -> int:
+    """
+    합성 사용자와 세션, 학습 기록을 만듭니다. 만든 학습 기록 수를 반환합니다.
+    기록 수는 0 ~ max_logs 사이에서 고르게 뽑아, 30개 미만/이상 추천 경로가 모두 섞이도록 합니다.
+    """
+    now = datetime.datetime.now(datetime.timezone.utc)
+    db.bulk_insert_mappings(UserDB, [
+        {
+            "google_id": bench_user_id(i),
+            "email": f"{bench_user_id(i)}@bench.local",
+            "display_name": f"bench {i}",
+            "study_level": "B"
+        }
+        for i in range(users)
+    ])
+    db.bulk_insert_mappings(SessionDB, [
+        {"session_id": bench_session_token(i), "google_id": bench_user_id(i)}
+        for i in range(users)
+    ])
+    db.commit()
+
+    total = 0
+    batch = []
+    for i in range(users):
+        log_count = rng.randint(0, max_logs)
+        # 사용자마다 정답률과 풀이 시간 성향을 다르게 둡니다
+        accuracy = rng.uniform(0.3, 0.95)
+        speed = rng.uniform(1.5, 8.0)
+        started = now - datetime.timedelta(days=rng.randint(1, 60))
+        for j in range(log_count):
+            batch.append({
+                "google_id": bench_user_id(i),
+                "question_id": rng.choice(question_ids),
+                "correct": rng.random() < accuracy,
+                "delaytime": round(rng.expovariate(1 / speed), 2),
+                "created_at": started + datetime.timedelta(minutes=j * rng.randint(1, 30))
+            })
+        if len(batch) >= 10000:
+            db.bulk_insert_mappings(UserLogDB, batch)
+            db.commit()
+            total += len(batch)
+            batch = []
+    if batch:
+        db.bulk_insert_mappings(UserLogDB, batch)
+        db.commit()
+        total += len(batch)
+    return total
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--max-logs", type=int, default=120, help="사용자당 최대 학습 기록 수")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(args.seed)
+
+    db = SessionLocal()
+    try:
+        questions = seed_catalog(db)
+        question_ids = [row.question_id for row in db.query(QuestionDB.question_id)]
+        clear_bench_users(db)
+        logs = seed_users(db, args.users, args.max_logs, question_ids, rng)
+    finally:
+        db.close()
+
+    print(f"문제 {questions}개, 합성 사용자 {args.users}명, 학습 기록 {logs}개를 준비했습니다.")
+
+if __name__ == "__main__":
+    main()
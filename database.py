@@ -13,10 +13,23 @@ DB_HOST = os.environ.get("DB_HOST")
 DB_PORT = os.environ.get("DB_PORT")
 DB_NAME = os.environ.get("DB_NAME")
 
-SQLALCHEMY_DATABASE_URL = DATABASE_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+def normalize_database_url(url: str) -> str:
+    """postgres:// 또는 postgresql:// 형식의 URL을 psycopg2 드라이버 URL로 바꿉니다."""
+    for prefix in ("postgres://", "postgresql://"):
+        if url.startswith(prefix):
+            return "postgresql+psycopg2://" + url[len(prefix):]
+    return url
+
+# DATABASE_URL이 설정되어 있으면 개별 DB_* 설정보다 우선합니다 (docker-compose, 벤치마크용 로컬 DB)
+if os.environ.get("DATABASE_URL"):
+    SQLALCHEMY_DATABASE_URL = DATABASE_URL = normalize_database_url(os.environ["DATABASE_URL"])
+else:
+    SQLALCHEMY_DATABASE_URL = DATABASE_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL
+    SQLALCHEMY_DATABASE_URL,
+    # 로컬 실험용 SQLite는 요청 스레드와 연결을 만든 스레드가 달라도 사용할 수 있어야 합니다
+    connect_args={"check_same_thread": False} if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {}
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
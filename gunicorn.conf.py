@@ -0,0 +1,65 @@
+# gunicorn 다중 워커 실행 설정
+#   gunicorn -c gunicorn.conf.py main:app
+#
+# 마스터 프로세스가 앱과 문제 카탈로그를 미리 올린 뒤 GC를 고정(gc.freeze)하고 fork합니다.
+# 워커들은 이 메모리를 copy-on-write로 공유합니다. SasRec 모델은 INFERENCE_WORKERS=0일 때만 마스터가 올려 공유하고,
+# 그 밖에는 워커마다 띄우는 추론 프로세스가 각자 로드합니다.
+#
+# 워커 수는 WEB_CONCURRENCY로 정합니다 (기본값: CPU 수).
+# 추천 추론은 CPU를 쓰므로 워커 수 x TORCH_NUM_THREADS가 CPU 수를 넘지 않게 맞추는 것이 좋습니다.
+# 다중 워커에서 /metrics를 합산하려면 PROMETHEUS_MULTIPROC_DIR도 설정해야 합니다.
+import gc
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "5"))
+# 요청을 오래 처리한 워커의 메모리 증가를 막기 위해 주기적으로 재시작합니다 (0이면 재시작하지 않음)
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", "0"))
+
+def when_ready(server):
+    """워커를 fork하기 전에 마스터에서 모델과 카탈로그를 올리고 GC를 고정합니다."""
+    from database import SessionLocal, engine
+    from responser.cache import configure_workers
+    from responser.logger import start_log_listener, stop_log_listener
+    from responser.recommender import preload
+
+    # 마스터의 로그가 큐에 남은 채로 fork되면 워커마다 중복 기록되므로 fork 전에 모두 씁니다
+    start_log_listener()
+    # Redis 없이 여러 워커를 띄우면 워커 간 무효화가 불가능하므로 공유 캐시를 끄고 짧은 TTL만 사용합니다
+    configure_workers(server.cfg.workers)
+    db = SessionLocal()
+    try:
+        preload(db)
+    except Exception as e:
+        # DB에 연결할 수 없으면 워커가 첫 요청에서 각자 로드합니다
+        server.log.warning(f"preload failed, workers will load lazily: {e}")
+    finally:
+        db.close()
+        stop_log_listener()
+    # 마스터의 DB 연결을 워커와 공유하지 않도록 정리합니다
+    engine.dispose()
+
+    # 지금까지 만든 객체를 GC 대상에서 빼서, 워커의 GC가 공유 페이지의 참조 정보를 건드리지 않게 합니다
+    gc.collect()
+    gc.freeze()
+
+def post_fork(server, worker):
+    from database import engine
+    from responser.recommender import configure_torch_threads
+
+    # fork 전에 열린 연결이 남아 있으면 워커마다 새로 열도록 버립니다
+    engine.dispose()
+    threads = configure_torch_threads(server.cfg.workers)
+    server.log.info(f"worker {worker.pid}: torch threads={threads}")
+
+def child_exit(server, worker):
+    from responser.metrics import mark_worker_dead
+
+    mark_worker_dead(worker.pid)
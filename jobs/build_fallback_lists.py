@@ -0,0 +1,118 @@
+"""
+대체 추천 목록 생성 작업
+
+최근 --days일의 userlogs를 학습 레벨(S/A/B)별 문제 풀이 수와 정답 수로 집계하고,
+(학습 레벨, 카테고리, 난이도)마다 활성 문제의 순위 목록을 fallback_lists에 저장합니다.
+학습 기록이 거의 없는 사용자나 추천 계산이 밀린 요청은 모델 대신 이 목록에서 추천합니다.
+
+순위 점수는 log(1 + 풀이 수) x (1 - |정답률 - --target-rate|) 입니다.
+해당 레벨 사용자가 많이 풀었고 정답률이 목표에 가까운(너무 쉽지도 어렵지도 않은) 문제가 앞에 옵니다.
+풀이 수가 적은 문제의 정답률은 문제 전체 정답률 쪽으로 보정합니다.
+
+사용법:
+    python -m jobs.build_fallback_lists                 # 한 번 만들고 종료
+    python -m jobs.build_fallback_lists --interval 600  # 10분마다 반복
+"""
+import argparse
+import datetime
+import math
+import os
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import Integer, case, func
+from database import SessionLocal
+from models.models import FallbackListDB, QuestionDB, UserDB, UserLogDB
+from responser.fallback_lists import DEFAULT_STUDY_LEVEL, LEVEL_DIFFICULTIES, invalidate_fallback_lists
+
+# 정답률 보정에 쓰는 가상 풀이 수
+PRIOR_ATTEMPTS = 5
+
+def level_aggregates(db, since: datetime.datetime) -> Dict[Tuple[str, int], Tuple[int, int]]:
+    """(학습 레벨, question_id)별 (풀이 수, 정답 수)"""
+    level = func.coalesce(UserDB.study_level, DEFAULT_STUDY_LEVEL)
+    rows = db.query(
+        level,
+        UserLogDB.question_id,
+        func.count(UserLogDB.log_id),
+        func.sum(case((UserLogDB.correct == True, 1), else_=0), type_=Integer)
+    ).join(UserDB, UserDB.google_id == UserLogDB.google_id).filter(
+        UserLogDB.created_at >= since,
+        UserLogDB.question_id.isnot(None)
+    ).group_by(level, UserLogDB.question_id)
+    return {(study_level, question_id): (attempts, corrects or 0) for study_level, question_id, attempts, corrects in rows}
+
+def score(attempts: int, corrects: int, prior_rate: float, target_rate: float) -> float:
+    rate = (corrects + PRIOR_ATTEMPTS * prior_rate) / (attempts + PRIOR_ATTEMPTS)
+    return math.log1p(attempts) * (1 - abs(rate - target_rate))
+
+def build_lists(db, days: int, size: int, target_rate: float) -> Dict[Tuple[str, int, int], List[int]]:
+    since = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=days)
+    aggregates = level_aggregates(db, since)
+    questions = db.query(
+        QuestionDB.question_id, QuestionDB.category_id, QuestionDB.difficulty_level,
+        QuestionDB.total_attempts, QuestionDB.correct_rate
+    ).filter(QuestionDB.is_active == True).all()
+
+    cells = defaultdict(list)
+    for study_level in LEVEL_DIFFICULTIES:
+        for question in questions:
+            attempts, corrects = aggregates.get((study_level, question.question_id), (0, 0))
+            prior_rate = question.correct_rate if question.total_attempts else target_rate
+            cells[(study_level, question.category_id, question.difficulty_level)].append((
+                score(attempts, corrects, prior_rate, target_rate),
+                question.total_attempts or 0,
+                -question.question_id,
+                question.question_id
+            ))
+    # 점수가 같으면 전체 풀이 수가 많은 문제, 그다음 오래된 문제 순입니다
+    return {
+        key: [question_id for *_, question_id in sorted(ranked, reverse=True)[:size]]
+        for key, ranked in cells.items()
+        if key[1] is not None and key[2] is not None
+    }
+
+def save_lists(db, lists: Dict[Tuple[str, int, int], List[int]]):
+    """기존 목록을 새 목록으로 한 트랜잭션에서 교체합니다."""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    db.query(FallbackListDB).delete(synchronize_session=False)
+    db.add_all([
+        FallbackListDB(
+            study_level=study_level,
+            category_id=category_id,
+            difficulty_level=difficulty_level,
+            question_ids=question_ids,
+            updated_at=now
+        )
+        for (study_level, category_id, difficulty_level), question_ids in lists.items()
+    ])
+    db.commit()
+    invalidate_fallback_lists()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=90, help="집계할 최근 학습 기록 기간 (일)")
+    parser.add_argument("--size", type=int, default=100, help="(레벨, 카테고리, 난이도)별 목록 길이")
+    parser.add_argument("--target-rate", type=float, default=0.7, help="목표 정답률")
+    parser.add_argument("--interval", type=float, default=0, help="0보다 크면 이 간격(초)마다 반복 실행")
+    args = parser.parse_args()
+
+    while True:
+        db = SessionLocal()
+        try:
+            started = time.perf_counter()
+            lists = build_lists(db, args.days, args.size, args.target_rate)
+            save_lists(db, lists)
+            print(f"built {len(lists)} fallback lists in {time.perf_counter() - started:.1f}s", flush=True)
+        finally:
+            db.close()
+        if args.interval <= 0:
+            break
+        time.sleep(args.interval)
+
+if __name__ == "__main__":
+    main()
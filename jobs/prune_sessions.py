@@ -0,0 +1,65 @@
+"""
+만료된 세션 정리 작업
+
+expires_at이 지난 세션(만료 시각이 없는 이전 세션은 created_at + SESSION_TTL이 지난 세션)을
+--batch-size개씩 나눠 삭제합니다. 배치마다 커밋하고 --pause초 쉬므로 운영 중에도 긴 잠금 없이 실행할 수 있습니다.
+cron 등으로 주기적으로 실행하거나 --interval을 주어 계속 실행합니다.
+
+사용법:
+    python -m jobs.prune_sessions
+    python -m jobs.prune_sessions --interval 3600
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import and_, or_
+from database import SessionLocal
+from models.models import SessionDB
+from responser.sessions import SESSION_TTL
+
+def prune_expired_sessions(db, batch_size: int = 1000, pause: float = 0.1, now: datetime.datetime = None) -> int:
+    """만료된 세션을 배치 단위로 삭제하고 삭제한 수를 반환합니다."""
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    expired = or_(
+        SessionDB.expires_at < now,
+        and_(SessionDB.expires_at.is_(None), SessionDB.created_at < now - datetime.timedelta(seconds=SESSION_TTL))
+    )
+    total = 0
+    while True:
+        session_ids = [row.session_id for row in db.query(SessionDB.session_id).filter(expired).limit(batch_size)]
+        if not session_ids:
+            break
+        db.query(SessionDB).filter(SessionDB.session_id.in_(session_ids)).delete(synchronize_session=False)
+        db.commit()
+        total += len(session_ids)
+        if len(session_ids) < batch_size:
+            break
+        time.sleep(pause)
+    return total
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000, help="한 번에 삭제할 세션 수")
+    parser.add_argument("--pause", type=float, default=0.1, help="배치 사이 대기 시간 (초)")
+    parser.add_argument("--interval", type=float, default=0, help="0보다 크면 이 간격(초)마다 반복 실행")
+    args = parser.parse_args()
+
+    while True:
+        db = SessionLocal()
+        try:
+            started = time.perf_counter()
+            deleted = prune_expired_sessions(db, args.batch_size, args.pause)
+            print(f"pruned {deleted} expired sessions in {time.perf_counter() - started:.1f}s", flush=True)
+        finally:
+            db.close()
+        if args.interval <= 0:
+            break
+        time.sleep(args.interval)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+학습 기록 시간 버킷 집계 작업
+
+userlogs를 문제별/사용자별 시간·일 단위 버킷(풀이 수, 정답 수, 풀이 시간 합)으로 집계합니다.
+마지막으로 집계한 log_id부터 이어서 처리하며, 버킷 갱신과 진행 위치 저장을 한 트랜잭션으로 커밋하므로
+중간에 중단되어도 같은 기록을 두 번 세지 않습니다.
+집계한 문제의 total_attempts, correct_rate, avg_time_spent, daily_stats(최근 30일)도 함께 갱신합니다.
+
+아직 커밋되지 않은 트랜잭션의 log_id를 건너뛰지 않도록 --lag초보다 최근 기록은 다음 실행에서 집계합니다.
+
+사용법:
+    python -m jobs.rollup_stats                 # 밀린 기록을 모두 집계하고 종료
+    python -m jobs.rollup_stats --interval 60   # 60초마다 반복
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SessionLocal
+from models.models import QuestionDB, QuestionStatBucketDB, RollupStateDB, UserLogDB, UserStatBucketDB
+from responser.catalog import invalidate_catalog_version
+from responser.stat_buckets import GRANULARITIES, KST, bucket_start
+
+ROLLUP_NAME = "userlog_buckets"
+# 문제의 daily_stats에 담는 최근 일 수
+DAILY_STATS_DAYS = 30
+
+Counts = Dict[Tuple, list]
+
+def upsert_buckets(db, table, key_name: str, counts: Counts):
+    """(키, 단위, 시작 시각)별 [풀이 수, 정답 수, 풀이 시간 합]을 기존 버킷에 더합니다."""
+    if not counts:
+        return
+    if db.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    rows = [
+        {key_name: key, "granularity": granularity, "bucket_start": start,
+         "attempts": attempts, "corrects": corrects, "delay_sum": delay_sum}
+        for (key, granularity, start), (attempts, corrects, delay_sum) in counts.items()
+    ]
+    statement = insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=[key_name, "granularity", "bucket_start"],
+        set_={
+            "attempts": table.attempts + statement.excluded.attempts,
+            "corrects": table.corrects + statement.excluded.corrects,
+            "delay_sum": table.delay_sum + statement.excluded.delay_sum
+        }
+    )
+    db.execute(statement, rows)
+
+def update_question_stats(db, question_counts: Dict[int, list]):
+    """집계한 문제의 누적 통계와 최근 daily_stats를 갱신합니다."""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    since = bucket_start(now, "day") - datetime.timedelta(days=DAILY_STATS_DAYS - 1)
+    daily = defaultdict(dict)
+    for row in db.query(QuestionStatBucketDB).filter(
+        QuestionStatBucketDB.question_id.in_(list(question_counts)),
+        QuestionStatBucketDB.granularity == "day",
+        QuestionStatBucketDB.bucket_start >= since
+    ):
+        day = row.bucket_start
+        if day.tzinfo is None:
+            day = day.replace(tzinfo=datetime.timezone.utc)
+        daily[row.question_id][day.astimezone(KST).strftime("%Y-%m-%d")] = {
+            "attempts": row.attempts,
+            "corrects": row.corrects,
+            "delay_sum": round(row.delay_sum, 2)
+        }
+
+    for question in db.query(QuestionDB).filter(QuestionDB.question_id.in_(list(question_counts))):
+        attempts, corrects, delay_sum = question_counts[question.question_id]
+        previous = question.total_attempts or 0
+        total = previous + attempts
+        question.correct_rate = ((question.correct_rate or 0.0) * previous + corrects) / total
+        question.avg_time_spent = ((question.avg_time_spent or 0.0) * previous + delay_sum) / total
+        question.total_attempts = total
+        question.daily_stats = dict(sorted(daily[question.question_id].items()))
+        question.stats_updated_at = now
+
+def rollup_batch(db, batch_size: int, lag: float) -> int:
+    """진행 위치 다음 기록을 최대 batch_size개 집계하고 처리한 기록 수를 반환합니다."""
+    state = db.query(RollupStateDB).filter(RollupStateDB.name == ROLLUP_NAME).with_for_update().first()
+    if state is None:
+        state = RollupStateDB(name=ROLLUP_NAME, last_log_id=0)
+        db.add(state)
+    cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=lag)
+
+    rows = db.query(
+        UserLogDB.log_id, UserLogDB.google_id, UserLogDB.question_id,
+        UserLogDB.correct, UserLogDB.delaytime, UserLogDB.created_at
+    ).filter(UserLogDB.log_id > state.last_log_id).order_by(UserLogDB.log_id).limit(batch_size).all()
+
+    question_buckets: Counts = defaultdict(lambda: [0, 0, 0.0])
+    user_buckets: Counts = defaultdict(lambda: [0, 0, 0.0])
+    question_totals: Dict[int, list] = defaultdict(lambda: [0, 0, 0.0])
+    processed = 0
+    for row in rows:
+        created_at = row.created_at
+        if created_at is None:
+            continue
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=datetime.timezone.utc)
+        # log_id 순서로 처리하다가 최근 기록을 만나면 멈춥니다 (그 앞의 id가 아직 커밋 중일 수 있음)
+        if created_at > cutoff:
+            break
+        correct = 1 if row.correct else 0
+        delay = row.delaytime or 0.0
+        for granularity in GRANULARITIES:
+            start = bucket_start(created_at, granularity)
+            for counts, key in ((question_buckets, row.question_id), (user_buckets, row.google_id)):
+                if key is None:
+                    continue
+                bucket = counts[(key, granularity, start)]
+                bucket[0] += 1
+                bucket[1] += correct
+                bucket[2] += delay
+        if row.question_id is not None:
+            total = question_totals[row.question_id]
+            total[0] += 1
+            total[1] += correct
+            total[2] += delay
+        state.last_log_id = row.log_id
+        processed += 1
+
+    if processed == 0:
+        db.rollback()
+        return 0
+    upsert_buckets(db, QuestionStatBucketDB, "question_id", question_buckets)
+    upsert_buckets(db, UserStatBucketDB, "google_id", user_buckets)
+    update_question_stats(db, question_totals)
+    state.updated_at = datetime.datetime.now(datetime.timezone.utc)
+    db.commit()
+    return processed
+
+def prune_hour_buckets(db, retention_days: int) -> int:
+    """retention_days보다 오래된 시간 단위 버킷을 삭제합니다 (일 단위 버킷은 유지)."""
+    before = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=retention_days)
+    deleted = 0
+    for table in (QuestionStatBucketDB, UserStatBucketDB):
+        deleted += db.query(table).filter(
+            table.granularity == "hour",
+            table.bucket_start < before
+        ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+def catch_up(db, batch_size: int, lag: float) -> int:
+    total = 0
+    while True:
+        processed = rollup_batch(db, batch_size, lag)
+        total += processed
+        if processed < batch_size:
+            break
+    if total:
+        # 문제 통계(stats_updated_at)가 바뀌었으므로 카탈로그 응답의 ETag를 갱신합니다
+        invalidate_catalog_version()
+    return total
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=10000, help="한 트랜잭션에서 집계할 기록 수")
+    parser.add_argument("--lag", type=float, default=60, help="이 시간(초)보다 최근 기록은 다음 실행에서 집계")
+    parser.add_argument("--hour-retention-days", type=int, default=14, help="시간 단위 버킷 보관 기간")
+    parser.add_argument("--interval", type=float, default=0, help="0보다 크면 이 간격(초)마다 반복 실행")
+    args = parser.parse_args()
+
+    while True:
+        db = SessionLocal()
+        try:
+            started = time.perf_counter()
+            processed = catch_up(db, args.batch_size, args.lag)
+            pruned = prune_hour_buckets(db, args.hour_retention_days)
+            print(f"rolled up {processed} logs, pruned {pruned} hour buckets in {time.perf_counter() - started:.1f}s", flush=True)
+        finally:
+            db.close()
+        if args.interval <= 0:
+            break
+        time.sleep(args.interval)
+
+if __name__ == "__main__":
+    main()
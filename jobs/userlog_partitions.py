@@ -0,0 +1,221 @@
+"""
+userlogs 월 파티션 관리 작업 (PostgreSQL)
+
+1. 이번 달부터 --months-ahead개월 뒤까지의 파티션을 미리 만듭니다.
+   기본(default) 파티션에 해당 기간의 행이 있으면 새 파티션으로 옮긴 뒤 붙입니다.
+2. --retain-months보다 오래된(닫힌) 파티션을 사용자/문제별 월 요약(userlog_summaries)으로 집계합니다.
+3. --detach를 주면 요약이 끝난 오래된 파티션을 userlogs에서 분리합니다.
+   분리된 달의 학습 통계는 요약 테이블에서 계산되며, 원본 기록 조회(최근 기록, 상태 내보내기)에서는 빠집니다.
+   --archive-dir를 주면 분리한 파티션을 CSV(gzip)로 내보내고, --drop을 주면 내보낸 뒤 삭제합니다.
+
+cron 등으로 매일 실행합니다.
+
+사용법:
+    python -m jobs.userlog_partitions
+    python -m jobs.userlog_partitions --retain-months 6 --detach --archive-dir /var/backups/userlogs --drop
+"""
+import argparse
+import datetime
+import gzip
+import os
+import re
+import sys
+from typing import Iterator, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from database import SessionLocal
+from models.models import UserLogArchiveDB
+from responser.userlog_archive import invalidate_archived_until
+
+PARENT_TABLE = "userlogs"
+DEFAULT_PARTITION = "userlogs_default"
+PARTITION_NAME = re.compile(r"^userlogs_p(\d{4})_(\d{2})$")
+
+def month_start(value: datetime.datetime) -> datetime.datetime:
+    value = value.astimezone(datetime.timezone.utc) if value.tzinfo else value.replace(tzinfo=datetime.timezone.utc)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+def add_months(month: datetime.datetime, months: int) -> datetime.datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+def partition_name(month: datetime.datetime) -> str:
+    return f"userlogs_p{month.year:04d}_{month.month:02d}"
+
+def partition_month(name: str) -> Optional[datetime.datetime]:
+    match = PARTITION_NAME.match(name)
+    if match is None:
+        return None
+    return datetime.datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=datetime.timezone.utc)
+
+def months_between(start: datetime.datetime, end: datetime.datetime) -> Iterator[datetime.datetime]:
+    """start가 속한 달부터 end가 속한 달까지 (양 끝 포함) 각 달의 시작 시각"""
+    month = month_start(start)
+    last = month_start(end)
+    while month <= last:
+        yield month
+        month = add_months(month, 1)
+
+def attached_partitions(db, parent: str = PARENT_TABLE) -> List[str]:
+    rows = db.execute(text("""
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = :parent
+    """), {"parent": parent})
+    return sorted(row.relname for row in rows)
+
+def create_partition(db, month: datetime.datetime, parent: str = PARENT_TABLE) -> bool:
+    """
+    month의 파티션이 없으면 parent 아래에 만듭니다. 만들었으면 True를 반환합니다.
+    기본 파티션에 같은 기간의 행이 있으면 PARTITION OF로 바로 만들 수 없으므로,
+    빈 테이블을 만들어 행을 옮긴 뒤 ATTACH합니다 (한 트랜잭션).
+    """
+    name = partition_name(month)
+    if name in attached_partitions(db, parent):
+        return False
+    start, end = month, add_months(month, 1)
+    bounds = {"start": start, "end": end}
+    db.execute(text(f"LOCK TABLE {parent} IN SHARE ROW EXCLUSIVE MODE"))
+    db.execute(text(f"CREATE TABLE {name} (LIKE {parent} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    db.execute(text(f"""
+        WITH moved AS (
+            DELETE FROM {DEFAULT_PARTITION}
+            WHERE created_at >= :start AND created_at < :end
+            RETURNING *
+        )
+        INSERT INTO {name} SELECT * FROM moved
+    """), bounds)
+    # ATTACH 시 검사를 생략할 수 있도록 범위 제약을 먼저 겁니다
+    db.execute(text(f"""
+        ALTER TABLE {name} ADD CONSTRAINT {name}_range
+        CHECK (created_at IS NOT NULL AND created_at >= '{start.isoformat()}' AND created_at < '{end.isoformat()}')
+    """))
+    db.execute(text(f"""
+        ALTER TABLE {parent} ATTACH PARTITION {name}
+        FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')
+    """))
+    db.execute(text(f"ALTER TABLE {name} DROP CONSTRAINT {name}_range"))
+    db.commit()
+    return True
+
+def ensure_partitions(
+    db,
+    months_ahead: int = 3,
+    since: Optional[datetime.datetime] = None,
+    parent: str = PARENT_TABLE
+) -> List[str]:
+    """since(기본: 이번 달)부터 months_ahead개월 뒤까지의 파티션을 만들고, 새로 만든 파티션 이름을 반환합니다."""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    created = []
+    for month in months_between(since or now, add_months(month_start(now), months_ahead)):
+        if create_partition(db, month, parent):
+            created.append(partition_name(month))
+    return created
+
+def archive_state(db, name: str, month: datetime.datetime) -> UserLogArchiveDB:
+    state = db.query(UserLogArchiveDB).filter(UserLogArchiveDB.partition_name == name).first()
+    if state is None:
+        state = UserLogArchiveDB(partition_name=name, range_start=month, range_end=add_months(month, 1))
+        db.add(state)
+    return state
+
+def summarize_partition(db, name: str, month: datetime.datetime) -> int:
+    """파티션의 기록을 사용자/문제별 월 요약으로 집계합니다. 다시 실행해도 같은 결과가 됩니다. 파티션 행 수를 반환합니다."""
+    db.execute(text(f"""
+        INSERT INTO userlog_summaries (google_id, question_id, month, attempts, corrects, delay_sum, last_attempt_at)
+        SELECT google_id, question_id, :month,
+               count(*),
+               sum(CASE WHEN correct THEN 1 ELSE 0 END),
+               coalesce(sum(delaytime), 0),
+               max(created_at)
+        FROM {name}
+        WHERE google_id IS NOT NULL AND question_id IS NOT NULL
+        GROUP BY google_id, question_id
+        ON CONFLICT (google_id, question_id, month) DO UPDATE SET
+            attempts = EXCLUDED.attempts,
+            corrects = EXCLUDED.corrects,
+            delay_sum = EXCLUDED.delay_sum,
+            last_attempt_at = EXCLUDED.last_attempt_at
+    """), {"month": month})
+    row_count = db.execute(text(f"SELECT count(*) FROM {name}")).scalar()
+    state = archive_state(db, name, month)
+    state.row_count = row_count
+    state.summarized_at = datetime.datetime.now(datetime.timezone.utc)
+    db.commit()
+    return row_count
+
+def detach_partition(db, name: str, month: datetime.datetime, archive_dir: Optional[str] = None, drop: bool = False) -> Optional[str]:
+    """
+    요약이 끝난 파티션을 userlogs에서 분리합니다.
+    archive_dir가 있으면 CSV(gzip)로 내보내고 경로를 반환하며, drop이면 내보낸 뒤 테이블을 삭제합니다.
+    """
+    db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+    state = archive_state(db, name, month)
+    state.detached_at = datetime.datetime.now(datetime.timezone.utc)
+    db.commit()
+    # 학습 통계가 분리된 달을 요약 테이블에서 읽도록 API 워커의 경계 캐시를 비웁니다
+    invalidate_archived_until()
+
+    path = None
+    if archive_dir:
+        os.makedirs(archive_dir, exist_ok=True)
+        path = os.path.join(archive_dir, f"{name}.csv.gz")
+        connection = db.connection().connection
+        with gzip.open(path, "wb") as f, connection.cursor() as cursor:
+            cursor.copy_expert(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER true)", f)
+        state.archive_path = path
+        db.commit()
+    if drop:
+        if not path:
+            raise ValueError("--drop requires --archive-dir")
+        db.execute(text(f"DROP TABLE {name}"))
+        db.commit()
+    return path
+
+def cold_partitions(db, retain_months: int) -> List[Tuple[str, datetime.datetime]]:
+    """끝난 지 retain_months개월이 지난 (아직 붙어 있는) 월 파티션. 오래된 순입니다."""
+    boundary = add_months(month_start(datetime.datetime.now(datetime.timezone.utc)), -retain_months)
+    result = []
+    for name in attached_partitions(db):
+        month = partition_month(name)
+        if month is not None and add_months(month, 1) <= boundary:
+            result.append((name, month))
+    return sorted(result, key=lambda item: item[1])
+
+def run(db, months_ahead: int, retain_months: int, detach: bool, archive_dir: Optional[str], drop: bool):
+    for name in ensure_partitions(db, months_ahead):
+        print(f"created {name}", flush=True)
+
+    for name, month in cold_partitions(db, retain_months):
+        state = db.query(UserLogArchiveDB).filter(UserLogArchiveDB.partition_name == name).first()
+        if state is None or state.summarized_at is None:
+            rows = summarize_partition(db, name, month)
+            print(f"summarized {name}: {rows} rows", flush=True)
+        if detach:
+            path = detach_partition(db, name, month, archive_dir, drop)
+            print(f"detached {name}" + (f" -> {path}" if path else "") + (" (dropped)" if drop else ""), flush=True)
+    db.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--months-ahead", type=int, default=3, help="미리 만들어 둘 미래 파티션 수")
+    parser.add_argument("--retain-months", type=int, default=6, help="원본 기록을 유지할 최근 개월 수")
+    parser.add_argument("--detach", action="store_true", help="요약이 끝난 오래된 파티션을 분리")
+    parser.add_argument("--archive-dir", help="분리한 파티션을 CSV(gzip)로 내보낼 디렉터리")
+    parser.add_argument("--drop", action="store_true", help="내보낸 파티션 삭제 (--archive-dir 필요)")
+    args = parser.parse_args()
+    if args.drop and not args.archive_dir:
+        parser.error("--drop requires --archive-dir")
+
+    db = SessionLocal()
+    try:
+        run(db, args.months_ahead, args.retain_months, args.detach, args.archive_dir, args.drop)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from responser import route_auth, route_questions, route_recommendations, route_states, route_study, route_categories
 from pydantic import BaseModel
@@ -6,18 +7,25 @@ from database import engine
 import models
 import uvicorn
 import os
-from responser.logger import log_request_middleware
-from responser.metrics import metrics_middleware
+from responser.logger import start_log_listener, stop_log_listener
+from responser.metrics import metrics_endpoint
+from responser.observability import ObservabilityMiddleware
+from responser.query_stats import install_query_hooks
 from responser.error_handler import narat_exception_handler, NaratException
+from responser.http_cache import not_modified_handler, NotModified
+from responser.compression import CompressionMiddleware
+from responser.recommender import start_inference, stop_inference
 
 models.Base.metadata.create_all(bind=engine)
+install_query_hooks(engine)
 app = FastAPI(
     title="Narat API",
     description="Narat - 영어 문법 학습을 위한 API 서버",
     version="1.0.0",
     docs_url="/api/docs",
     redoc_url="/api/redoc",
-    openapi_url="/api/openapi.json"
+    openapi_url="/api/openapi.json",
+    default_response_class=ORJSONResponse
 )
 
 # CORS 설정
@@ -30,12 +38,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 미들웨어 추가
-app.middleware("http")(log_request_middleware)
-app.middleware("http")(metrics_middleware)
+# 응답 압축 (COMPRESSION_MIN_SIZE 이상인 JSON/텍스트 응답)
+app.add_middleware(CompressionMiddleware)
+
+# 요청 로그 + 메트릭 미들웨어 (가장 바깥에서 전체 처리 시간을 측정)
+app.add_middleware(ObservabilityMiddleware)
+
+# 로그 파일 기록은 워커 프로세스마다 백그라운드 스레드에서 수행
+app.on_event("startup")(start_log_listener)
+app.on_event("shutdown")(stop_log_listener)
+
+# 추천 추론 프로세스 풀 (INFERENCE_WORKERS=0이면 사용하지 않음)
+app.on_event("startup")(start_inference)
+app.on_event("shutdown")(stop_inference)
 
 # 에러 핸들러 등록
 app.add_exception_handler(NaratException, narat_exception_handler)
+app.add_exception_handler(NotModified, not_modified_handler)
 
 app.include_router(route_auth.router)
 app.include_router(route_questions.router)
@@ -50,13 +69,15 @@ async def read_root():
 
 @app.get("/get")
 async def read_get(q: str):
-    return JSONResponse({"success": q})
+    return ORJSONResponse({"success": q})
 
 class TestPostItem(BaseModel):
     item: str
 @app.post("/post")
 async def read_post(item: TestPostItem):
-    return JSONResponse({"success": item.item})
+    return ORJSONResponse({"success": item.item})
+
+app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
 
 @app.get("/healthz")
 def health_check():
@@ -0,0 +1,113 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+import datetime
+import os
+import sys
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import normalize_database_url
+from models.models import ReviewBackfillDB, ReviewStateDB, UserLogDB
+from responser.review_scheduler import DEFAULT_EASE, lock_states, schedule
+
+# .env 파일 로드
+load_dotenv()
+
+# 데이터베이스 연결 정보
+DATABASE_URL = os.getenv("DATABASE_URL")
+# 진행 상황을 출력하는 사용자 수 간격
+PROGRESS_INTERVAL = 1000
+
+STATE_FIELDS = ("repetitions", "interval_days", "ease", "lapses", "due_at", "last_reviewed_at")
+
+def _as_utc(value: datetime.datetime) -> datetime.datetime:
+    # SQLite는 시간대 정보 없이 UTC 시각을 돌려줍니다
+    return value.replace(tzinfo=datetime.timezone.utc) if value.tzinfo is None else value
+
+def replay(logs) -> dict:
+    """한 사용자의 (시간순) 학습 기록을 재생해 question_id별 복습 일정을 만듭니다 (세션에 추가하지 않음)."""
+    states = {}
+    for log in logs:
+        state = states.get(log.question_id)
+        if state is None:
+            # 복습 일정은 처음 틀린 문제부터 만듭니다
+            if log.correct:
+                continue
+            state = ReviewStateDB(
+                google_id=log.google_id, question_id=log.question_id,
+                repetitions=0, lapses=0, ease=DEFAULT_EASE
+            )
+            states[log.question_id] = state
+        schedule(state, bool(log.correct), log.delaytime, _as_utc(log.created_at))
+    return states
+
+def backfill_user(db, google_id: str) -> int:
+    """
+    사용자의 복습 일정을 전체 학습 기록으로 다시 만들고 완료로 표시합니다. 만든 일정 수를 반환합니다.
+    배포 후 제출로 이미 만들어진 일정을 먼저 잠근 뒤 기록을 읽으므로, 그 사이의 제출은 이 트랜잭션이 끝날 때까지 기다렸다가
+    재생 결과 위에 반영됩니다. 기록을 읽은 뒤 다른 요청이 새로 만든 일정은 그대로 둡니다.
+    """
+    locked = set(lock_states(db, google_id, [
+        row.question_id for row in db.query(ReviewStateDB.question_id).filter(ReviewStateDB.google_id == google_id)
+    ]))
+    logs = db.query(
+        UserLogDB.google_id, UserLogDB.question_id, UserLogDB.correct,
+        UserLogDB.delaytime, UserLogDB.created_at
+    ).filter(
+        UserLogDB.google_id == google_id,
+        UserLogDB.question_id.isnot(None),
+        UserLogDB.created_at.isnot(None)
+    ).order_by(UserLogDB.created_at, UserLogDB.log_id).all()
+    states = replay(logs)
+
+    existing = lock_states(db, google_id, states, states) if states else {}
+    for question_id, replayed in states.items():
+        state = existing[question_id]
+        if question_id not in locked and state.last_reviewed_at is not None:
+            continue
+        for field in STATE_FIELDS:
+            setattr(state, field, getattr(replayed, field))
+    db.add(ReviewBackfillDB(google_id=google_id, backfilled_at=datetime.datetime.now(datetime.timezone.utc)))
+    db.commit()
+    return len(states)
+
+def migrate_review_states():
+    """
+    review_states 테이블을 만들고, 기존 학습 기록을 사용자별 시간순으로 다시 재생해 복습 일정을 채웁니다.
+    사용자마다 한 트랜잭션으로 처리하고 review_backfills에 완료를 기록하므로,
+    새 API를 배포한 뒤에 실행하거나 중간에 멈췄다가 다시 실행해도 됩니다.
+    """
+    # 데이터베이스 연결
+    engine = create_engine(normalize_database_url(DATABASE_URL))
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    ReviewStateDB.__table__.create(bind=engine, checkfirst=True)
+    ReviewBackfillDB.__table__.create(bind=engine, checkfirst=True)
+    db = SessionLocal()
+
+    try:
+        done = {row.google_id for row in db.query(ReviewBackfillDB.google_id)}
+        google_ids = [
+            row.google_id
+            for row in db.query(UserLogDB.google_id).filter(UserLogDB.google_id.isnot(None)).distinct()
+            if row.google_id not in done
+        ]
+        db.commit()
+
+        total = 0
+        for index, google_id in enumerate(google_ids, 1):
+            total += backfill_user(db, google_id)
+            if index % PROGRESS_INTERVAL == 0:
+                print(f"{index}/{len(google_ids)} 사용자, 복습 일정 {total}", flush=True)
+        print(f"Review state 마이그레이션이 성공적으로 완료되었습니다. (사용자: {len(google_ids)}, 복습 일정: {total})")
+
+    except Exception as e:
+        db.rollback()
+        print(f"마이그레이션 중 오류 발생: {str(e)}")
+        raise
+
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    migrate_review_states()
@@ -0,0 +1,69 @@
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+import os
+from dotenv import load_dotenv
+
+# .env 파일 로드
+load_dotenv()
+
+# 데이터베이스 연결 정보
+DATABASE_URL = os.getenv("DATABASE_URL")
+# 기존 세션에 부여할 유효 기간 (responser/sessions.py의 SESSION_TTL과 같은 값)
+SESSION_TTL = int(float(os.getenv("SESSION_TTL", str(14 * 24 * 3600))))
+# 한 번에 만료 시각을 채우는 행 수
+BATCH_SIZE = 10000
+
+def migrate_session_expiry():
+    """
+    sessions 테이블에 expires_at, last_seen_at 컬럼과 만료 시각 인덱스를 추가하고,
+    기존 세션의 만료 시각을 created_at + SESSION_TTL로 채웁니다.
+    """
+    # 데이터베이스 연결
+    engine = create_engine(DATABASE_URL)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = SessionLocal()
+
+    try:
+        # 1. 컬럼 추가
+        db.execute(text("""
+            ALTER TABLE sessions
+            ADD COLUMN IF NOT EXISTS expires_at TIMESTAMP WITH TIME ZONE;
+
+            ALTER TABLE sessions
+            ADD COLUMN IF NOT EXISTS last_seen_at TIMESTAMP WITH TIME ZONE;
+        """))
+        db.commit()
+
+        # 2. 기존 세션의 만료 시각을 나눠서 채움 (큰 테이블을 한 트랜잭션으로 잠그지 않도록)
+        total = 0
+        while True:
+            updated = db.execute(text("""
+                UPDATE sessions
+                SET expires_at = COALESCE(created_at, now()) + make_interval(secs => :ttl),
+                    last_seen_at = created_at
+                WHERE session_id IN (
+                    SELECT session_id FROM sessions WHERE expires_at IS NULL LIMIT :batch
+                )
+            """), {"ttl": SESSION_TTL, "batch": BATCH_SIZE}).rowcount
+            db.commit()
+            total += updated
+            if updated < BATCH_SIZE:
+                break
+
+        # 3. 만료된 세션 정리용 인덱스
+        db.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_sessions_expires_at ON sessions (expires_at);
+        """))
+        db.commit()
+        print(f"Session expiry 마이그레이션이 성공적으로 완료되었습니다. (만료 시각을 채운 세션: {total})")
+
+    except Exception as e:
+        db.rollback()
+        print(f"마이그레이션 중 오류 발생: {str(e)}")
+        raise
+
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    migrate_session_expiry()
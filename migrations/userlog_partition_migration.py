@@ -0,0 +1,172 @@
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+import os
+import sys
+from typing import Optional
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import normalize_database_url
+from jobs.userlog_partitions import DEFAULT_PARTITION, add_months, ensure_partitions, months_between
+
+# .env 파일 로드
+load_dotenv()
+
+# 데이터베이스 연결 정보
+DATABASE_URL = os.getenv("DATABASE_URL")
+# 미리 만들어 둘 미래 파티션 수
+MONTHS_AHEAD = 3
+# 기존 테이블을 새 파티션 테이블로 옮긴 뒤에도 남겨둘지 여부
+KEEP_LEGACY = os.getenv("USERLOG_KEEP_LEGACY", "false").lower() in ("1", "true", "yes")
+
+# 기록을 채우는 동안 사용하는 새 파티션 테이블 이름 (마지막에 userlogs로 바꿉니다)
+BUILD_TABLE = "userlogs_partitioned"
+# 잠금 없이 새 기록을 따라잡는 최대 횟수. 이후 남은 기록은 잠근 트랜잭션에서 옮깁니다
+CATCH_UP_ROUNDS = 5
+# 남은 새 기록이 이보다 적으면 따라잡기를 멈추고 교체합니다
+CATCH_UP_THRESHOLD = 10000
+
+COPY_COLUMNS = "log_id, google_id, question_id, correct, delaytime"
+
+def high_water_mark(db) -> int:
+    """
+    지금까지 커밋된 기록의 최대 log_id.
+    잠깐 SHARE 잠금을 잡아 진행 중인 INSERT가 끝나기를 기다리므로, 이후에 커밋되는 기록은 모두 이 값보다 큰 log_id를 가집니다.
+    """
+    db.execute(text("LOCK TABLE userlogs IN SHARE MODE"))
+    value = db.execute(text("SELECT coalesce(max(log_id), 0) FROM userlogs")).scalar()
+    db.commit()
+    return value
+
+def copy_range(db, after: int, until: Optional[int] = None) -> int:
+    """log_id가 (after, until] 범위인 기록을 새 테이블로 옮깁니다 (created_at이 없는 기록은 옮기는 시각으로 채움)."""
+    condition = "log_id > :after" + (" AND log_id <= :until" if until is not None else "")
+    return db.execute(text(f"""
+        INSERT INTO {BUILD_TABLE} ({COPY_COLUMNS}, created_at)
+        SELECT {COPY_COLUMNS}, coalesce(created_at, now())
+        FROM userlogs
+        WHERE {condition}
+    """), {"after": after, "until": until}).rowcount
+
+def migrate_userlog_partitions():
+    """
+    userlogs를 created_at 기준 월 단위 범위 파티션 테이블로 바꿉니다.
+    서비스는 옮기는 동안 계속 기존 userlogs를 읽고 쓰므로 학습 기록이 일부만 보이는 순간이 없습니다.
+    1. 같은 컬럼의 파티션 테이블을 임시 이름(userlogs_partitioned)으로 만듭니다 (log_id 시퀀스는 함께 사용).
+    2. 시작 시점까지 커밋된 기록을 한 달씩 옮기고 커밋합니다.
+    3. 그동안 추가된 기록을 몇 번에 걸쳐 따라잡은 뒤, userlogs를 잠근 짧은 트랜잭션에서 남은 기록을 옮기고
+       기존 테이블을 userlogs_legacy로, 새 테이블을 userlogs로 이름을 바꿉니다.
+    4. 기존 테이블을 삭제합니다 (USERLOG_KEEP_LEGACY=true이면 남겨둠).
+    중간에 실패하면 임시 테이블을 지우고 처음부터 다시 실행합니다.
+    """
+    # 데이터베이스 연결
+    engine = create_engine(normalize_database_url(DATABASE_URL))
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = SessionLocal()
+
+    try:
+        partitioned = db.execute(text("""
+            SELECT count(*) FROM pg_partitioned_table
+            JOIN pg_class ON pg_class.oid = pg_partitioned_table.partrelid
+            WHERE pg_class.relname = 'userlogs'
+        """)).scalar()
+        if partitioned:
+            print("userlogs는 이미 파티션 테이블입니다.")
+            return
+
+        # 1. 임시 이름으로 파티션 테이블 생성 (이전 실행이 남긴 테이블은 서비스에서 쓰지 않으므로 지우고 다시 만듦)
+        db.execute(text(f"""
+            DROP TABLE IF EXISTS {BUILD_TABLE} CASCADE;
+
+            CREATE TABLE {BUILD_TABLE} (
+                log_id      INTEGER NOT NULL DEFAULT nextval('userlogs_log_id_seq'),
+                google_id   VARCHAR REFERENCES users (google_id),
+                question_id INTEGER REFERENCES questions (question_id),
+                correct     BOOLEAN,
+                delaytime   DOUBLE PRECISION,
+                created_at  TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+                CONSTRAINT {BUILD_TABLE}_pkey PRIMARY KEY (log_id, created_at)
+            ) PARTITION BY RANGE (created_at);
+
+            CREATE INDEX ix_{BUILD_TABLE}_log_id ON {BUILD_TABLE} (log_id);
+            CREATE INDEX ix_{BUILD_TABLE}_google_id_created_at ON {BUILD_TABLE} (google_id, created_at);
+            CREATE INDEX ix_{BUILD_TABLE}_question_id ON {BUILD_TABLE} (question_id);
+        """))
+        db.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {BUILD_TABLE} DEFAULT"))
+        oldest = db.execute(text("SELECT min(created_at) FROM userlogs")).scalar()
+        db.commit()
+        created = ensure_partitions(db, MONTHS_AHEAD, since=oldest, parent=BUILD_TABLE)
+        print(f"파티션 {len(created)}개를 만들었습니다.")
+
+        # 2. 시작 시점까지의 기록을 한 달씩 이동
+        copied_until = high_water_mark(db)
+        total = 0
+        if oldest is not None:
+            newest = db.execute(text("SELECT max(created_at) FROM userlogs WHERE log_id <= :until"), {"until": copied_until}).scalar()
+            for month in months_between(oldest, newest):
+                moved = db.execute(text(f"""
+                    INSERT INTO {BUILD_TABLE} ({COPY_COLUMNS}, created_at)
+                    SELECT {COPY_COLUMNS}, created_at
+                    FROM userlogs
+                    WHERE created_at >= :start AND created_at < :end AND log_id <= :until
+                """), {"start": month, "end": add_months(month, 1), "until": copied_until}).rowcount
+                db.commit()
+                total += moved
+                print(f"{month:%Y-%m}: {moved}")
+        total += db.execute(text(f"""
+            INSERT INTO {BUILD_TABLE} ({COPY_COLUMNS}, created_at)
+            SELECT {COPY_COLUMNS}, now()
+            FROM userlogs
+            WHERE created_at IS NULL AND log_id <= :until
+        """), {"until": copied_until}).rowcount
+        db.commit()
+
+        # 3. 옮기는 동안 추가된 기록을 따라잡은 뒤 잠그고 교체
+        for _ in range(CATCH_UP_ROUNDS):
+            until = high_water_mark(db)
+            moved = copy_range(db, copied_until, until)
+            db.commit()
+            total += moved
+            copied_until = until
+            print(f"따라잡기: {moved}")
+            if moved < CATCH_UP_THRESHOLD:
+                break
+
+        db.execute(text("LOCK TABLE userlogs IN ACCESS EXCLUSIVE MODE"))
+        total += copy_range(db, copied_until)
+        db.execute(text(f"""
+            ALTER TABLE userlogs RENAME TO userlogs_legacy;
+            ALTER TABLE userlogs_legacy RENAME CONSTRAINT userlogs_pkey TO userlogs_legacy_pkey;
+            ALTER INDEX IF EXISTS ix_userlogs_log_id RENAME TO ix_userlogs_legacy_log_id;
+            ALTER INDEX IF EXISTS ix_userlogs_google_id_created_at RENAME TO ix_userlogs_legacy_google_id_created_at;
+            ALTER INDEX IF EXISTS ix_userlogs_question_id RENAME TO ix_userlogs_legacy_question_id;
+
+            ALTER TABLE {BUILD_TABLE} RENAME TO userlogs;
+            ALTER TABLE userlogs RENAME CONSTRAINT {BUILD_TABLE}_pkey TO userlogs_pkey;
+            ALTER INDEX ix_{BUILD_TABLE}_log_id RENAME TO ix_userlogs_log_id;
+            ALTER INDEX ix_{BUILD_TABLE}_google_id_created_at RENAME TO ix_userlogs_google_id_created_at;
+            ALTER INDEX ix_{BUILD_TABLE}_question_id RENAME TO ix_userlogs_question_id;
+
+            ALTER SEQUENCE userlogs_log_id_seq OWNED BY userlogs.log_id;
+        """))
+        db.commit()
+
+        # 4. 기존 테이블 정리
+        if not KEEP_LEGACY:
+            db.execute(text("DROP TABLE userlogs_legacy"))
+            db.commit()
+        db.execute(text("ANALYZE userlogs"))
+        db.commit()
+        print(f"Userlog partition 마이그레이션이 성공적으로 완료되었습니다. (옮긴 기록: {total})")
+
+    except Exception as e:
+        db.rollback()
+        print(f"마이그레이션 중 오류 발생: {str(e)}")
+        raise
+
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    migrate_userlog_partitions()
@@ -0,0 +1,18 @@
+from models.models import (
+    Base,
+    UserDB,
+    CategoryDB,
+    QuestionDB,
+    RecommendationsDB,
+    RecommendationQuestionsDB,
+    SessionDB,
+    UserLogDB,
+    UserLogSummaryDB,
+    UserLogArchiveDB,
+    QuestionStatBucketDB,
+    UserStatBucketDB,
+    RollupStateDB,
+    FallbackListDB,
+    ReviewStateDB,
+    ReviewBackfillDB,
+)
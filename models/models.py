@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Float, Text, DateTime, JSON
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Float, Text, DateTime, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -86,9 +86,11 @@ class RecommendationQuestionsDB(Base):
 class SessionDB(Base):
     __tablename__ = "sessions"
 
-    session_id = Column(String, primary_key=True, index=True)
-    google_id  = Column(String, ForeignKey("users.google_id"))
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    session_id   = Column(String, primary_key=True, index=True)
+    google_id    = Column(String, ForeignKey("users.google_id"))
+    created_at   = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at   = Column(DateTime(timezone=True), index=True)
+    last_seen_at = Column(DateTime(timezone=True))
 
     session_owner = relationship("UserDB", back_populates="session_items")
 
@@ -104,4 +106,106 @@ class UserLogDB(Base):
     created_at  = Column(DateTime(timezone=True), server_default=func.now())
 
     log_owner = relationship("UserDB", back_populates="log_items")
-    log_qid_owner = relationship("QuestionDB", back_populates="log_question_id")
\ No newline at end of file
+    log_qid_owner = relationship("QuestionDB", back_populates="log_question_id")
+
+    # PostgreSQL에서는 created_at 월 단위 파티션 테이블입니다 (migrations/userlog_partition_migration.py).
+    # 사용자별 최근 기록 조회가 최근 파티션의 인덱스만 읽도록 (google_id, created_at) 인덱스를 둡니다
+    __table_args__ = (
+        Index("ix_userlogs_google_id_created_at", "google_id", "created_at"),
+    )
+
+
+# 보관 처리된 userlogs 월 파티션의 사용자/문제별 요약 (jobs/userlog_partitions.py)
+class UserLogSummaryDB(Base):
+    __tablename__ = "userlog_summaries"
+
+    google_id       = Column(String, primary_key=True)
+    question_id     = Column(Integer, primary_key=True)
+    month           = Column(DateTime(timezone=True), primary_key=True, index=True)
+    attempts        = Column(Integer, default=0)
+    corrects        = Column(Integer, default=0)
+    delay_sum       = Column(Float, default=0.0)
+    last_attempt_at = Column(DateTime(timezone=True))
+
+
+# userlogs 월 파티션의 요약/분리/보관 상태
+class UserLogArchiveDB(Base):
+    __tablename__ = "userlog_archives"
+
+    partition_name = Column(String, primary_key=True)
+    range_start    = Column(DateTime(timezone=True), index=True)
+    range_end      = Column(DateTime(timezone=True))
+    row_count      = Column(Integer)
+    summarized_at  = Column(DateTime(timezone=True))
+    detached_at    = Column(DateTime(timezone=True))
+    archive_path   = Column(String)
+
+
+# userlogs 집계 버킷 (jobs/rollup_stats.py). granularity는 "hour" 또는 "day"이며, bucket_start는 KST 기준 구간의 시작 시각입니다
+class QuestionStatBucketDB(Base):
+    __tablename__ = "question_stat_buckets"
+
+    question_id  = Column(Integer, primary_key=True)
+    granularity  = Column(String, primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    attempts     = Column(Integer, default=0)
+    corrects     = Column(Integer, default=0)
+    delay_sum    = Column(Float, default=0.0)
+
+
+class UserStatBucketDB(Base):
+    __tablename__ = "user_stat_buckets"
+
+    google_id    = Column(String, primary_key=True)
+    granularity  = Column(String, primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    attempts     = Column(Integer, default=0)
+    corrects     = Column(Integer, default=0)
+    delay_sum    = Column(Float, default=0.0)
+
+
+# 증분 집계 작업의 진행 위치 (마지막으로 집계한 log_id)
+class RollupStateDB(Base):
+    __tablename__ = "rollup_states"
+
+    name        = Column(String, primary_key=True)
+    last_log_id = Column(Integer, default=0)
+    updated_at  = Column(DateTime(timezone=True))
+
+
+# 학습 레벨/카테고리/난이도별 대체 추천 목록 (jobs/build_fallback_lists.py). question_ids는 순위순입니다
+class FallbackListDB(Base):
+    __tablename__ = "fallback_lists"
+
+    study_level      = Column(String, primary_key=True)
+    category_id      = Column(Integer, primary_key=True)
+    difficulty_level = Column(Integer, primary_key=True)
+    question_ids     = Column(JSON, default=[])
+    updated_at       = Column(DateTime(timezone=True))
+
+
+# 사용자/문제별 복습 일정 (SM-2). 틀린 문제부터 만들어지며 풀 때마다 다음 복습 시각(due_at)을 갱신합니다
+class ReviewStateDB(Base):
+    __tablename__ = "review_states"
+
+    google_id        = Column(String, ForeignKey("users.google_id"), primary_key=True)
+    question_id      = Column(Integer, ForeignKey("questions.question_id"), primary_key=True)
+    repetitions      = Column(Integer, default=0)    # 연속으로 맞힌 복습 횟수
+    interval_days    = Column(Float, default=0.0)
+    ease             = Column(Float, default=2.5)
+    lapses           = Column(Integer, default=0)    # 틀린 횟수
+    due_at           = Column(DateTime(timezone=True))
+    last_reviewed_at = Column(DateTime(timezone=True))
+
+    # 복습 대기열은 사용자의 due_at 범위만 읽습니다
+    __table_args__ = (
+        Index("ix_review_states_google_id_due_at", "google_id", "due_at"),
+    )
+
+
+# 기존 학습 기록으로 복습 일정을 채운 사용자 (migrations/review_state_migration.py)
+class ReviewBackfillDB(Base):
+    __tablename__ = "review_backfills"
+
+    google_id     = Column(String, ForeignKey("users.google_id"), primary_key=True)
+    backfilled_at = Column(DateTime(timezone=True))
@@ -14,7 +14,8 @@ class PositionalEncoding(nn.Module):
         self.register_buffer('pe', pe)
 
     def forward(self, x: torch.Tensor) -> torch.Tensor:
-        return x + self.pe[:x.size(0)]
+        # x shape: (batch_size, seq_length, d_model)
+        return x + self.pe[:x.size(1)]
 
 class SasRec(nn.Module):
     def __init__(
@@ -65,7 +66,9 @@ class SasRec(nn.Module):
         
         # Create attention mask if not provided
         if attention_mask is None:
-            attention_mask = (input_seq == 0).transpose(0, 1)  # (seq_length, batch_size)
+            attention_mask = input_seq == 0  # (batch_size, seq_length)
+            # 기록이 없는 시퀀스는 모든 위치가 가려져 NaN이 나오므로 마지막 위치는 남겨둡니다
+            attention_mask[:, -1] = False
         
         # Transformer Encoder
         x = self.transformer_encoder(x, src_key_padding_mask=attention_mask)
@@ -122,19 +125,32 @@ class SasRecRecommender:
             sequence = [0] * (max_length - len(sequence)) + sequence
         return torch.tensor(sequence, dtype=torch.long).unsqueeze(0).to(self.device)
     
-    def recommend(self, sequence: List[int], top_k: int = 5) -> List[Tuple[int, float]]:
+    def scores(self, sequence: List[int]) -> np.ndarray:
         """
-        주어진 시퀀스에 대해 top-k 추천을 수행
+        주어진 시퀀스 다음에 올 아이템별 점수 (num_items + 1,)
         """
         input_seq = self.prepare_sequence(sequence, self.model.max_seq_length)
         scores, _ = self.model.predict(input_seq)
-        scores = scores.squeeze().cpu().numpy()
-        
-        # 이미 시퀀스에 있는 아이템은 제외
+        return scores.squeeze(0).cpu().numpy()
+
+    @staticmethod
+    def top_k_items(scores: np.ndarray, sequence: List[int], top_k: int) -> List[Tuple[int, float]]:
+        """
+        점수에서 패딩과 이미 푼 아이템을 제외한 top-k (아이템, 점수)를 고릅니다
+        """
+        scores = scores.copy()
+        # 패딩 인덱스와 이미 시퀀스에 있는 아이템은 제외
+        scores[0] = -np.inf
         scores[sequence] = -np.inf
         
         # top-k 아이템 선택
         top_items = np.argsort(scores)[-top_k:][::-1]
         top_scores = scores[top_items]
         
-        return list(zip(top_items.tolist(), top_scores.tolist())) 
\ No newline at end of file
+        return list(zip(top_items.tolist(), top_scores.tolist()))
+
+    def recommend(self, sequence: List[int], top_k: int = 5) -> List[Tuple[int, float]]:
+        """
+        주어진 시퀀스에 대해 top-k 추천을 수행
+        """
+        return self.top_k_items(self.scores(sequence), sequence, top_k)
@@ -0,0 +1,101 @@
+from collections import deque
+from contextlib import asynccontextmanager
+from responser.error_handler import ServiceOverloadedError
+from responser.metrics import record_admission_state, record_admission_wait, record_shed
+from typing import Deque
+import asyncio
+import math
+import os
+import time
+
+# 추천 계산(추론 + DB)을 동시에 처리할 수 있는 요청 수 (워커마다)
+RECOMMENDATION_MAX_IN_FLIGHT = int(os.environ.get("RECOMMENDATION_MAX_IN_FLIGHT", "4"))
+# 자리가 날 때까지 기다릴 수 있는 요청 수. 넘으면 바로 거절합니다
+RECOMMENDATION_MAX_QUEUE = int(os.environ.get("RECOMMENDATION_MAX_QUEUE", "32"))
+# 대기열에서 기다리는 최대 시간 (초)
+RECOMMENDATION_MAX_QUEUE_WAIT = float(os.environ.get("RECOMMENDATION_MAX_QUEUE_WAIT", "1.0"))
+# 거절한 요청에 Retry-After로 알려줄 재시도 간격 (초)
+RECOMMENDATION_RETRY_AFTER = float(os.environ.get("RECOMMENDATION_RETRY_AFTER", "2"))
+
+class AdmissionLimiter:
+    """
+    동시 처리 수를 제한하고 넘치는 요청은 순서대로 대기시키는 리미터입니다.
+    대기열이 가득 찼거나 max_wait 안에 자리가 나지 않으면 ServiceOverloadedError를 발생시켜
+    느린 작업이 쌓여 같은 워커의 다른 엔드포인트까지 느려지는 것을 막습니다.
+    이벤트 루프 안에서만 사용하므로 별도 잠금이 필요 없습니다.
+    """
+    def __init__(self, name: str, max_in_flight: int, max_queue: int, max_wait: float, retry_after: float):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def _update_metrics(self):
+        record_admission_state(self.name, self.in_flight, len(self._waiters))
+
+    def _reject(self, reason: str):
+        record_shed(self.name, reason)
+        raise ServiceOverloadedError(reason, retry_after=math.ceil(self.retry_after))
+
+    async def acquire(self):
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            self._update_metrics()
+            return
+        if len(self._waiters) >= self.max_queue:
+            self._reject("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._update_metrics()
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, self.max_wait)
+        except asyncio.TimeoutError:
+            self._reject("queue_timeout")
+        except BaseException:
+            # 자리를 넘겨받은 직후 취소되었으면(클라이언트 연결 종료 등) 다음 요청에 돌려줍니다
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            record_admission_wait(self.name, time.perf_counter() - started)
+            self._update_metrics()
+
+    def release(self):
+        # 기다리는 요청이 있으면 처리 중인 자리를 그대로 넘깁니다
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._update_metrics()
+                return
+        self.in_flight -= 1
+        self._update_metrics()
+
+    @asynccontextmanager
+    async def admit(self):
+        """with 블록 동안 자리를 차지합니다. 자리를 얻지 못하면 ServiceOverloadedError를 발생시킵니다."""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+# 추천 결과 계산 (/api/recommendations/success)
+recommendation_limiter = AdmissionLimiter(
+    "recommendation",
+    max_in_flight=RECOMMENDATION_MAX_IN_FLIGHT,
+    max_queue=RECOMMENDATION_MAX_QUEUE,
+    max_wait=RECOMMENDATION_MAX_QUEUE_WAIT,
+    retry_after=RECOMMENDATION_RETRY_AFTER
+)
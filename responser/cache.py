@@ -0,0 +1,330 @@
+from collections import OrderedDict
+from responser.logger import logger
+from responser.metrics import record_cache_lookup
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import orjson
+import os
+import threading
+import time
+
+# 공유 캐시(L2) 주소. redis://host:port/db 형식이며, 비우거나 memory://이면 프로세스 안의 메모리 캐시를 사용합니다
+CACHE_URL = os.environ.get("CACHE_URL", "memory://")
+# 캐시 키 접두어 (같은 Redis를 다른 서비스와 함께 쓸 때 구분용)
+CACHE_PREFIX = os.environ.get("CACHE_PREFIX", "narat")
+# 워커 간 L1 무효화 메시지를 주고받는 채널
+INVALIDATION_CHANNEL = f"{CACHE_PREFIX}:cache:invalidate"
+# L2 장애 경고 로그를 다시 남기기까지의 간격 (초)
+L2_ERROR_LOG_INTERVAL = 30.0
+# L2 호출이 실패하면 이 시간(초) 동안 L2를 건너뜁니다.
+# Redis 호출은 이벤트 루프에서 동기로 실행되므로, 장애 중에 호출마다 소켓 타임아웃만큼 모든 요청이 멈추지 않게 합니다
+CACHE_L2_BREAK_SECONDS = float(os.environ.get("CACHE_L2_BREAK_SECONDS", "5"))
+# 메모리 L2의 최대 키 수와 만료된 키를 정리하는 간격 (초)
+MEMORY_CACHE_MAX_KEYS = int(os.environ.get("MEMORY_CACHE_MAX_KEYS", "100000"))
+MEMORY_CACHE_SWEEP_INTERVAL = 60.0
+# Redis 없이 여러 워커를 띄울 때의 L1 TTL 상한 (초).
+# 이때는 무효화가 다른 워커에 전달되지 않으므로 L2를 끄고, 오래된 값은 이 시간까지만 사용합니다
+LOCAL_CACHE_MAX_TTL = float(os.environ.get("LOCAL_CACHE_MAX_TTL", "5"))
+
+class MemoryBackend:
+    """
+    Redis 대신 사용하는 프로세스 내부 L2 구현입니다 (단일 프로세스 실행, 테스트용).
+    get/set/delete/publish/subscribe만 Redis와 같은 의미로 동작합니다.
+    키 수는 max_size로 제한하며(가장 오래 쓰지 않은 키부터 삭제), 만료된 키는 주기적으로 정리합니다.
+    """
+    def __init__(self, max_size: int = MEMORY_CACHE_MAX_KEYS, sweep_interval: float = MEMORY_CACHE_SWEEP_INTERVAL):
+        self.max_size = max_size
+        self.sweep_interval = sweep_interval
+        self._data: "OrderedDict[str, Tuple[bytes, Optional[float]]]" = OrderedDict()
+        self._subscribers: List[Callable[[bytes], None]] = []
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        now = time.monotonic()
+        with self._lock:
+            self._data[key] = (value, now + ttl if ttl else None)
+            self._data.move_to_end(key)
+            if now - self._last_sweep >= self.sweep_interval:
+                self._sweep(now)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def _sweep(self, now: float):
+        """만료된 키를 모두 지웁니다. 읽히지 않는 키도 메모리에 남지 않도록 set에서 주기적으로 호출합니다."""
+        expired = [key for key, (_, expires_at) in self._data.items() if expires_at is not None and expires_at <= now]
+        for key in expired:
+            del self._data[key]
+        self._last_sweep = now
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def publish(self, channel: str, message: bytes):
+        for callback in list(self._subscribers):
+            callback(message)
+
+    def subscribe(self, channel: str, callback: Callable[[bytes], None]):
+        self._subscribers.append(callback)
+
+class RedisBackend:
+    """Redis(또는 Redis 프로토콜 호환 서버)를 L2로 사용합니다."""
+    def __init__(self, url: str):
+        import redis
+
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._pubsub_thread = None
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        self._client.set(key, value, px=int(ttl * 1000) if ttl else None)
+
+    def delete(self, *keys: str):
+        if keys:
+            self._client.delete(*keys)
+
+    def publish(self, channel: str, message: bytes):
+        self._client.publish(channel, message)
+
+    def subscribe(self, channel: str, callback: Callable[[bytes], None]):
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{channel: lambda message: callback(message["data"])})
+        self._pubsub_thread = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+def is_shared_backend(url: str = CACHE_URL) -> bool:
+    """여러 프로세스가 함께 쓰는 L2(Redis)인지 여부"""
+    return bool(url) and not url.startswith("memory://")
+
+def create_backend(url: str = CACHE_URL):
+    if not is_shared_backend(url):
+        return MemoryBackend()
+    return RedisBackend(url)
+
+class TieredCache:
+    """
+    프로세스 안의 L1(LRU + TTL) 앞에 워커들이 공유하는 L2를 두는 캐시입니다.
+    L1에 없으면 L2, L2에도 없으면 loader로 계산해 두 계층에 모두 저장하므로
+    한 워커가 계산한 결과를 다른 워커가 다시 계산하지 않습니다.
+    invalidate는 L2에서 지우고 무효화 메시지를 발행해 모든 워커의 L1에서도 지웁니다.
+    값은 orjson으로 직렬화할 수 있어야 합니다.
+    """
+    def __init__(self, name: str, l1_ttl: float, l2_ttl: float, l1_max_size: int = 10000):
+        self.name = name
+        self.l1_ttl = l1_ttl
+        self.l2_ttl = l2_ttl
+        self.l1_max_size = l1_max_size
+        self._l1: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _l2_key(self, key: str) -> str:
+        return f"{CACHE_PREFIX}:{self.name}:{key}"
+
+    def _l1_get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            item = self._l1.get(key)
+            if item is None:
+                return False, None
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._l1[key]
+                return False, None
+            self._l1.move_to_end(key)
+            return True, value
+
+    def _l1_set(self, key: str, value: Any):
+        with self._lock:
+            self._l1[key] = (value, time.monotonic() + self.l1_ttl)
+            self._l1.move_to_end(key)
+            while len(self._l1) > self.l1_max_size:
+                self._l1.popitem(last=False)
+
+    def evict_local(self, key: str):
+        """이 프로세스의 L1에서만 지웁니다. 무효화 메시지를 받았을 때 호출됩니다."""
+        with self._lock:
+            self._l1.pop(key, None)
+
+    def clear_local(self):
+        with self._lock:
+            self._l1.clear()
+
+    def get(self, key: str, loader: Optional[Callable[[], Any]] = None) -> Any:
+        """
+        key의 값을 반환합니다. 어느 계층에도 없으면 loader()로 계산해 저장합니다.
+        loader가 None을 반환하면 저장하지 않습니다 (없는 값은 캐시하지 않음).
+        """
+        found, value = self._l1_get(key)
+        if found:
+            record_cache_lookup(self.name, "l1_hit")
+            return value
+
+        raw = _l2_call("get", self._l2_key(key))
+        if raw is not None:
+            value = orjson.loads(raw)
+            self._l1_set(key, value)
+            record_cache_lookup(self.name, "l2_hit")
+            return value
+
+        record_cache_lookup(self.name, "miss")
+        if loader is None:
+            return None
+        value = loader()
+        if value is not None:
+            self.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any):
+        self._l1_set(key, value)
+        _l2_call("set", self._l2_key(key), orjson.dumps(value), self.l2_ttl)
+
+    def invalidate(self, key: str) -> bool:
+        """모든 워커에서 key를 지웁니다. L2에서 지우거나 무효화 메시지를 보내지 못했으면 False를 반환합니다."""
+        self.evict_local(key)
+        deleted, _ = _l2_try("delete", self._l2_key(key))
+        published, _ = _l2_try("publish", INVALIDATION_CHANNEL, orjson.dumps([self.name, key]))
+        return deleted and published
+
+_caches: Dict[str, TieredCache] = {}
+# False이면 L2를 쓰지 않고 워커마다 짧은 TTL의 L1만 사용합니다 (configure_workers 참고)
+_l2_enabled = True
+_backend = None
+_backend_pid = None
+_last_l2_error = 0.0
+# 이 시각(time.monotonic)까지 L2 호출을 건너뜁니다
+_l2_open_until = 0.0
+
+def get_backend():
+    """
+    현재 프로세스의 L2 백엔드를 반환합니다.
+    fork된 워커에서는 구독 스레드가 복사되지 않으므로 프로세스마다 새로 만들고 무효화 채널을 구독합니다.
+    """
+    global _backend, _backend_pid
+    if _backend is None or _backend_pid != os.getpid():
+        backend = create_backend()
+        try:
+            backend.subscribe(INVALIDATION_CHANNEL, _on_invalidate)
+        except Exception as e:
+            logger.warning("cache_subscribe_failed", extra={"event": {"error": str(e)}})
+        _backend = backend
+        _backend_pid = os.getpid()
+        # 부모 프로세스에서 채운 L1은 무효화 메시지를 놓쳤을 수 있으므로 비웁니다
+        for cache in _caches.values():
+            cache.clear_local()
+    return _backend
+
+def _l2_try(method: str, *args) -> Tuple[bool, Any]:
+    """
+    L2 호출의 (성공 여부, 결과). L2를 쓰지 않는 설정이면 성공으로 봅니다.
+    호출이 실패하면 CACHE_L2_BREAK_SECONDS 동안은 L2를 호출하지 않고 바로 실패로 처리합니다 (서킷 브레이커).
+    """
+    global _last_l2_error, _l2_open_until
+    if not _l2_enabled:
+        return True, None
+    now = time.monotonic()
+    if now < _l2_open_until:
+        return False, None
+    try:
+        return True, getattr(get_backend(), method)(*args)
+    except Exception as e:
+        now = time.monotonic()
+        _l2_open_until = now + CACHE_L2_BREAK_SECONDS
+        if now - _last_l2_error >= L2_ERROR_LOG_INTERVAL:
+            _last_l2_error = now
+            logger.warning("cache_l2_error", extra={"event": {
+                "method": method,
+                "error": str(e),
+                "skip_seconds": CACHE_L2_BREAK_SECONDS
+            }})
+        return False, None
+
+def _l2_call(method: str, *args):
+    """L2 호출이 실패해도 요청은 계속 처리되도록 캐시 미스로 취급합니다."""
+    return _l2_try(method, *args)[1]
+
+def _on_invalidate(message: bytes):
+    try:
+        name, key = orjson.loads(message)
+    except (orjson.JSONDecodeError, ValueError):
+        return
+    cache = _caches.get(name)
+    if cache is not None:
+        cache.evict_local(key)
+
+def register_cache(name: str, l1_ttl: float, l2_ttl: float, l1_max_size: int = 10000) -> TieredCache:
+    """이름으로 구분되는 계층형 캐시를 만들고 무효화 메시지를 받을 수 있게 등록합니다."""
+    if not _l2_enabled:
+        l1_ttl = min(l1_ttl, LOCAL_CACHE_MAX_TTL)
+    cache = TieredCache(name, l1_ttl, l2_ttl, l1_max_size)
+    _caches[name] = cache
+    return cache
+
+def configure_workers(workers: int) -> bool:
+    """
+    워커 수에 맞게 캐시를 설정합니다. fork 전에 마스터에서 호출합니다.
+    Redis 없이 여러 워커를 띄우면 메모리 L2와 무효화 메시지가 각 워커 안에서만 유효해
+    로그아웃한 세션이나 바뀐 추천 목록이 다른 워커에 오래 남으므로, L2를 끄고 모든 캐시의 L1 TTL을
+    LOCAL_CACHE_MAX_TTL로 줄입니다. L2를 끄면 True를 반환합니다.
+    """
+    global _l2_enabled
+    if workers <= 1 or is_shared_backend():
+        return False
+    _l2_enabled = False
+    for cache in _caches.values():
+        cache.l1_ttl = min(cache.l1_ttl, LOCAL_CACHE_MAX_TTL)
+        cache.clear_local()
+    logger.warning("cache_l2_disabled", extra={"event": {
+        "workers": workers,
+        "cache_url": CACHE_URL,
+        "l1_max_ttl": LOCAL_CACHE_MAX_TTL
+    }})
+    return True
+
+def is_l2_enabled() -> bool:
+    return _l2_enabled
+
+def reset_backend(backend=None):
+    """L2 백엔드를 교체합니다 (테스트에서 MemoryBackend를 주입할 때 사용)."""
+    global _backend, _backend_pid, _l2_open_until
+    _backend = backend
+    _backend_pid = os.getpid() if backend is not None else None
+    _l2_open_until = 0.0
+    if backend is not None:
+        backend.subscribe(INVALIDATION_CHANNEL, _on_invalidate)
+    for cache in _caches.values():
+        cache.clear_local()
+
+# 세션 토큰 -> [google_id, 만료 시각(unix time)]
+session_cache = register_cache(
+    "session",
+    l1_ttl=float(os.environ.get("SESSION_CACHE_L1_TTL", "30")),
+    l2_ttl=float(os.environ.get("SESSION_CACHE_TTL", "600"))
+)
+# rec_id -> 추천된 question_id 목록 (계산이 끝난 추천은 바뀌지 않음)
+recommendation_cache = register_cache(
+    "recommendation",
+    l1_ttl=float(os.environ.get("RECOMMENDATION_CACHE_L1_TTL", "300")),
+    l2_ttl=float(os.environ.get("RECOMMENDATION_CACHE_TTL", "86400"))
+)
+# google_id -> 최근 추천 목록 요약
+user_recommendations_cache = register_cache(
+    "user_recommendations",
+    l1_ttl=float(os.environ.get("RECOMMENDATION_CACHE_L1_TTL", "300")),
+    l2_ttl=float(os.environ.get("RECOMMENDATION_CACHE_TTL", "86400"))
+)
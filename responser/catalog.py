@@ -0,0 +1,60 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from models.models import QuestionDB, CategoryDB
+from responser.cache import register_cache
+import hashlib
+import orjson
+import os
+
+# 카탈로그 버전을 다시 계산하기 전까지 재사용하는 시간 (초)
+CATALOG_VERSION_TTL = float(os.environ.get("CATALOG_VERSION_TTL", "30"))
+
+# 워커들이 같은 버전을 공유하도록 계층형 캐시에 저장합니다
+_version_cache = register_cache("catalog_version", l1_ttl=CATALOG_VERSION_TTL, l2_ttl=CATALOG_VERSION_TTL)
+_text_version_cache = register_cache("catalog_text_version", l1_ttl=CATALOG_VERSION_TTL, l2_ttl=CATALOG_VERSION_TTL)
+
+def compute_catalog_version(db: Session) -> str:
+    """
+    문제/카테고리 수와 최신 생성/통계 갱신 시각으로 카탈로그의 버전을 계산합니다.
+    문제나 카테고리가 추가되거나 통계가 갱신되면 버전이 바뀝니다.
+    """
+    count, last_created, last_updated = db.query(
+        func.count(QuestionDB.question_id),
+        func.max(QuestionDB.created_at),
+        func.max(QuestionDB.stats_updated_at)
+    ).one()
+    category_count, category_created = db.query(
+        func.count(CategoryDB.category_id),
+        func.max(CategoryDB.created_at)
+    ).one()
+    raw = f"{count}:{last_created}:{last_updated}:{category_count}:{category_created}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+def get_catalog_version(db: Session) -> str:
+    """
+    현재 카탈로그 버전을 반환합니다.
+    CATALOG_VERSION_TTL 동안은 캐시된 값을 재사용하며, 한 워커가 계산한 값을 다른 워커도 공유합니다.
+    """
+    return _version_cache.get("current", lambda: compute_catalog_version(db))
+
+def compute_text_version(db: Session) -> str:
+    """
+    문제 텍스트(wrong_word, right_word, explanation)와 활성 여부로 계산한 버전.
+    풀이 통계(stats_updated_at)가 갱신되어도 바뀌지 않으므로 텍스트로 만드는 인덱스의 키로 씁니다.
+    """
+    digest = hashlib.sha1()
+    for row in db.query(
+        QuestionDB.question_id, QuestionDB.is_active,
+        QuestionDB.wrong_word, QuestionDB.right_word, QuestionDB.explanation
+    ).order_by(QuestionDB.question_id):
+        digest.update(orjson.dumps(list(row)))
+    return digest.hexdigest()[:16]
+
+def get_text_version(db: Session) -> str:
+    """현재 문제 텍스트 버전. get_catalog_version과 같이 CATALOG_VERSION_TTL 동안 캐시해 워커들이 공유합니다."""
+    return _text_version_cache.get("current", lambda: compute_text_version(db))
+
+def invalidate_catalog_version():
+    """문제 데이터를 변경한 뒤 호출하면 모든 워커가 다음 요청에서 버전을 다시 계산합니다."""
+    _version_cache.invalidate("current")
+    _text_version_cache.invalidate("current")
@@ -0,0 +1,221 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from responser.metrics import record_compression, record_compression_cache
+from collections import OrderedDict
+from typing import Optional, Tuple
+import brotli
+import os
+import threading
+import time
+import zlib
+
+# 이 크기(바이트)보다 작은 응답은 압축하지 않습니다
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.environ.get("COMPRESSION_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.environ.get("COMPRESSION_BROTLI_QUALITY", "5"))
+# ETag가 있는 캐시 가능한 응답의 압축 본문을 보관할 최대 개수
+PRECOMPRESSED_CACHE_SIZE = int(os.environ.get("COMPRESSION_CACHE_SIZE", "512"))
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+# 같은 q 값이면 앞쪽 인코딩을 우선합니다
+SUPPORTED_ENCODINGS = ("br", "gzip")
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Accept-Encoding 헤더에서 사용할 인코딩을 고릅니다. 없으면 None을 반환합니다."""
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if token:
+            weights[token] = q
+
+    best, best_q = None, 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+class StreamCompressor:
+    """스트리밍 응답을 청크 단위로 압축하고, 청크마다 flush해 즉시 전달되도록 합니다."""
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(chunk) + self._compressor.flush()
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+class PrecompressedCache:
+    """(ETag, 인코딩) -> 압축된 본문 LRU 캐시"""
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str]) -> Optional[bytes]:
+        with self._lock:
+            body = self._items.get(key)
+            if body is not None:
+                self._items.move_to_end(key)
+            return body
+
+    def put(self, key: Tuple[str, str], body: bytes):
+        with self._lock:
+            self._items[key] = body
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+precompressed_cache = PrecompressedCache(PRECOMPRESSED_CACHE_SIZE)
+
+def is_cacheable(headers: Headers) -> bool:
+    cache_control = headers.get("cache-control", "")
+    return "etag" in headers and "public" in cache_control and "no-store" not in cache_control
+
+class CompressionMiddleware:
+    """
+    Accept-Encoding에 따라 응답 본문을 brotli 또는 gzip으로 압축하는 ASGI 미들웨어입니다.
+    ETag가 붙은 캐시 가능한 응답은 압축 결과를 재사용합니다.
+    """
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = CompressionResponder(send, encoding, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+class CompressionResponder:
+    def __init__(self, send: Send, encoding: str, minimum_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message: Optional[Message] = None
+        self.started = False
+        self.passthrough = False
+        self.stream: Optional[StreamCompressor] = None
+        self.original_size = 0
+        self.compressed_size = 0
+        self.cpu_seconds = 0.0
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        if not self.started:
+            self.started = True
+            await self._start(message)
+        elif self.passthrough:
+            await self._send(message)
+        else:
+            await self._send_stream_chunk(message)
+
+    async def _start(self, message: Message):
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        content_type = headers.get("content-type", "")
+        compressible = (
+            content_type.startswith(COMPRESSIBLE_TYPES)
+            and "content-encoding" not in headers
+            and self.start_message["status"] not in (204, 304)
+        )
+        if compressible and "accept-encoding" not in headers.get("vary", "").lower():
+            headers.add_vary_header("Accept-Encoding")
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not compressible or (not more_body and len(body) < self.minimum_size):
+            self.passthrough = True
+            await self._send(self.start_message)
+            await self._send(message)
+            return
+
+        headers["Content-Encoding"] = self.encoding
+
+        if more_body:
+            # 스트리밍 응답은 전체 길이를 알 수 없으므로 청크 단위로 압축합니다
+            del headers["Content-Length"]
+            self.stream = StreamCompressor(self.encoding)
+            await self._send(self.start_message)
+            await self._send_stream_chunk(message)
+            return
+
+        compressed = self._compress_whole(body, headers)
+        headers["Content-Length"] = str(len(compressed))
+        await self._send(self.start_message)
+        await self._send({"type": "http.response.body", "body": compressed})
+
+    def _compress_whole(self, body: bytes, headers: MutableHeaders) -> bytes:
+        cache_key = None
+        if is_cacheable(headers):
+            cache_key = (headers["etag"], self.encoding)
+            cached = precompressed_cache.get(cache_key)
+            record_compression_cache(cached is not None)
+            if cached is not None:
+                return cached
+
+        started = time.thread_time()
+        compressed = compress(body, self.encoding)
+        record_compression(self.encoding, len(body), len(compressed), time.thread_time() - started)
+
+        if cache_key is not None:
+            precompressed_cache.put(cache_key, compressed)
+        return compressed
+
+    async def _send_stream_chunk(self, message: Message):
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        started = time.thread_time()
+        chunk = self.stream.compress(body) if body else b""
+        if not more_body:
+            chunk += self.stream.finish()
+        self.cpu_seconds += time.thread_time() - started
+        self.original_size += len(body)
+        self.compressed_size += len(chunk)
+
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        if not more_body:
+            record_compression(self.encoding, self.original_size, self.compressed_size, self.cpu_seconds)
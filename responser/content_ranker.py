@@ -0,0 +1,110 @@
+from sqlalchemy.orm import Session
+from models.models import QuestionDB
+from responser.catalog import get_text_version
+from responser.logger import logger
+from typing import Iterable, List, Optional, Tuple
+import numpy as np
+import os
+import threading
+import time
+
+# 사용자 프로필로 쓰는 최근 오답 수
+CONTENT_RECENT_WRONG = int(os.environ.get("CONTENT_RECENT_WRONG", "10"))
+# 문자 n-gram 범위 (띄어쓰기/맞춤법 문제는 어절보다 짧은 단위에서 비슷함이 드러납니다)
+CONTENT_NGRAM_RANGE = (2, 4)
+
+class ContentIndex:
+    """
+    문제 텍스트(wrong_word, right_word, explanation)의 문자 n-gram TF-IDF 행렬.
+    행은 L2 정규화되어 있어 내적이 코사인 유사도입니다.
+    """
+    def __init__(self, version: str, question_ids: np.ndarray, active: np.ndarray, vectorizer, matrix):
+        self.version = version
+        self.question_ids = question_ids
+        self.active = active
+        self.vectorizer = vectorizer
+        self.matrix = matrix
+        self.positions = {int(question_id): position for position, question_id in enumerate(question_ids)}
+
+    def rank(self, wrong_ids: List[int], exclude: Iterable[int], top_k: int) -> List[Tuple[int, float]]:
+        """
+        오답 문제들의 TF-IDF 벡터 합과 코사인 유사도가 높은 활성 문제 top-k.
+        오답 문제가 인덱스에 없으면 빈 목록을 반환합니다.
+        """
+        rows = [self.positions[qid] for qid in wrong_ids if qid in self.positions]
+        if not rows:
+            return []
+        profile = np.asarray(self.matrix[rows].sum(axis=0)).ravel()
+        # 희소 행렬 x 벡터 한 번으로 모든 문제의 점수를 계산합니다
+        scores = self.matrix @ profile
+        scores[~self.active] = -np.inf
+        for qid in exclude:
+            position = self.positions.get(qid)
+            if position is not None:
+                scores[position] = -np.inf
+
+        k = min(top_k, int(np.isfinite(scores).sum()))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(self.question_ids[position]), float(scores[position])) for position in top]
+
+def question_text(question: QuestionDB) -> str:
+    return " ".join(filter(None, (question.wrong_word, question.right_word, question.explanation)))
+
+def build_content_index(db: Session, version: str) -> ContentIndex:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    rows = db.query(
+        QuestionDB.question_id, QuestionDB.is_active,
+        QuestionDB.wrong_word, QuestionDB.right_word, QuestionDB.explanation
+    ).order_by(QuestionDB.question_id).all()
+    vectorizer = TfidfVectorizer(analyzer="char_wb", ngram_range=CONTENT_NGRAM_RANGE, sublinear_tf=True, dtype=np.float32)
+    matrix = vectorizer.fit_transform([question_text(row) for row in rows]).tocsr()
+    return ContentIndex(
+        version,
+        np.array([row.question_id for row in rows], dtype=np.int64),
+        np.array([bool(row.is_active) for row in rows], dtype=bool),
+        vectorizer,
+        matrix
+    )
+
+_index: Optional[ContentIndex] = None
+_index_lock = threading.Lock()
+
+def get_content_index(db: Session) -> ContentIndex:
+    """
+    문제 텍스트 버전별 TF-IDF 인덱스를 반환합니다. 풀이 통계만 바뀐 경우에는 다시 만들지 않습니다.
+    버전이 바뀌면 한 스레드가 다시 만들고, 그동안 다른 요청은 이전 인덱스를 사용합니다.
+    """
+    global _index
+    version = get_text_version(db)
+    if _index is not None and _index.version == version:
+        return _index
+    if not _index_lock.acquire(blocking=_index is None):
+        return _index
+    try:
+        if _index is None or _index.version != version:
+            started = time.perf_counter()
+            _index = build_content_index(db, version)
+            logger.info("content_index_built", extra={"event": {
+                "version": version,
+                "questions": _index.matrix.shape[0],
+                "features": _index.matrix.shape[1],
+                "duration": round(time.perf_counter() - started, 3)
+            }})
+        return _index
+    finally:
+        _index_lock.release()
+
+def content_recommend(db: Session, logs: List[Tuple[int, bool]], top_k: int = 10) -> List[Tuple[int, float]]:
+    """
+    학습 기록이 적은 사용자를 위한 내용 기반 추천.
+    logs는 오래된 순의 (question_id, correct)이며, 최근 오답과 텍스트가 비슷한 안 푼 문제를 추천합니다.
+    """
+    wrong_ids = [question_id for question_id, correct in reversed(logs) if not correct][:CONTENT_RECENT_WRONG]
+    if not wrong_ids:
+        return []
+    seen = {question_id for question_id, _ in logs}
+    return get_content_index(db).rank(wrong_ids, seen, top_k)
@@ -1,5 +1,5 @@
 from fastapi import HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from typing import Any, Dict, Optional
 
 class NaratException(HTTPException):
@@ -8,14 +8,15 @@ class NaratException(HTTPException):
         status_code: int,
         detail: str,
         error_code: str,
-        data: Optional[Dict[str, Any]] = None
+        data: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None
     ):
-        super().__init__(status_code=status_code, detail=detail)
+        super().__init__(status_code=status_code, detail=detail, headers=headers)
         self.error_code = error_code
         self.data = data
 
 async def narat_exception_handler(request: Request, exc: NaratException):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "success": False,
@@ -24,7 +25,8 @@ async def narat_exception_handler(request: Request, exc: NaratException):
                 "message": exc.detail,
                 "data": exc.data
             }
-        }
+        },
+        headers=exc.headers
     )
 
 # 자주 사용되는 에러 정의
@@ -50,4 +52,22 @@ class InvalidDifficultyLevelError(NaratException):
             status_code=400,
             detail=f"Invalid difficulty level: {level}",
             error_code="INVALID_DIFFICULTY_LEVEL"
-        ) 
\ No newline at end of file
+        ) 
+
+class InferenceUnavailableError(NaratException):
+    def __init__(self, reason: str):
+        super().__init__(
+            status_code=503,
+            detail=f"Recommendation inference unavailable: {reason}",
+            error_code="INFERENCE_UNAVAILABLE"
+        )
+
+class ServiceOverloadedError(NaratException):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(
+            status_code=503,
+            detail=f"Server is busy: {reason}",
+            error_code="SERVICE_OVERLOADED",
+            data={"retry_after": retry_after},
+            headers={"Retry-After": str(retry_after)}
+        )
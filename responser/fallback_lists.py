@@ -0,0 +1,89 @@
+from sqlalchemy.orm import Session
+from models.models import FallbackListDB, UserDB, UserLogDB
+from responser.cache import register_cache
+from responser.recommender import POPULAR_QUESTIONS_SIZE, popular_question_ids
+from typing import Iterable, List, Optional
+import os
+
+# 대체 추천 목록을 다시 읽기 전까지 재사용하는 시간 (초)
+FALLBACK_LISTS_TTL = float(os.environ.get("FALLBACK_LISTS_TTL", "300"))
+# 학습 레벨별로 합친 목록의 최대 길이
+FALLBACK_MERGED_SIZE = 200
+
+# 학습 레벨별로 추천하는 난이도 (B: 낮은~중간, A: 중간~높은, S: 전체 중 높은 난이도)
+LEVEL_DIFFICULTIES = {
+    "B": (1, 2, 3),
+    "A": (2, 3, 4),
+    "S": (3, 4, 5)
+}
+DEFAULT_STUDY_LEVEL = "B"
+
+# 학습 레벨 -> 카테고리/난이도 목록을 번갈아 합친 question_id 목록
+_fallback_cache = register_cache("fallback_lists", l1_ttl=FALLBACK_LISTS_TTL, l2_ttl=FALLBACK_LISTS_TTL)
+
+def merge_lists(lists: List[List[int]], size: int) -> List[int]:
+    """여러 순위 목록을 한 개씩 번갈아 합칩니다. 이미 나온 문제는 건너뜁니다."""
+    merged, seen = [], set()
+    for rank in range(max((len(ranked) for ranked in lists), default=0)):
+        for ranked in lists:
+            if rank < len(ranked) and ranked[rank] not in seen:
+                seen.add(ranked[rank])
+                merged.append(ranked[rank])
+                if len(merged) >= size:
+                    return merged
+    return merged
+
+def level_list(db: Session, study_level: str) -> List[int]:
+    """
+    학습 레벨에 맞는 난이도의 카테고리/난이도별 목록을 번갈아 합친 대체 추천 목록.
+    목록이 아직 만들어지지 않았으면 인기 문제 목록을 사용합니다.
+    """
+    def load() -> List[int]:
+        rows = db.query(FallbackListDB).filter(
+            FallbackListDB.study_level == study_level,
+            FallbackListDB.difficulty_level.in_(LEVEL_DIFFICULTIES[study_level])
+        ).order_by(FallbackListDB.category_id, FallbackListDB.difficulty_level).all()
+        if not rows:
+            return popular_question_ids(db, POPULAR_QUESTIONS_SIZE)
+        return merge_lists([row.question_ids or [] for row in rows], FALLBACK_MERGED_SIZE)
+
+    return _fallback_cache.get(study_level, load)
+
+def invalidate_fallback_lists():
+    """목록을 다시 만든 뒤 호출하면 모든 워커가 다음 요청에서 새 목록을 읽습니다."""
+    for study_level in LEVEL_DIFFICULTIES:
+        _fallback_cache.invalidate(study_level)
+
+def fallback_question_ids(
+    db: Session,
+    google_id: str,
+    top_k: int = 10,
+    exclude: Optional[Iterable[int]] = None,
+    study_level: Optional[str] = None
+) -> List[int]:
+    """
+    모델 추론 없이 사용자의 학습 레벨에 맞는 대체 추천 top-k를 반환합니다.
+    exclude(이미 푼 문제)를 주지 않으면 후보 중 사용자가 푼 문제만 한 번 조회해 제외합니다.
+    안 푼 후보가 부족하면 푼 문제로 채웁니다.
+    """
+    if study_level is None:
+        study_level = db.query(UserDB.study_level).filter(UserDB.google_id == google_id).scalar()
+    if study_level not in LEVEL_DIFFICULTIES:
+        study_level = DEFAULT_STUDY_LEVEL
+
+    candidates = level_list(db, study_level)
+    if exclude is None:
+        exclude = {
+            row.question_id
+            for row in db.query(UserLogDB.question_id).filter(
+                UserLogDB.google_id == google_id,
+                UserLogDB.question_id.in_(candidates)
+            ).distinct()
+        }
+    else:
+        exclude = set(exclude)
+
+    unseen = [question_id for question_id in candidates if question_id not in exclude]
+    if len(unseen) < top_k:
+        unseen += [question_id for question_id in candidates if question_id in exclude][:top_k - len(unseen)]
+    return unseen[:top_k]
@@ -0,0 +1,147 @@
+from google.auth import exceptions, transport
+from google.auth.transport import requests as google_requests
+from google.oauth2 import id_token
+from requests.adapters import HTTPAdapter
+from starlette.concurrency import run_in_threadpool
+from responser.logger import logger
+from typing import Any, Dict, Mapping, Optional, Tuple
+import os
+import re
+import requests
+import threading
+import time
+
+GOOGLE_CLIENT_ID = os.environ.get("GOOGLE_CLIENT_ID")
+# Google ID 토큰 서명 인증서 주소. 로컬 테스트에서는 대역 서버 주소로 바꿉니다
+GOOGLE_CERTS_URL = os.environ.get("GOOGLE_CERTS_URL", "https://www.googleapis.com/oauth2/v1/certs")
+# 인증서 요청 타임아웃 (초)
+GOOGLE_HTTP_TIMEOUT = float(os.environ.get("GOOGLE_HTTP_TIMEOUT", "5"))
+# 워커당 유지하는 Google 연결 수
+GOOGLE_HTTP_POOL_SIZE = int(os.environ.get("GOOGLE_HTTP_POOL_SIZE", "4"))
+
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+class CachedResponse(transport.Response):
+    """캐시에 보관하는 GET 응답 (본문을 이미 읽은 상태)"""
+    def __init__(self, status: int, headers: Mapping[str, str], data: bytes):
+        self._status = status
+        self._headers = dict(headers)
+        self._data = data
+
+    @property
+    def status(self):
+        return self._status
+
+    @property
+    def headers(self):
+        return self._headers
+
+    @property
+    def data(self):
+        return self._data
+
+def cache_lifetime(headers: Mapping[str, str]) -> float:
+    """Cache-Control의 max-age에서 Age를 뺀 남은 유효 시간 (초). 캐시하면 안 되는 응답이면 0입니다."""
+    cache_control = headers.get("Cache-Control", headers.get("cache-control", "")).lower()
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return 0.0
+    match = _MAX_AGE.search(cache_control)
+    if match is None:
+        return 0.0
+    age = headers.get("Age", headers.get("age", "0"))
+    try:
+        return max(float(match.group(1)) - float(age), 0.0)
+    except ValueError:
+        return float(match.group(1))
+
+class CachingRequest(transport.Request):
+    """
+    google-auth transport. 연결을 재사용하는 requests.Session으로 요청하고,
+    GET 응답(서명 인증서)은 Cache-Control max-age 동안 메모리에 보관해 다시 요청하지 않습니다.
+    갱신에 실패하면 만료된 응답이라도 있으면 그것을 사용합니다.
+    """
+    def __init__(self, session: Optional[requests.Session] = None, timeout: float = GOOGLE_HTTP_TIMEOUT):
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=GOOGLE_HTTP_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.timeout = timeout
+        self._request = google_requests.Request(session=session)
+        self._cache: Dict[str, Tuple[CachedResponse, float]] = {}
+        # 만료 시점에 동시에 들어온 로그인들이 인증서를 한 번만 받아오도록 갱신을 직렬화합니다
+        self._lock = threading.Lock()
+
+    def _fresh(self, url: str) -> Optional[CachedResponse]:
+        item = self._cache.get(url)
+        if item is not None and item[1] > time.monotonic():
+            return item[0]
+        return None
+
+    def __call__(self, url, method="GET", body=None, headers=None, timeout=None, **kwargs):
+        timeout = timeout or self.timeout
+        if method != "GET" or body is not None:
+            return self._request(url, method=method, body=body, headers=headers, timeout=timeout, **kwargs)
+
+        cached = self._fresh(url)
+        if cached is not None:
+            return cached
+        with self._lock:
+            cached = self._fresh(url)
+            if cached is not None:
+                return cached
+            stale = self._cache.get(url)
+            try:
+                response = self._request(url, method="GET", headers=headers, timeout=timeout, **kwargs)
+            except exceptions.TransportError as e:
+                if stale is None:
+                    raise
+                logger.warning("google_certs_stale", extra={"event": {"url": url, "error": str(e)}})
+                return stale[0]
+            if response.status != 200:
+                if stale is not None:
+                    logger.warning("google_certs_stale", extra={"event": {"url": url, "status": response.status}})
+                    return stale[0]
+                return response
+
+            result = CachedResponse(response.status, response.headers, response.data)
+            lifetime = cache_lifetime(result.headers)
+            if lifetime > 0:
+                self._cache[url] = (result, time.monotonic() + lifetime)
+            return result
+
+class GoogleTokenVerifier:
+    """Google 로그인 ID 토큰 검증기. 프로세스마다 하나를 만들어 인증서 캐시와 연결을 공유합니다."""
+    def __init__(
+        self,
+        client_id: Optional[str] = GOOGLE_CLIENT_ID,
+        certs_url: str = GOOGLE_CERTS_URL,
+        request: Optional[transport.Request] = None
+    ):
+        self.client_id = client_id
+        self.certs_url = certs_url
+        self.request = request or CachingRequest()
+
+    def verify(self, credential: str) -> Mapping[str, Any]:
+        """
+        토큰의 서명, 만료, audience, issuer를 확인하고 내용을 반환합니다.
+        토큰이 올바르지 않으면 ValueError, 인증서를 받아올 수 없으면 google.auth.exceptions.TransportError를 발생시킵니다.
+        """
+        info = id_token.verify_token(credential, self.request, audience=self.client_id, certs_url=self.certs_url)
+        if info.get("iss") not in GOOGLE_ISSUERS:
+            raise ValueError(f"Wrong issuer: {info.get('iss')}")
+        return info
+
+    async def verify_async(self, credential: str) -> Mapping[str, Any]:
+        """서명 검증과 인증서 요청이 이벤트 루프를 막지 않도록 스레드 풀에서 검증합니다."""
+        return await run_in_threadpool(self.verify, credential)
+
+_verifier: Optional[GoogleTokenVerifier] = None
+
+def get_verifier() -> GoogleTokenVerifier:
+    global _verifier
+    if _verifier is None:
+        _verifier = GoogleTokenVerifier()
+    return _verifier
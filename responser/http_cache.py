@@ -0,0 +1,69 @@
+from fastapi import Depends, Request
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+from dbmanage import get_db
+from responser.catalog import get_catalog_version
+from urllib.parse import urlencode
+import hashlib
+import os
+
+# 카탈로그 응답을 브라우저/nginx가 재검증 없이 재사용할 수 있는 시간 (초)
+CATALOG_CACHE_MAX_AGE = int(os.environ.get("CATALOG_CACHE_MAX_AGE", "60"))
+
+NO_STORE_HEADERS = {"Cache-Control": "no-store"}
+
+class NotModified(Exception):
+    """If-None-Match가 현재 ETag와 일치할 때 발생시켜 304 응답으로 변환합니다."""
+    def __init__(self, etag: str):
+        self.etag = etag
+
+async def not_modified_handler(request: Request, exc: NotModified):
+    return Response(status_code=304, headers=catalog_cache_headers(exc.etag))
+
+def compute_etag(catalog_version: str, request: Request) -> str:
+    """
+    카탈로그 버전, 경로, 정렬된 쿼리 파라미터로 약한 ETag를 만듭니다.
+    같은 내용을 압축하지 않은 본문과 gzip/br 본문으로 보내므로 바이트 단위로 같다고 약속하는 강한 ETag는 쓰지 않습니다.
+    """
+    query = urlencode(sorted(request.query_params.multi_items()))
+    raw = f"{catalog_version}:{request.url.path}:{query}"
+    return 'W/"' + hashlib.sha1(raw.encode("utf-8")).hexdigest() + '"'
+
+def _opaque_tag(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match 헤더 값 중 하나라도 ETag와 일치하는지 확인합니다."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        # If-None-Match는 약한 비교를 사용합니다 (RFC 7232 3.2)
+        if _opaque_tag(candidate) == _opaque_tag(etag):
+            return True
+    return False
+
+def catalog_cache_headers(etag: str) -> dict:
+    # 압축 여부와 관계없이 같은 ETag를 쓰므로, 공유 캐시가 인코딩별로 따로 저장하도록 항상 Vary를 붙입니다
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={CATALOG_CACHE_MAX_AGE}",
+        "Vary": "Accept-Encoding"
+    }
+
+def catalog_etag(request: Request, db: Session = Depends(get_db)) -> str:
+    """
+    카탈로그 엔드포인트용 의존성입니다.
+    요청의 If-None-Match가 현재 ETag와 일치하면 본문을 만들지 않고 304로 응답합니다.
+    """
+    etag = compute_etag(get_catalog_version(db), request)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise NotModified(etag)
+    return etag
+
+def with_catalog_headers(response: Response, etag: str) -> Response:
+    """카탈로그 응답에 ETag와 Cache-Control 헤더를 붙입니다."""
+    response.headers.update(catalog_cache_headers(etag))
+    return response
@@ -0,0 +1,218 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from responser.error_handler import InferenceUnavailableError
+from responser.logger import logger
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import numpy as np
+import os
+
+# 추론 전용 프로세스 수 (웹 워커마다). 0이면 웹 프로세스 안의 스레드에서 추론합니다
+INFERENCE_WORKERS = int(os.environ.get("INFERENCE_WORKERS", "1"))
+# 동시에 처리 중일 수 있는 추론 요청 수 (공유 메모리 슬롯 수). 넘는 요청은 슬롯이 빌 때까지 기다립니다
+INFERENCE_CONCURRENCY = int(os.environ.get("INFERENCE_CONCURRENCY", str(max(INFERENCE_WORKERS, 1) * 2)))
+# 슬롯 대기 + 추론에 허용하는 시간 (초)
+INFERENCE_TIMEOUT = float(os.environ.get("INFERENCE_TIMEOUT", "5"))
+# 추론 프로세스 하나가 사용할 torch 스레드 수
+INFERENCE_THREADS = int(os.environ.get("INFERENCE_THREADS", "1"))
+
+class Slot:
+    """
+    요청 하나가 추론 프로세스와 주고받는 공유 메모리 영역입니다.
+    앞쪽은 입력 시퀀스(int64 x max_seq_length), 뒤쪽은 출력 점수(float32 x num_items + 1)입니다.
+    """
+    def __init__(self, max_seq_length: int, num_scores: int, name: Optional[str] = None):
+        size = max_seq_length * 8 + num_scores * 4
+        self.shm = SharedMemory(name=name, create=name is None, size=size)
+        self.input = np.ndarray((max_seq_length,), dtype=np.int64, buffer=self.shm.buf, offset=0)
+        self.output = np.ndarray((num_scores,), dtype=np.float32, buffer=self.shm.buf, offset=max_seq_length * 8)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self, unlink: bool = False):
+        # numpy 뷰가 버퍼를 잡고 있으면 close가 실패하므로 먼저 놓습니다
+        self.input = self.output = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+# ---- 추론 프로세스 쪽 ----
+
+_recommender = None
+_slots: Dict[str, Slot] = {}
+
+def _init_worker(num_items: int, threads: int):
+    """추론 프로세스가 시작될 때 모델을 한 번 로드합니다."""
+    global _recommender
+    import signal
+    import torch
+    from responser.recommender import load_recommender
+
+    # Ctrl+C 등 프로세스 그룹 시그널은 웹 프로세스가 받아 풀을 정리하므로 여기서는 무시합니다
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    torch.set_num_threads(threads)
+    _recommender = load_recommender(num_items)
+
+def _attach(name: str) -> Slot:
+    slot = _slots.get(name)
+    if slot is None:
+        model = _recommender.model
+        # spawn된 추론 프로세스는 웹 프로세스의 resource_tracker를 함께 쓰므로,
+        # 슬롯은 웹 프로세스가 close()에서 지울 때까지 유지됩니다
+        slot = Slot(model.max_seq_length, model.num_items + 1, name=name)
+        _slots[name] = slot
+    return slot
+
+def _infer(name: str, length: int) -> Optional[Tuple]:
+    """슬롯의 입력 시퀀스로 점수를 계산해 같은 슬롯의 출력 영역에 쓰고, 모델이 불러온 체크포인트를 반환합니다."""
+    slot = _attach(name)
+    sequence = slot.input[:length].tolist()
+    slot.output[:] = _recommender.scores(sequence)
+    return _recommender.checkpoint_source
+
+def _ping() -> Tuple[int, Optional[Tuple]]:
+    return os.getpid(), _recommender.checkpoint_source
+
+def _item_embeddings() -> Tuple[Optional[Tuple], np.ndarray]:
+    return _recommender.checkpoint_source, _recommender.model.item_embeddings.weight.numpy()
+
+# ---- 웹 프로세스 쪽 ----
+
+class InferencePool:
+    """
+    SasRec 추론을 별도 프로세스 풀에서 실행합니다.
+    요청/응답 텐서는 공유 메모리 슬롯으로 주고받아 직렬화 비용 없이 전달하며,
+    이벤트 루프는 결과를 기다리는 동안 다른 요청을 처리합니다.
+    """
+    def __init__(
+        self,
+        num_items: int,
+        max_seq_length: int,
+        workers: int = INFERENCE_WORKERS,
+        concurrency: int = INFERENCE_CONCURRENCY,
+        timeout: float = INFERENCE_TIMEOUT,
+        threads: int = INFERENCE_THREADS
+    ):
+        self.num_items = num_items
+        self.max_seq_length = max_seq_length
+        self.workers = workers
+        self.timeout = timeout
+        self.threads = threads
+        self._slots = [Slot(max_seq_length, num_items + 1) for _ in range(concurrency)]
+        self._free = list(self._slots)
+        self._available = asyncio.Semaphore(concurrency)
+        self._executor = self._new_executor()
+        # 추론 프로세스의 모델이 불러온 체크포인트 (경로, 수정 시각). 모델이 로드되기 전에는 None입니다
+        self.checkpoint_source: Optional[Tuple] = None
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # 스레드가 있는 웹 프로세스를 fork하지 않도록 spawn으로 새 인터프리터를 띄웁니다
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.num_items, self.threads)
+        )
+
+    async def warm_up(self):
+        """모든 추론 프로세스를 띄우고 모델 로드가 끝날 때까지 기다립니다."""
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*[
+            loop.run_in_executor(self._executor, _ping) for _ in range(self.workers)
+        ])
+        self.checkpoint_source = results[0][1]
+        logger.info("inference_pool_ready", extra={"event": {
+            "workers": sorted({pid for pid, _ in results}),
+            "checkpoint": self.checkpoint_source
+        }})
+
+    async def item_embeddings(self) -> Tuple[Optional[Tuple], np.ndarray]:
+        """추론 프로세스 모델의 (체크포인트, item_embeddings 가중치)"""
+        loop = asyncio.get_running_loop()
+        source, embeddings = await loop.run_in_executor(self._executor, _item_embeddings)
+        self.checkpoint_source = source
+        return source, embeddings
+
+    def _release(self, slot: Slot):
+        self._free.append(slot)
+        self._available.release()
+
+    async def scores(self, sequence: List[int]) -> np.ndarray:
+        """시퀀스의 아이템별 점수를 추론 프로세스에서 계산해 반환합니다."""
+        sequence = sequence[-self.max_seq_length:]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+
+        try:
+            await asyncio.wait_for(self._available.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            raise InferenceUnavailableError("no free inference slot")
+        slot = self._free.pop()
+
+        slot.input[:len(sequence)] = sequence
+        try:
+            future = self._executor.submit(_infer, slot.name, len(sequence))
+        except BrokenProcessPool:
+            self._release(slot)
+            self._restart()
+            raise InferenceUnavailableError("inference worker crashed")
+        wrapped = asyncio.wrap_future(future)
+
+        try:
+            # shield: 시간이 초과돼도 실행 중인 추론은 취소되지 않으므로 끝날 때까지 슬롯을 잡아둡니다
+            await asyncio.wait_for(asyncio.shield(wrapped), max(deadline - loop.time(), 0))
+        except asyncio.TimeoutError:
+            if future.cancel():
+                self._release(slot)
+            else:
+                wrapped.add_done_callback(lambda _: self._release(slot))
+            raise InferenceUnavailableError("inference timed out")
+        except BrokenProcessPool:
+            self._release(slot)
+            self._restart()
+            raise InferenceUnavailableError("inference worker crashed")
+
+        self.checkpoint_source = future.result()
+        try:
+            return slot.output.copy()
+        finally:
+            self._release(slot)
+
+    def _restart(self):
+        logger.warning("inference_pool_restart")
+        self._executor.shutdown(wait=False)
+        self._executor = self._new_executor()
+        # 새 추론 프로세스는 그때의 체크포인트 파일을 다시 읽으므로 다음 추론 결과로 다시 확인합니다
+        self.checkpoint_source = None
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        for slot in self._slots:
+            slot.close(unlink=True)
+        self._slots = []
+        self._free = []
+
+_pool: Optional[InferencePool] = None
+
+def get_inference_pool(num_items: int, max_seq_length: int) -> Optional[InferencePool]:
+    """현재 웹 프로세스의 추론 풀을 반환합니다. INFERENCE_WORKERS가 0이면 None입니다."""
+    global _pool
+    if INFERENCE_WORKERS <= 0:
+        return None
+    if _pool is None:
+        _pool = InferencePool(num_items, max_seq_length)
+    return _pool
+
+def current_inference_pool() -> Optional[InferencePool]:
+    """이미 만들어진 추론 풀. 만들지 않았으면 None입니다."""
+    return _pool
+
+def shutdown_inference_pool():
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        _pool = None
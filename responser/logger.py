@@ -1,59 +1,154 @@
 import logging
-import time
-from fastapi import Request
-from typing import Callable
+import logging.handlers
+import atexit
+import copy
+import datetime
 import json
+import os
+import queue
+import re
 
-# 로거 설정
-logger = logging.getLogger("narat")
-logger.setLevel(logging.INFO)
-
-# 파일 핸들러
-file_handler = logging.FileHandler("narat.log")
-file_handler.setLevel(logging.INFO)
-
-# 포맷터
-formatter = logging.Formatter(
-    '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-file_handler.setFormatter(formatter)
-
-# 핸들러 추가
-logger.addHandler(file_handler)
-
-async def log_request_middleware(request: Request, call_next: Callable):
-    # 요청 시작 시간
-    start_time = time.time()
-    
-    # 요청 정보 로깅
-    logger.info(f"Request: {request.method} {request.url}")
-    if request.headers.get("content-type") == "application/json":
+# 로깅 설정
+LOG_FILE = os.environ.get("LOG_FILE", "narat.log")
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+LOG_MAX_BYTES = int(os.environ.get("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.environ.get("LOG_BACKUP_COUNT", "5"))
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+# 요청 본문을 기록할 비율 (0.0 ~ 1.0)과 기록할 최대 바이트 수
+LOG_BODY_SAMPLE_RATE = float(os.environ.get("LOG_BODY_SAMPLE_RATE", "0.0"))
+LOG_BODY_MAX_BYTES = int(os.environ.get("LOG_BODY_MAX_BYTES", "2048"))
+# 본문 기록 시 값을 가릴 필드
+LOG_REDACT_FIELDS = [
+    field.strip()
+    for field in os.environ.get("LOG_REDACT_FIELDS", "session_token,credential,token,password").split(",")
+    if field.strip()
+]
+
+_redact_pattern = re.compile(
+    r'("(?:' + "|".join(re.escape(field) for field in LOG_REDACT_FIELDS) + r')"\s*:\s*)("(?:[^"\\]|\\.)*"?|[^,}\s]+)'
+) if LOG_REDACT_FIELDS else None
+_redact_query_pattern = re.compile(
+    r'((?:^|&)(?:' + "|".join(re.escape(field) for field in LOG_REDACT_FIELDS) + r')=)[^&]*'
+) if LOG_REDACT_FIELDS else None
+
+class JsonFormatter(logging.Formatter):
+    """로그 레코드를 한 줄짜리 JSON으로 변환합니다."""
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": datetime.datetime.fromtimestamp(record.created, tz=datetime.timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        event = getattr(record, "event", None)
+        if event:
+            data.update(event)
+        exc_text = getattr(record, "exc_formatted", None)
+        if exc_text is None and record.exc_info:
+            exc_text = self.formatException(record.exc_info)
+        if exc_text:
+            data["exc_info"] = exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+_traceback_formatter = logging.Formatter()
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """큐가 가득 차면 요청 처리를 막지 않고 로그를 버립니다."""
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        기본 prepare는 예외 정보를 메시지에 합치고 exc_info를 지우므로,
+        traceback을 exc_formatted 필드로 따로 남겨 JsonFormatter가 exc_info로 기록하게 합니다.
+        """
+        exc_text = None
+        if record.exc_info:
+            exc_text = _traceback_formatter.formatException(record.exc_info)
+        if record.stack_info:
+            exc_text = "\n".join(filter(None, (exc_text, record.stack_info)))
+        prepared = copy.copy(record)
+        prepared.message = record.getMessage()
+        prepared.msg = prepared.message
+        prepared.args = None
+        prepared.exc_info = None
+        prepared.exc_text = None
+        prepared.stack_info = None
+        prepared.exc_formatted = exc_text
+        return prepared
+
+    def enqueue(self, record: logging.LogRecord):
         try:
-            body = await request.json()
-            logger.info(f"Request body: {json.dumps(body)}")
-        except:
-            pass
-    
-    # 응답 처리
-    response = await call_next(request)
-    
-    # 처리 시간 계산
-    process_time = time.time() - start_time
-    
-    # 응답 정보 로깅
-    logger.info(
-        f"Response: {request.method} {request.url} - "
-        f"Status: {response.status_code} - "
-        f"Process Time: {process_time:.2f}s"
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+# 로거 설정: 요청 스레드는 큐에 넣기만 하고, 파일 쓰기는 백그라운드 리스너가 담당합니다
+logger = logging.getLogger("narat")
+logger.setLevel(LOG_LEVEL)
+logger.propagate = False
+
+log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+queue_handler = DroppingQueueHandler(log_queue)
+logger.addHandler(queue_handler)
+
+_listener = None
+_listener_pid = None
+
+def start_log_listener():
+    """
+    파일 핸들러를 가진 백그라운드 로그 리스너를 시작합니다.
+    현재 프로세스에서 이미 실행 중이면 무시하며, fork된 워커에서는 새로 시작합니다.
+    """
+    global _listener, _listener_pid
+    if _listener is not None and _listener_pid == os.getpid():
+        return
+    file_handler = logging.handlers.RotatingFileHandler(
+        LOG_FILE,
+        maxBytes=LOG_MAX_BYTES,
+        backupCount=LOG_BACKUP_COUNT,
+        encoding="utf-8"
     )
-    
-    return response
+    file_handler.setFormatter(JsonFormatter())
+    _listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    _listener.start()
+    _listener_pid = os.getpid()
+
+def stop_log_listener():
+    """큐에 남은 로그를 모두 기록한 뒤 리스너를 종료합니다."""
+    global _listener
+    if _listener is None or _listener_pid != os.getpid():
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+atexit.register(stop_log_listener)
+
+def redact_body(body: bytes) -> str:
+    """요청 본문을 최대 LOG_BODY_MAX_BYTES까지 잘라 민감한 필드 값을 가립니다."""
+    text = body[:LOG_BODY_MAX_BYTES].decode("utf-8", errors="replace")
+    if _redact_pattern is not None:
+        text = _redact_pattern.sub(r'\1"***"', text)
+    if len(body) > LOG_BODY_MAX_BYTES:
+        text += "...(truncated)"
+    return text
+
+def redact_query(query: str) -> str:
+    """쿼리 문자열에서 민감한 파라미터 값을 가립니다."""
+    if _redact_query_pattern is None:
+        return query
+    return _redact_query_pattern.sub(r'\1***', query)
 
 def log_error(error: Exception, context: dict = None):
     """에러 로깅 헬퍼 함수"""
-    error_data = {
-        "error_type": type(error).__name__,
-        "error_message": str(error),
-        "context": context or {}
-    }
-    logger.error(json.dumps(error_data)) 
\ No newline at end of file
+    logger.error(
+        "error",
+        extra={"event": {
+            "error_type": type(error).__name__,
+            "error_message": str(error),
+            "context": context or {}
+        }}
+    )
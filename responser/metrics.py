@@ -1,7 +1,14 @@
-from prometheus_client import Counter, Histogram, generate_latest
+from prometheus_client import Counter, Gauge, Histogram, CollectorRegistry, CONTENT_TYPE_LATEST, REGISTRY, generate_latest, multiprocess
 from fastapi import Request
-from typing import Callable
-import time
+from fastapi.responses import Response
+from starlette.types import Scope
+import os
+
+# gunicorn 등 다중 워커 실행 시 각 워커의 메트릭을 이 디렉터리에 기록하고 합산합니다
+PROMETHEUS_MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+# 라우트에 매칭되지 않은 요청(404, 슬래시 리다이렉트 등)의 endpoint 라벨
+UNMATCHED_ROUTE = "<unmatched>"
 
 # 메트릭 정의
 REQUEST_COUNT = Counter(
@@ -19,42 +26,206 @@ REQUEST_LATENCY = Histogram(
 QUESTION_VIEWS = Counter(
     'narat_question_views_total',
     'Total number of question views',
-    ['question_id']
+    ['category_id']
 )
 
 RECOMMENDATION_REQUESTS = Counter(
     'narat_recommendation_requests_total',
     'Total number of recommendation requests',
-    ['user_id']
-)
-
-async def metrics_middleware(request: Request, call_next: Callable):
-    start_time = time.time()
-    
-    # 요청 처리
-    response = await call_next(request)
-    
-    # 처리 시간 계산
-    duration = time.time() - start_time
-    
-    # 메트릭 기록
+    ['rec_type']
+)
+
+STAGE_LATENCY = Histogram(
+    'narat_request_stage_duration_seconds',
+    'Time spent in an instrumented stage of a request handler',
+    ['endpoint', 'stage'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+
+DB_QUERIES = Histogram(
+    'narat_db_queries_per_request',
+    'Number of SQL statements executed per request',
+    ['endpoint'],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+)
+
+DB_TIME = Histogram(
+    'narat_db_time_per_request_seconds',
+    'Total SQL execution time per request',
+    ['endpoint'],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+
+QUERY_BUDGET_EXCEEDED = Counter(
+    'narat_db_query_budget_exceeded_total',
+    'Requests that executed more SQL statements than SQL_QUERY_BUDGET',
+    ['endpoint']
+)
+
+SLOW_QUERIES = Counter(
+    'narat_db_slow_queries_total',
+    'SQL statements slower than SLOW_QUERY_THRESHOLD_MS'
+)
+
+COMPRESSION_RATIO = Histogram(
+    'narat_response_compression_ratio',
+    'Compressed size divided by original size of response bodies',
+    ['encoding'],
+    buckets=(0.05, 0.1, 0.15, 0.2, 0.3, 0.4, 0.5, 0.6, 0.8, 1.0)
+)
+
+COMPRESSION_CPU_SECONDS = Histogram(
+    'narat_response_compression_cpu_seconds',
+    'CPU time spent compressing response bodies',
+    ['encoding'],
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+)
+
+COMPRESSION_CACHE = Counter(
+    'narat_response_compression_cache_total',
+    'Pre-compressed body cache lookups for cacheable responses',
+    ['result']
+)
+
+CACHE_LOOKUPS = Counter(
+    'narat_cache_lookups_total',
+    'Tiered cache lookups by cache name and the tier that answered',
+    ['cache', 'result']
+)
+
+ADMISSION_IN_FLIGHT = Gauge(
+    'narat_admission_in_flight',
+    'Requests currently admitted by an admission limiter',
+    ['limiter'],
+    multiprocess_mode='livesum'
+)
+
+ADMISSION_QUEUE_DEPTH = Gauge(
+    'narat_admission_queue_depth',
+    'Requests waiting for an admission limiter slot',
+    ['limiter'],
+    multiprocess_mode='livesum'
+)
+
+ADMISSION_WAIT = Histogram(
+    'narat_admission_queue_wait_seconds',
+    'Time requests spent waiting in an admission limiter queue',
+    ['limiter'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+
+ADMISSION_SHED = Counter(
+    'narat_admission_shed_total',
+    'Requests shed by an admission limiter',
+    ['limiter', 'reason']
+)
+
+RECOMMENDATION_FALLBACKS = Counter(
+    'narat_recommendation_fallbacks_total',
+    'Recommendation responses served from the cheap fallback ranking instead of the model',
+    ['reason']
+)
+
+_route_templates = {}
+
+def route_template(scope: Scope) -> str:
+    """
+    요청이 매칭된 라우트의 경로 템플릿(예: /api/questions/{question_id})을 반환합니다.
+    실제 경로 대신 템플릿을 라벨로 사용해 메트릭 시계열 수를 라우트 수로 제한합니다.
+    """
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return UNMATCHED_ROUTE
+    if not _route_templates and "app" in scope:
+        for route in scope["app"].router.routes:
+            if hasattr(route, "endpoint"):
+                _route_templates.setdefault(route.endpoint, route.path)
+    return _route_templates.get(endpoint, UNMATCHED_ROUTE)
+
+def record_request(method: str, endpoint: str, status: int, duration: float):
+    """HTTP 요청 수와 처리 시간 기록"""
     REQUEST_COUNT.labels(
-        method=request.method,
-        endpoint=request.url.path,
-        status=response.status_code
+        method=method,
+        endpoint=endpoint,
+        status=status
     ).inc()
-    
+
     REQUEST_LATENCY.labels(
-        method=request.method,
-        endpoint=request.url.path
+        method=method,
+        endpoint=endpoint
     ).observe(duration)
-    
-    return response
 
-def record_question_view(question_id: int):
-    """문제 조회 메트릭 기록"""
-    QUESTION_VIEWS.labels(question_id=str(question_id)).inc()
+def record_stages(endpoint: str, stages: dict):
+    """요청 처리 단계별 소요 시간 기록"""
+    for stage, duration in stages.items():
+        STAGE_LATENCY.labels(endpoint=endpoint, stage=stage).observe(duration)
+
+def record_db_usage(endpoint: str, queries: int, seconds: float, over_budget: bool):
+    """요청당 SQL 실행 수와 DB 시간 기록"""
+    DB_QUERIES.labels(endpoint=endpoint).observe(queries)
+    DB_TIME.labels(endpoint=endpoint).observe(seconds)
+    if over_budget:
+        QUERY_BUDGET_EXCEEDED.labels(endpoint=endpoint).inc()
+
+def record_slow_query():
+    """느린 쿼리 수 기록"""
+    SLOW_QUERIES.inc()
+
+def metrics_registry() -> CollectorRegistry:
+    """
+    노출할 레지스트리를 반환합니다.
+    다중 프로세스 모드에서는 매 요청마다 모든 워커의 메트릭 파일을 합산합니다.
+    """
+    if not PROMETHEUS_MULTIPROC_DIR:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+async def metrics_endpoint(request: Request) -> Response:
+    """Prometheus 스크레이프용 /metrics 엔드포인트"""
+    return Response(generate_latest(metrics_registry()), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+def mark_worker_dead(pid: int):
+    """종료된 워커의 gauge 파일을 정리합니다. gunicorn child_exit 훅에서 호출합니다."""
+    if PROMETHEUS_MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
+
+def record_question_view(category_id: int):
+    """문제 조회 메트릭 기록 (카테고리 단위)"""
+    QUESTION_VIEWS.labels(category_id=str(category_id)).inc()
+
+def record_recommendation_request(rec_type: int):
+    """추천 요청 메트릭 기록 (추천 유형 단위)"""
+    RECOMMENDATION_REQUESTS.labels(rec_type=str(rec_type)).inc()
+
+def record_compression(encoding: str, original_size: int, compressed_size: int, cpu_seconds: float):
+    """응답 압축률과 압축에 사용한 CPU 시간 기록"""
+    if original_size > 0:
+        COMPRESSION_RATIO.labels(encoding=encoding).observe(compressed_size / original_size)
+    COMPRESSION_CPU_SECONDS.labels(encoding=encoding).observe(cpu_seconds)
+
+def record_compression_cache(hit: bool):
+    """사전 압축 본문 캐시 적중 여부 기록"""
+    COMPRESSION_CACHE.labels(result="hit" if hit else "miss").inc()
+
+def record_cache_lookup(cache: str, result: str):
+    """계층형 캐시 조회 결과 기록 (l1_hit, l2_hit, miss)"""
+    CACHE_LOOKUPS.labels(cache=cache, result=result).inc()
+
+def record_admission_state(limiter: str, in_flight: int, queue_depth: int):
+    """리미터의 처리 중 요청 수와 대기열 길이 기록"""
+    ADMISSION_IN_FLIGHT.labels(limiter=limiter).set(in_flight)
+    ADMISSION_QUEUE_DEPTH.labels(limiter=limiter).set(queue_depth)
+
+def record_admission_wait(limiter: str, seconds: float):
+    """대기열에서 기다린 시간 기록"""
+    ADMISSION_WAIT.labels(limiter=limiter).observe(seconds)
+
+def record_shed(limiter: str, reason: str):
+    """리미터가 거절한 요청 수 기록 (queue_full, queue_timeout)"""
+    ADMISSION_SHED.labels(limiter=limiter, reason=reason).inc()
 
-def record_recommendation_request(user_id: str):
-    """추천 요청 메트릭 기록"""
-    RECOMMENDATION_REQUESTS.labels(user_id=user_id).inc() 
\ No newline at end of file
+def record_recommendation_fallback(reason: str):
+    """모델 대신 대체 추천을 응답한 수 기록"""
+    RECOMMENDATION_FALLBACKS.labels(reason=reason).inc()
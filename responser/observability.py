@@ -0,0 +1,91 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from responser.logger import logger, redact_body, redact_query, LOG_BODY_SAMPLE_RATE, LOG_BODY_MAX_BYTES
+from responser.metrics import record_db_usage, record_request, record_stages, route_template
+from responser import query_stats
+from responser.tracing import SERVER_TIMING_ENABLED, begin_request, current_stages, end_request, server_timing_header
+import random
+import time
+
+class ObservabilityMiddleware:
+    """
+    요청 로그와 HTTP 메트릭을 함께 기록하는 순수 ASGI 미들웨어입니다.
+    요청당 한 번만 시간을 재고, 응답 본문은 버퍼링하지 않고 그대로 전달합니다.
+    본문은 샘플링된 요청에 한해 앱이 읽는 receive 스트림을 복사해 기록합니다.
+    라우트에서 tracing.stage()로 측정한 단계별 시간과 SQL 실행 수/시간도 함께 기록하며,
+    server_timing이 켜져 있으면 Server-Timing 응답 헤더로 내보냅니다.
+    """
+    def __init__(
+        self,
+        app: ASGIApp,
+        body_sample_rate: float = LOG_BODY_SAMPLE_RATE,
+        server_timing: bool = SERVER_TIMING_ENABLED
+    ):
+        self.app = app
+        self.body_sample_rate = body_sample_rate
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status_code = 500
+        body_chunks = []
+        body_size = 0
+
+        sample_body = self.body_sample_rate > 0 and random.random() < self.body_sample_rate
+
+        async def receive_wrapper() -> Message:
+            nonlocal body_size
+            message = await receive()
+            if message["type"] == "http.request" and body_size < LOG_BODY_MAX_BYTES:
+                chunk = message.get("body", b"")
+                body_chunks.append(chunk)
+                body_size += len(chunk)
+            return message
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    headers = list(message.get("headers", []))
+                    timing = server_timing_header(current_stages(), time.perf_counter() - start_time)
+                    headers.append((b"server-timing", timing.encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        token = begin_request()
+        query_token = query_stats.begin_request()
+        try:
+            await self.app(scope, receive_wrapper if sample_body else receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start_time
+            stages = end_request(token)
+            queries = query_stats.end_request(query_token)
+            over_budget = queries.count > query_stats.SQL_QUERY_BUDGET
+            endpoint = route_template(scope)
+            record_request(scope["method"], endpoint, status_code, duration)
+            record_stages(endpoint, stages)
+            record_db_usage(endpoint, queries.count, queries.total_seconds, over_budget)
+
+            event = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "endpoint": endpoint,
+                "query": redact_query(scope.get("query_string", b"").decode("latin-1")),
+                "status": status_code,
+                "duration_ms": round(duration * 1000, 2),
+                "stages_ms": {name: round(value * 1000, 2) for name, value in stages.items()},
+                "db_queries": queries.count,
+                "db_ms": round(queries.total_seconds * 1000, 2),
+                "db_slow": queries.slow,
+                "client": scope["client"][0] if scope.get("client") else None
+            }
+            if sample_body and body_chunks:
+                event["body"] = redact_body(b"".join(body_chunks))
+            if over_budget:
+                logger.warning("query_budget_exceeded", extra={"event": event})
+            else:
+                logger.info("request", extra={"event": event})
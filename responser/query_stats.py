@@ -0,0 +1,119 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from responser.logger import logger
+from responser.metrics import record_slow_query
+from typing import List, Optional
+import os
+import time
+
+# 이 시간(ms) 이상 걸린 쿼리는 문장과 파라미터 형태를 로그로 남깁니다
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get("SLOW_QUERY_THRESHOLD_MS", "200"))
+# 요청당 허용 쿼리 수. 넘으면 경고 로그와 메트릭을 남깁니다 (N+1 탐지용)
+SQL_QUERY_BUDGET = int(os.environ.get("SQL_QUERY_BUDGET", "15"))
+
+class QueryStats:
+    """요청(또는 측정 구간) 동안 실행된 쿼리 수와 DB 시간"""
+    def __init__(self, keep_statements: bool = False):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.slow = 0
+        self.statements: Optional[List[str]] = [] if keep_statements else None
+
+    def add(self, statement: str, duration: float):
+        self.count += 1
+        self.total_seconds += duration
+        if self.statements is not None:
+            self.statements.append(statement)
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("narat_query_stats", default=None)
+
+def begin_request():
+    """요청 단위 쿼리 집계를 시작합니다. 반환된 토큰은 end_request에 넘깁니다."""
+    return _current.set(QueryStats())
+
+def end_request(token) -> QueryStats:
+    stats = _current.get() or QueryStats()
+    _current.reset(token)
+    return stats
+
+def params_shape(parameters) -> object:
+    """파라미터 값 대신 형태(타입과 개수)만 남깁니다."""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return {"rows": len(parameters), "row": params_shape(parameters[0])}
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("narat_query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["narat_query_start"].pop()
+    duration = time.perf_counter() - started
+
+    stats = _current.get()
+    if stats is not None:
+        stats.add(statement, duration)
+
+    if duration * 1000 >= SLOW_QUERY_THRESHOLD_MS:
+        if stats is not None:
+            stats.slow += 1
+        record_slow_query()
+        logger.warning(
+            "slow_query",
+            extra={"event": {
+                "duration_ms": round(duration * 1000, 2),
+                "statement": " ".join(statement.split())[:2000],
+                "params_shape": params_shape(parameters),
+                "executemany": executemany
+            }}
+        )
+
+def _handle_error(context):
+    # 실패한 쿼리는 after_cursor_execute가 호출되지 않으므로 시작 시각을 여기서 버립니다
+    if context.connection is not None:
+        starts = context.connection.info.get("narat_query_start")
+        if starts:
+            starts.pop()
+
+def install_query_hooks(engine: Engine):
+    """엔진에 쿼리 집계용 이벤트 훅을 등록합니다."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+@contextmanager
+def count_queries(engine: Engine = None):
+    """
+    with 블록 안에서 engine으로 실행된 모든 쿼리를 셉니다 (테스트용).
+
+        with count_queries() as stats:
+            client.get("/api/categories/")
+        assert stats.count == 2
+    """
+    if engine is None:
+        from database import engine
+    stats = QueryStats(keep_statements=True)
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        stats.add(statement, 0.0)
+
+    event.listen(engine, "after_cursor_execute", _count)
+    try:
+        yield stats
+    finally:
+        event.remove(engine, "after_cursor_execute", _count)
+
+def assert_query_count(client, method: str, url: str, expected: int, engine: Engine = None, **kwargs):
+    """엔드포인트 한 번 호출에 실행되는 쿼리 수가 expected와 같은지 확인하고 응답을 반환합니다."""
+    with count_queries(engine) as stats:
+        response = client.request(method, url, **kwargs)
+    assert stats.count == expected, (
+        f"{method} {url}: expected {expected} queries, got {stats.count}\n" + "\n".join(stats.statements)
+    )
+    return response
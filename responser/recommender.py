@@ -0,0 +1,183 @@
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from models.models import QuestionDB
+from models.sasrec import SasRecRecommender
+from responser.cache import register_cache
+from responser.content_ranker import get_content_index
+from responser.inference import INFERENCE_WORKERS, current_inference_pool, get_inference_pool, shutdown_inference_pool
+from responser.logger import logger
+from responser.serializers import (
+    QUESTION_DETAIL_FIELDS, QUESTION_LIST_FIELDS, QUESTION_SUMMARY_FIELDS, question_fragments
+)
+from typing import List, Optional, Tuple
+import numpy as np
+import os
+import threading
+import torch
+
+# 학습된 SasRec 가중치 파일 (state_dict). 없으면 초기화된 모델을 사용합니다
+SASREC_CHECKPOINT = os.environ.get("SASREC_CHECKPOINT")
+# 체크포인트가 없을 때 가중치 초기화에 쓰는 시드. 모든 웹/추론 프로세스가 같은 모델로 추천하게 합니다
+SASREC_INIT_SEED = int(os.environ.get("SASREC_INIT_SEED", "0"))
+# 모델에 입력하는 최근 학습 기록 수
+SASREC_MAX_SEQ_LENGTH = int(os.environ.get("SASREC_MAX_SEQ_LENGTH", "50"))
+# 인기 문제 목록을 다시 계산하기 전까지 재사용하는 시간 (초)
+POPULAR_QUESTIONS_TTL = float(os.environ.get("POPULAR_QUESTIONS_TTL", "300"))
+# 워커당 torch 연산 스레드 수. 비워두면 CPU 수를 워커 수로 나눈 값을 사용합니다
+TORCH_NUM_THREADS = os.environ.get("TORCH_NUM_THREADS")
+
+_recommender: Optional[SasRecRecommender] = None
+_num_items: Optional[int] = None
+_lock = threading.Lock()
+
+# 풀이 수 기준 인기 문제 ID 목록 (과부하 시 대체 추천)
+_popular_cache = register_cache("popular_questions", l1_ttl=POPULAR_QUESTIONS_TTL, l2_ttl=POPULAR_QUESTIONS_TTL)
+POPULAR_QUESTIONS_SIZE = 100
+
+def checkpoint_source() -> Optional[Tuple]:
+    """SASREC_CHECKPOINT 파일의 (경로, 수정 시각). 체크포인트가 없으면 None입니다."""
+    if not SASREC_CHECKPOINT:
+        return None
+    try:
+        return (SASREC_CHECKPOINT, os.stat(SASREC_CHECKPOINT).st_mtime)
+    except OSError:
+        return (SASREC_CHECKPOINT, None)
+
+def load_recommender(num_items: int) -> SasRecRecommender:
+    """
+    SasRec 모델을 만들고 체크포인트가 있으면 불러와 추론 모드로 둡니다.
+    체크포인트가 없으면 SASREC_INIT_SEED로 초기화해, 프로세스마다 다른 무작위 가중치로 추천하지 않게 합니다.
+    """
+    with torch.random.fork_rng():
+        torch.manual_seed(SASREC_INIT_SEED)
+        recommender = SasRecRecommender(num_items=num_items, max_seq_length=SASREC_MAX_SEQ_LENGTH, device="cpu")
+    # 유사 문제 인덱스가 같은 가중치로 만들어졌는지 비교할 수 있도록 불러온 체크포인트를 기록합니다
+    recommender.checkpoint_source = checkpoint_source()
+    if SASREC_CHECKPOINT:
+        state = torch.load(SASREC_CHECKPOINT, map_location="cpu")
+        recommender.model.load_state_dict(state)
+    recommender.model.eval()
+    # 추론만 하므로 gradient 버퍼가 생기지 않게 하고, fork 후 가중치 페이지가 복사되지 않게 합니다
+    for parameter in recommender.model.parameters():
+        parameter.requires_grad_(False)
+    return recommender
+
+def get_num_items(db: Session) -> int:
+    """모델의 아이템 수(전체 문제 수). 프로세스에서 처음 한 번만 조회합니다."""
+    global _num_items
+    if _num_items is None:
+        _num_items = db.query(QuestionDB).count()
+    return _num_items
+
+def get_recommender(db: Session) -> SasRecRecommender:
+    """프로세스 전역 추천 모델을 반환합니다. 미리 로드되지 않았으면 처음 호출할 때 만듭니다."""
+    global _recommender
+    if _recommender is None:
+        with _lock:
+            if _recommender is None:
+                _recommender = load_recommender(get_num_items(db))
+    return _recommender
+
+def loaded_checkpoint_source() -> Optional[Tuple]:
+    """
+    이 웹 프로세스의 추천을 계산하는 모델(추론 프로세스 또는 프로세스 안의 모델)이 불러온 체크포인트.
+    아직 모델을 불러오지 않았으면 None입니다.
+    """
+    if INFERENCE_WORKERS > 0:
+        pool = current_inference_pool()
+        return pool.checkpoint_source if pool is not None else None
+    return _recommender.checkpoint_source if _recommender is not None else None
+
+async def loaded_item_embeddings() -> Tuple[Optional[Tuple], np.ndarray]:
+    """추천을 계산하는 모델의 (체크포인트, item_embeddings 가중치). loaded_checkpoint_source가 None이 아닐 때 호출합니다."""
+    if INFERENCE_WORKERS > 0:
+        return await current_inference_pool().item_embeddings()
+    return _recommender.checkpoint_source, _recommender.model.item_embeddings.weight.detach().numpy()
+
+async def recommend(db: Session, sequence: List[int], top_k: int = 10) -> List[Tuple[int, float]]:
+    """
+    학습 기록 시퀀스로 top-k 문제를 추천합니다.
+    추론은 추론 프로세스 풀(INFERENCE_WORKERS=0이면 스레드 풀)에서 실행해 이벤트 루프를 막지 않습니다.
+    """
+    pool = get_inference_pool(get_num_items(db), SASREC_MAX_SEQ_LENGTH)
+    if pool is None:
+        return await run_in_threadpool(get_recommender(db).recommend, sequence, top_k)
+    scores = await pool.scores(sequence)
+    return SasRecRecommender.top_k_items(scores, sequence, top_k)
+
+def popular_question_ids(db: Session, top_k: int = 10) -> List[int]:
+    """
+    풀이 수가 많은 활성 문제 top-k를 반환합니다.
+    모델 추론 없이 캐시된 목록을 잘라 쓰므로 추천 계산이 밀릴 때 대체 추천으로 사용합니다.
+    """
+    def load() -> List[int]:
+        return [
+            row.question_id
+            for row in db.query(QuestionDB.question_id).filter(
+                QuestionDB.is_active == True
+            ).order_by(QuestionDB.total_attempts.desc(), QuestionDB.question_id).limit(POPULAR_QUESTIONS_SIZE)
+        ]
+
+    return _popular_cache.get("all", load)[:top_k]
+
+def warm_catalog(db: Session) -> int:
+    """모든 문제의 응답용 JSON 조각을 미리 인코딩해 캐시에 넣습니다. 문제 수를 반환합니다."""
+    question_ids = [row.question_id for row in db.query(QuestionDB.question_id).order_by(QuestionDB.question_id)]
+    for fields in (QUESTION_SUMMARY_FIELDS, QUESTION_LIST_FIELDS, QUESTION_DETAIL_FIELDS):
+        question_fragments(db, question_ids, fields)
+    return len(question_ids)
+
+def preload(db: Session):
+    """
+    추천 모델, 문제 카탈로그, 유사 문제 인덱스와 내용 기반 추천 인덱스를 미리 메모리에 올립니다.
+    gunicorn 마스터에서 fork 전에 호출하면 워커들이 같은 메모리 페이지를 copy-on-write로 공유합니다.
+    """
+    # 추론 프로세스 풀을 쓰면 모델은 추론 프로세스에서 로드하므로 웹 프로세스에는 올리지 않습니다
+    if INFERENCE_WORKERS <= 0:
+        get_recommender(db)
+    questions = warm_catalog(db)
+    from responser.similarity import load_similarity_index
+    # 체크포인트가 없으면 유사 문제 인덱스를 만들지 않습니다
+    similarity = load_similarity_index()
+    content = get_content_index(db)
+    logger.info("preloaded", extra={"event": {
+        "num_items": get_num_items(db),
+        "checkpoint": SASREC_CHECKPOINT,
+        "catalog_questions": questions,
+        "similarity_index": similarity.method if similarity else None,
+        "content_features": content.matrix.shape[1]
+    }})
+
+def configure_torch_threads(workers: int = 1):
+    """
+    워커 하나가 사용할 torch 스레드 수를 설정합니다.
+    여러 워커가 각자 모든 코어를 쓰려고 하면 스레드가 과도하게 경쟁하므로 CPU 수를 워커 수로 나눕니다.
+    """
+    threads = int(TORCH_NUM_THREADS) if TORCH_NUM_THREADS else max(1, (os.cpu_count() or 1) // max(workers, 1))
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # 이미 병렬 연산이 실행된 프로세스에서는 바꿀 수 없습니다
+        pass
+    return threads
+
+async def start_inference():
+    """웹 워커 시작 시 추론 프로세스 풀을 띄우고 모델 로드를 기다립니다."""
+    if INFERENCE_WORKERS <= 0:
+        return
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        num_items = get_num_items(db)
+    except Exception as e:
+        # DB에 연결할 수 없으면 첫 추천 요청에서 풀을 만듭니다
+        logger.warning("inference_pool_deferred", extra={"event": {"error": str(e)}})
+        return
+    finally:
+        db.close()
+    await get_inference_pool(num_items, SASREC_MAX_SEQ_LENGTH).warm_up()
+
+def stop_inference():
+    shutdown_inference_pool()
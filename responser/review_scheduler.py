@@ -0,0 +1,149 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from models.models import QuestionDB, ReviewStateDB
+from typing import Dict, Iterable, List, Optional, Tuple
+import datetime
+import os
+
+# 틀린 문제를 다시 보여주기까지의 시간 (분)
+REVIEW_RELEARN_MINUTES = float(os.environ.get("REVIEW_RELEARN_MINUTES", "10"))
+# 이 시간(초) 안에 맞히면 확실히 아는 것으로 봅니다
+REVIEW_FAST_SECONDS = float(os.environ.get("REVIEW_FAST_SECONDS", "5"))
+# 복습 간격 상한 (일)
+REVIEW_MAX_INTERVAL_DAYS = 365
+
+MIN_EASE = 1.3
+DEFAULT_EASE = 2.5
+
+def quality(correct: bool, delaytime: Optional[float]) -> int:
+    """풀이 결과를 SM-2 응답 품질(0~5)로 바꿉니다. 빨리 맞히면 5, 맞히면 4, 틀리면 1"""
+    if not correct:
+        return 1
+    if delaytime is not None and delaytime <= REVIEW_FAST_SECONDS:
+        return 5
+    return 4
+
+def schedule(state: ReviewStateDB, correct: bool, delaytime: Optional[float], now: datetime.datetime):
+    """
+    SM-2로 state의 다음 복습 일정을 갱신합니다.
+    틀리면 연속 횟수를 0으로 돌리고 REVIEW_RELEARN_MINUTES 뒤에 다시 보여주며,
+    맞히면 1일, 6일, 이후에는 이전 간격 x ease로 간격을 늘립니다.
+    """
+    grade = quality(correct, delaytime)
+    ease = state.ease or DEFAULT_EASE
+    state.ease = max(MIN_EASE, ease + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02))
+
+    if grade < 3:
+        state.repetitions = 0
+        state.lapses = (state.lapses or 0) + 1
+        state.interval_days = 0.0
+        state.due_at = now + datetime.timedelta(minutes=REVIEW_RELEARN_MINUTES)
+    else:
+        repetitions = (state.repetitions or 0) + 1
+        if repetitions == 1:
+            interval = 1.0
+        elif repetitions == 2:
+            interval = 6.0
+        else:
+            interval = (state.interval_days or 1.0) * state.ease
+        state.repetitions = repetitions
+        state.interval_days = min(interval, REVIEW_MAX_INTERVAL_DAYS)
+        state.due_at = now + datetime.timedelta(days=state.interval_days)
+    state.last_reviewed_at = now
+
+def database_now(db: Session) -> datetime.datetime:
+    """
+    DB 서버의 현재 시각(now()). 학습 기록의 created_at 기본값과 같은 시계입니다.
+    PostgreSQL에서는 트랜잭션 시작 시각이며, SQLite는 시간대 정보 없이 UTC 시각을 돌려줍니다.
+    """
+    now = db.query(func.now()).scalar()
+    return now.replace(tzinfo=datetime.timezone.utc) if now.tzinfo is None else now
+
+def lock_states(db: Session, google_id: str, question_ids: Iterable[int], create_ids: Iterable[int] = ()) -> Dict[int, ReviewStateDB]:
+    """
+    사용자의 question_ids 복습 일정을 잠그고(SELECT ... FOR UPDATE) question_id별로 반환합니다.
+    create_ids 중 일정이 없는 문제는 먼저 빈 일정(last_reviewed_at이 None)을 INSERT ... ON CONFLICT DO NOTHING으로 만들어,
+    같은 문제를 동시에 처음 틀린 요청이 둘이어도 기본 키 충돌 없이 한 행을 차례로 갱신합니다.
+    """
+    create_ids = sorted(set(create_ids))
+    if create_ids:
+        if db.bind.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        db.execute(insert(ReviewStateDB).on_conflict_do_nothing(index_elements=["google_id", "question_id"]), [
+            {"google_id": google_id, "question_id": question_id, "repetitions": 0, "lapses": 0,
+             "interval_days": 0.0, "ease": DEFAULT_EASE}
+            for question_id in create_ids
+        ])
+    return {
+        state.question_id: state
+        for state in db.query(ReviewStateDB).filter(
+            ReviewStateDB.google_id == google_id,
+            ReviewStateDB.question_id.in_(sorted(set(question_ids)))
+        ).order_by(ReviewStateDB.question_id).with_for_update().populate_existing()
+    }
+
+def record_reviews(
+    db: Session,
+    google_id: str,
+    answers: List[Tuple[int, bool, Optional[float], datetime.datetime]]
+) -> int:
+    """
+    (question_id, correct, delaytime, 풀이 시각) 목록을 순서대로 복습 일정에 반영합니다.
+    관련된 복습 일정을 한 번의 IN 쿼리로 잠가 읽고 메모리에서 갱신하며, 갱신하거나 만든 일정 수를 반환합니다.
+    복습 일정은 처음 틀린 문제부터 만들며, 일정이 없는 문제를 맞히면 아무것도 하지 않습니다.
+    커밋은 호출하는 쪽에서 학습 기록과 함께 합니다.
+    """
+    states = lock_states(
+        db, google_id,
+        [question_id for question_id, *_ in answers],
+        [question_id for question_id, correct, *_ in answers if not correct]
+    )
+    touched = set()
+    for question_id, correct, delaytime, answered_at in answers:
+        state = states.get(question_id)
+        # 빈 일정은 아직 한 번도 틀리지 않은 문제입니다
+        if state is None or (state.last_reviewed_at is None and correct):
+            continue
+        schedule(state, correct, delaytime, answered_at)
+        touched.add(question_id)
+    return len(touched)
+
+def record_review(
+    db: Session,
+    google_id: str,
+    question_id: int,
+    correct: bool,
+    delaytime: Optional[float],
+    now: Optional[datetime.datetime] = None
+) -> int:
+    """풀이 결과 하나를 복습 일정에 반영합니다."""
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    return record_reviews(db, google_id, [(question_id, correct, delaytime, now)])
+
+def due_reviews(db: Session, google_id: str, limit: int, now: Optional[datetime.datetime] = None) -> Tuple[List[ReviewStateDB], int]:
+    """
+    복습할 때가 된 문제를 오래 기다린 순으로 최대 limit개와 전체 개수를 반환합니다.
+    (google_id, due_at) 인덱스 범위를 읽고, 비활성 문제는 문제 기본 키로 확인해 제외합니다.
+    """
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    due = db.query(ReviewStateDB).join(
+        QuestionDB, QuestionDB.question_id == ReviewStateDB.question_id
+    ).filter(
+        ReviewStateDB.google_id == google_id,
+        ReviewStateDB.due_at <= now,
+        QuestionDB.is_active == True
+    )
+    return due.order_by(ReviewStateDB.due_at).limit(limit).all(), due.with_entities(func.count()).scalar()
+
+def next_due_at(db: Session, google_id: str, now: Optional[datetime.datetime] = None) -> Optional[datetime.datetime]:
+    """다음에 복습할 때가 되는 시각. 예정된 복습이 없으면 None입니다 (비활성 문제 제외)."""
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    return db.query(func.min(ReviewStateDB.due_at)).join(
+        QuestionDB, QuestionDB.question_id == ReviewStateDB.question_id
+    ).filter(
+        ReviewStateDB.google_id == google_id,
+        ReviewStateDB.due_at > now,
+        QuestionDB.is_active == True
+    ).scalar()
@@ -1,15 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 import datetime
 import models
 from dbmanage import get_db
 from sqlalchemy.orm import Session
-from google.auth.transport import requests
-from google.oauth2 import id_token
+from google.auth import exceptions
 from uuid import uuid4
 import os
 from dotenv import load_dotenv
+from responser.google_verifier import get_verifier
+from responser.sessions import create_session, invalidate_session, refresh_token, resolve_session, session_id_of
 
 header = "/api/auth"
 router = APIRouter(
@@ -17,7 +18,6 @@ router = APIRouter(
     tags   = ['auth']
 )
 load_dotenv()
-GOOGLE_CLIENT_ID = os.environ.get('GOOGLE_CLIENT_ID')
 
 @router.get('/')
 async def root():
@@ -32,8 +32,8 @@ class GoogleLogin(BaseModel):
 @router.post('/google')
 async def google_login(item: GoogleLogin, db: Session = Depends(get_db)):
     try:
-        # 받은 토큰 검증
-        id_info = id_token.verify_oauth2_token(item.credential, requests.Request(), GOOGLE_CLIENT_ID)
+        # 받은 토큰 검증 (서명 인증서는 캐시하고, 검증은 스레드 풀에서 실행)
+        id_info = await get_verifier().verify_async(item.credential)
 
         # 이메일과 이름 추출
         email = id_info.get("email")
@@ -58,46 +58,57 @@ async def google_login(item: GoogleLogin, db: Session = Depends(get_db)):
             db.commit()
 
         # 세션 생성
-        session = models.SessionDB(
-            session_id=str(uuid4()),
-            google_id=user.google_id
-        )
-        db.add(session)
-        db.commit()
+        token = create_session(db, user.google_id)
 
-        return JSONResponse({
-            "token": session.session_id,
+        return ORJSONResponse({
+            "token": token,
             "display_name": user.display_name,
             "study_level": user.study_level
         })
     
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid token")
+    except exceptions.TransportError:
+        raise HTTPException(status_code=503, detail="Google certificates unavailable")
 
 class Verify(BaseModel):
     session_token: str
 
 @router.post('/verify')
 async def verify_session(item: Verify, db: Session = Depends(get_db)):
-    session = db.query(models.SessionDB).filter(models.SessionDB.session_id == item.session_token).first()
-    if session is None:
+    google_id = resolve_session(db, item.session_token)
+    user = db.query(models.UserDB).filter(models.UserDB.google_id == google_id).first() if google_id else None
+    if user is None:
         raise HTTPException(status_code=400, detail="Invalid session token")
     
-    return JSONResponse({
+    result = {
         "is_valid": True,
-        "display_name": session.session_owner.display_name,
-        "study_level": session.session_owner.study_level
-    })
+        "display_name": user.display_name,
+        "study_level": user.study_level
+    }
+    # 서명 토큰의 만료가 가까우면 연장한 토큰을 함께 내려줍니다
+    token = refresh_token(db, item.session_token)
+    if token is not None:
+        result["token"] = token
+    return ORJSONResponse(result)
 
 @router.post('/logout')
 async def logout(item: Verify, db: Session = Depends(get_db)):
-    session = db.query(models.SessionDB).filter(models.SessionDB.session_id == item.session_token).first()
+    session_id = session_id_of(item.session_token)
+    session = db.query(models.SessionDB).filter(models.SessionDB.session_id == session_id).first() if session_id else None
     if session is None:
         raise HTTPException(status_code=400, detail="Invalid session token")
     
+    # 세션 캐시를 지우지 못하면 다른 워커에서 토큰이 계속 통과하므로, 세션을 지우지 않고 503으로 다시 시도하게 합니다
     db.delete(session)
+    db.flush()
+    if not invalidate_session(item.session_token):
+        db.rollback()
+        raise HTTPException(status_code=503, detail="Session cache unavailable")
     db.commit()
-    return JSONResponse({
+    # 지우는 사이에 다른 요청이 DB에서 다시 캐시했을 수 있으므로 커밋 후 한 번 더 지웁니다
+    invalidate_session(item.session_token)
+    return ORJSONResponse({
         "success": True
     })
 
@@ -107,11 +118,9 @@ async def test_session_create(item: GoogleLogin, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Invalid environment")
     data = db.query(models.UserDB).filter(models.UserDB.email == "test@test.com").first()
     if data is not None:
-        session = models.SessionDB(session_id=str(uuid4()), google_id=data.google_id)
-        db.add(session)
-        db.commit()
-        return JSONResponse({
-            "session_token": session.session_id,
+        token = create_session(db, data.google_id)
+        return ORJSONResponse({
+            "session_token": token,
             "display_name": data.display_name,
             "study_level" : data.study_level
         })
@@ -1,9 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from models.models import CategoryDB, QuestionDB
 from dbmanage import get_db
+from responser.tracing import stage
+from responser.http_cache import catalog_etag, with_catalog_headers
 from typing import List, Optional
+from responser.serializers import QUESTION_LIST_FIELDS, question_fragments
 
 header = "/api/categories"
 router = APIRouter(
@@ -12,30 +16,43 @@ router = APIRouter(
 )
 
 @router.get('/')
-async def get_categories(db: Session = Depends(get_db)):
+async def get_categories(db: Session = Depends(get_db), etag: str = Depends(catalog_etag)):
     """
     카테고리 목록을 조회합니다.
     """
-    categories = db.query(CategoryDB).all()
+    question_counts = db.query(
+        QuestionDB.category_id,
+        func.count(QuestionDB.question_id).label("question_count")
+    ).group_by(QuestionDB.category_id).subquery()
+
+    categories = db.query(
+        CategoryDB,
+        func.coalesce(question_counts.c.question_count, 0)
+    ).outerjoin(
+        question_counts,
+        question_counts.c.category_id == CategoryDB.category_id
+    ).order_by(CategoryDB.category_id).all()
     
     result = []
-    for category in categories:
+    for category, question_count in categories:
         result.append({
             "category_id": category.category_id,
             "name": category.name,
             "description": category.description,
-            "question_count": db.query(QuestionDB).filter(
-                QuestionDB.category_id == category.category_id
-            ).count()
+            "question_count": question_count
         })
     
-    return JSONResponse({
+    return with_catalog_headers(ORJSONResponse({
         "success": True,
         "categories": result
-    })
+    }), etag)
 
 @router.get('/{category_id}')
-async def get_category(category_id: int, db: Session = Depends(get_db)):
+async def get_category(
+    category_id: int,
+    db: Session = Depends(get_db),
+    etag: str = Depends(catalog_etag)
+):
     """
     특정 카테고리의 상세 정보를 조회합니다.
     """
@@ -48,7 +65,7 @@ async def get_category(category_id: int, db: Session = Depends(get_db)):
         QuestionDB.category_id == category_id
     ).count()
     
-    return JSONResponse({
+    return with_catalog_headers(ORJSONResponse({
         "success": True,
         "category": {
             "category_id": category.category_id,
@@ -56,7 +73,7 @@ async def get_category(category_id: int, db: Session = Depends(get_db)):
             "description": category.description,
             "question_count": question_count
         }
-    })
+    }), etag)
 
 @router.get('/{category_id}/questions')
 async def get_category_questions(
@@ -64,7 +81,8 @@ async def get_category_questions(
     difficulty_level: Optional[int] = None,
     limit: int = Query(10, ge=1, le=50),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    etag: str = Depends(catalog_etag)
 ):
     """
     특정 카테고리의 문제 목록을 조회합니다.
@@ -74,39 +92,28 @@ async def get_category_questions(
     if category is None:
         raise HTTPException(status_code=404, detail="Category not found")
     
-    query = db.query(QuestionDB).filter(QuestionDB.category_id == category_id)
+    query = db.query(QuestionDB.question_id).filter(QuestionDB.category_id == category_id)
     
     if difficulty_level is not None:
         query = query.filter(QuestionDB.difficulty_level == difficulty_level)
     
-    total = query.count()
-    questions = query.offset(offset).limit(limit).all()
-    
-    result = []
-    for question in questions:
-        result.append({
-            "question_id": question.question_id,
-            "wrong_sentence": question.wrong_sentence,
-            "right_sentence": question.right_sentence,
-            "wrong_word": question.wrong_word,
-            "right_word": question.right_word,
-            "location": question.location,
-            "difficulty_level": question.difficulty_level,
-            "explanation": question.explanation,
-            "is_active": question.is_active,
-            "total_attempts": question.total_attempts,
-            "correct_rate": question.correct_rate,
-            "avg_time_spent": question.avg_time_spent,
-            "dropout_rate": question.dropout_rate
-        })
+    with stage("query"):
+        total = query.count()
+        question_ids = [
+            row.question_id
+            for row in query.order_by(QuestionDB.question_id).offset(offset).limit(limit)
+        ]
+
+    with stage("hydrate"):
+        questions = question_fragments(db, question_ids, QUESTION_LIST_FIELDS)
     
-    return JSONResponse({
+    return with_catalog_headers(ORJSONResponse({
         "success": True,
         "category": {
             "category_id": category.category_id,
             "name": category.name,
             "description": category.description
         },
-        "questions": result,
+        "questions": questions,
         "total": total
-    }) 
\ No newline at end of file
+    }), etag) 
\ No newline at end of file
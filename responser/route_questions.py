@@ -1,15 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 import datetime
 from models.models import QuestionDB, CategoryDB
 from dbmanage import get_db
+from responser.tracing import stage
+from responser.similarity import SIMILARITY_TOP_K, get_similarity_index
+from responser.http_cache import NO_STORE_HEADERS, catalog_etag, with_catalog_headers
 from sqlalchemy.orm import Session
 from uuid import uuid4
 import os
 from dotenv import load_dotenv
 from typing import List, Dict, Optional
 import random
+from responser.serializers import (
+    QUESTION_SUMMARY_FIELDS,
+    QUESTION_LIST_FIELDS,
+    QUESTION_DETAIL_FIELDS,
+    question_fragments,
+    question_fragment
+)
 
 header = "/api/questions"
 router = APIRouter(
@@ -23,79 +33,35 @@ async def get_questions(
     difficulty_level: Optional[int] = None,
     limit: int = Query(10, ge=1, le=50),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    etag: str = Depends(catalog_etag)
 ):
     """
     문제 목록을 조회합니다.
     """
-    query = db.query(QuestionDB)
-    
+    query = db.query(QuestionDB.question_id)
+
     if category_id is not None:
         query = query.filter(QuestionDB.category_id == category_id)
-    
+
     if difficulty_level is not None:
         query = query.filter(QuestionDB.difficulty_level == difficulty_level)
-    
-    total = query.count()
-    questions = query.offset(offset).limit(limit).all()
-    
-    result = []
-    for question in questions:
-        result.append({
-            "question_id": question.question_id,
-            "category_id": question.category_id,
-            "wrong_sentence": question.wrong_sentence,
-            "right_sentence": question.right_sentence,
-            "wrong_word": question.wrong_word,
-            "right_word": question.right_word,
-            "location": question.location,
-            "difficulty_level": question.difficulty_level,
-            "explanation": question.explanation,
-            "is_active": question.is_active,
-            "total_attempts": question.total_attempts,
-            "correct_rate": question.correct_rate,
-            "avg_time_spent": question.avg_time_spent,
-            "dropout_rate": question.dropout_rate
-        })
-    
-    return JSONResponse({
-        "success": True,
-        "questions": result,
-        "total": total
-    })
 
-@router.get('/{question_id}')
-async def get_question(question_id: int, db: Session = Depends(get_db)):
-    """
-    특정 문제의 상세 정보를 조회합니다.
-    """
-    question = db.query(QuestionDB).filter(QuestionDB.question_id == question_id).first()
-    
-    if question is None:
-        raise HTTPException(status_code=404, detail="Question not found")
-    
-    return JSONResponse({
+    with stage("query"):
+        total = query.count()
+        question_ids = [
+            row.question_id
+            for row in query.order_by(QuestionDB.question_id).offset(offset).limit(limit)
+        ]
+
+    with stage("hydrate"):
+        questions = question_fragments(db, question_ids, QUESTION_LIST_FIELDS)
+
+    return with_catalog_headers(ORJSONResponse({
         "success": True,
-        "question": {
-            "question_id": question.question_id,
-            "category_id": question.category_id,
-            "wrong_sentence": question.wrong_sentence,
-            "right_sentence": question.right_sentence,
-            "wrong_word": question.wrong_word,
-            "right_word": question.right_word,
-            "location": question.location,
-            "difficulty_level": question.difficulty_level,
-            "explanation": question.explanation,
-            "is_active": question.is_active,
-            "total_attempts": question.total_attempts,
-            "correct_rate": question.correct_rate,
-            "avg_time_spent": question.avg_time_spent,
-            "dropout_rate": question.dropout_rate,
-            "daily_stats": question.daily_stats,
-            "stats_updated_at": question.stats_updated_at,
-            "created_at": question.created_at
-        }
-    })
+        "questions": questions,
+        "total": total
+    }), etag)
 
 @router.get('/random')
 async def get_random_question(
@@ -106,33 +72,83 @@ async def get_random_question(
     """
     랜덤 문제를 조회합니다.
     """
-    query = db.query(QuestionDB)
-    
+    query = db.query(QuestionDB.question_id)
+
     if category_id is not None:
         query = query.filter(QuestionDB.category_id == category_id)
-    
+
     if difficulty_level is not None:
         query = query.filter(QuestionDB.difficulty_level == difficulty_level)
-    
-    questions = query.all()
-    
-    if not questions:
+
+    question_ids = [row.question_id for row in query.all()]
+
+    if not question_ids:
         raise HTTPException(status_code=404, detail="No questions found")
-    
-    question = random.choice(questions)
-    
-    return JSONResponse({
+
+    question_id = random.choice(question_ids)
+
+    return ORJSONResponse({
         "success": True,
-        "question": {
-            "question_id": question.question_id,
-            "category_id": question.category_id,
-            "wrong_sentence": question.wrong_sentence,
-            "right_sentence": question.right_sentence,
-            "wrong_word": question.wrong_word,
-            "right_word": question.right_word,
-            "location": question.location,
-            "difficulty_level": question.difficulty_level,
-            "explanation": question.explanation
-        }
-    })
+        "question": question_fragment(db, question_id, QUESTION_SUMMARY_FIELDS)
+    }, headers=NO_STORE_HEADERS)
+
+@router.get('/{question_id}')
+async def get_question(
+    question_id: int,
+    db: Session = Depends(get_db),
+    etag: str = Depends(catalog_etag)
+):
+    """
+    특정 문제의 상세 정보를 조회합니다.
+    """
+    question = question_fragment(db, question_id, QUESTION_DETAIL_FIELDS)
+
+    if question is None:
+        raise HTTPException(status_code=404, detail="Question not found")
+
+    return with_catalog_headers(ORJSONResponse({
+        "success": True,
+        "question": question
+    }), etag)
+
+@router.get('/{question_id}/similar')
+async def get_similar_questions(
+    question_id: int,
+    limit: int = Query(10, ge=1, le=SIMILARITY_TOP_K),
+    db: Session = Depends(get_db)
+):
+    """
+    SasRec 문제 임베딩이 비슷한 문제를 조회합니다.
+    미리 계산한 유사도 인덱스에서 읽으므로 모델 추론을 하지 않습니다. 비활성 문제는 제외합니다.
+    학습된 체크포인트(SASREC_CHECKPOINT)가 없으면 503을 반환합니다.
+    """
+    with stage("index"):
+        # 인덱스가 아직 없거나 추천 모델이 새 체크포인트를 불러온 경우에만 만드는 데 시간이 걸립니다
+        index = await get_similarity_index()
+        if index is None:
+            raise HTTPException(status_code=503, detail="Similarity index unavailable")
+        neighbors = index.similar(question_id, SIMILARITY_TOP_K)
 
+    if not neighbors:
+        if db.query(QuestionDB.question_id).filter(QuestionDB.question_id == question_id).first() is None:
+            raise HTTPException(status_code=404, detail="Question not found")
+
+    with stage("query"):
+        active = {
+            row.question_id
+            for row in db.query(QuestionDB.question_id).filter(
+                QuestionDB.question_id.in_([neighbor for neighbor, _ in neighbors]),
+                QuestionDB.is_active == True
+            )
+        } if neighbors else set()
+        neighbors = [(neighbor, score) for neighbor, score in neighbors if neighbor in active][:limit]
+
+    with stage("hydrate"):
+        questions = question_fragments(db, [neighbor for neighbor, _ in neighbors], QUESTION_SUMMARY_FIELDS)
+
+    return ORJSONResponse({
+        "success": True,
+        "question_id": question_id,
+        "questions": questions,
+        "similarities": [round(score, 4) for _, score in neighbors]
+    })
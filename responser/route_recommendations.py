@@ -1,16 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 import datetime
-from models.models import RecommendationsDB, RecommendationQuestionsDB, QuestionDB, UserLogDB, SessionDB
+from models.models import RecommendationsDB, RecommendationQuestionsDB, QuestionDB, UserLogDB
 from dbmanage import get_db
 from sqlalchemy.orm import Session
 from uuid import uuid4
 import os
 from dotenv import load_dotenv
-import torch
-from models.sasrec import SasRecRecommender
 from typing import List, Dict, Optional
+from starlette.concurrency import run_in_threadpool
+from responser.serializers import QUESTION_SUMMARY_FIELDS, question_fragments
+from responser.metrics import record_recommendation_fallback, record_recommendation_request
+from responser.recommender import recommend
+from responser.fallback_lists import fallback_question_ids
+from responser.content_ranker import content_recommend
+from responser.admission import recommendation_limiter
+from responser.error_handler import InferenceUnavailableError, ServiceOverloadedError
+from responser.cache import recommendation_cache, user_recommendations_cache
+from responser.sessions import require_session
+from responser.tracing import stage
 
 header = "/api/recommendations"
 router = APIRouter(
@@ -20,16 +29,14 @@ router = APIRouter(
 
 load_dotenv()
 
-# 전역 변수로 SasRec 모델 인스턴스 생성
-recommender = None
-
-def get_recommender(db: Session) -> SasRecRecommender:
-    global recommender
-    if recommender is None:
-        # 전체 문제 수 가져오기
-        num_items = db.query(QuestionDB).count()
-        recommender = SasRecRecommender(num_items=num_items)
-    return recommender
+# 추천 결과에 포함하는 문제 수
+RECOMMENDATION_TOP_K = 10
+# 이보다 학습 기록이 적은 사용자는 레벨별 대체 추천 목록에서 추천합니다
+RECOMMENDATION_MIN_HISTORY = int(os.environ.get("RECOMMENDATION_MIN_HISTORY", "5"))
+# 추천 계산이 밀려 거절될 때 대체 추천 목록으로 대신 응답할지 여부 (false면 503 + Retry-After)
+RECOMMENDATION_SHED_FALLBACK = os.environ.get("RECOMMENDATION_SHED_FALLBACK", "true").lower() in ("1", "true", "yes")
+# 사용자별 추천 목록 캐시에 보관하는 최근 추천 수. 이보다 뒤쪽 페이지는 DB에서 조회합니다
+USER_RECOMMENDATIONS_CACHE_SIZE = 100
 
 class RecommendationsForm(BaseModel):
     session_token: str
@@ -39,92 +46,83 @@ async def create_recommendation(item: RecommendationsForm, db: Session = Depends
     """
     새로운 추천을 생성합니다.
     """
-    data_session = db.query(SessionDB).filter(SessionDB.session_id == item.session_token).first()
-    if data_session is None:
-        raise HTTPException(status_code=403, detail="User not found")   
+    with stage("session_lookup"):
+        google_id = require_session(db, item.session_token)
     
-    log_data = db.query(UserLogDB).filter(UserLogDB.google_id == data_session.google_id).all()
-    if len(log_data) < 30:
+    with stage("log_fetch"):
+        log_count = db.query(UserLogDB.log_id).filter(UserLogDB.google_id == google_id).limit(30).count()
+    if log_count < 30:
         rec_type = 1  # less than 30
     else:
         rec_type = 2  # more than 30
+    record_recommendation_request(rec_type)
 
-    data = RecommendationsDB(rec_id=str(uuid4()), google_id=data_session.google_id, rec_type=rec_type)
-    db.add(data)
-    db.commit()
+    with stage("insert"):
+        data = RecommendationsDB(rec_id=str(uuid4()), google_id=google_id, rec_type=rec_type)
+        db.add(data)
+        db.commit()
+    user_recommendations_cache.invalidate(google_id)
 
-    return JSONResponse({"rec_id": data.rec_id})
+    return ORJSONResponse({"rec_id": data.rec_id})
 
 class RecommendationsSuccessForm(BaseModel):
     rec_id: str
 
-@router.post('/success')
-async def get_recommendation(item: RecommendationsSuccessForm, db: Session = Depends(get_db)):
-    """
-    추천 결과를 가져옵니다.
-    """
-    data = db.query(RecommendationsDB).filter(RecommendationsDB.rec_id == item.rec_id).first()
-    if data is None:
-        raise HTTPException(status_code=404, detail="Recommendation not found")
-    
-    if data.rec_status:
-        result_data = []
-        data_rec = db.query(RecommendationQuestionsDB).filter(
-            RecommendationQuestionsDB.rec_id == item.rec_id
-        ).order_by(RecommendationQuestionsDB.order).all()
-        
-        if len(data_rec) == 0:
-            raise HTTPException(status_code=404, detail="Recommendation questions is empty")
-            
-        for row in data_rec:
-            data_question = db.query(QuestionDB).filter(
-                QuestionDB.question_id == row.question_id
-            ).first()
-            result_data.append({
-                "question_id": row.question_id,
-                "wrong_sentence": data_question.wrong_sentence,
-                "right_sentence": data_question.right_sentence,
-                "wrong_word": data_question.wrong_word,
-                "right_word": data_question.right_word,
-                "location": data_question.location,
-                "difficulty_level": data_question.difficulty_level,
-                "explanation": data_question.explanation
-            })
-
-    else:
+async def compute_recommendation(db: Session, data: RecommendationsDB) -> List[int]:
+    """학습 기록으로 추천을 계산해 저장하고 추천된 문제 ID 목록을 반환합니다."""
+    with stage("insert"):
         data.rec_status = True
         db.commit()
 
-        # 사용자의 학습 기록 가져오기
-        log_data = db.query(UserLogDB).filter(
+    # 사용자의 학습 기록 가져오기
+    with stage("log_fetch"):
+        logs = db.query(UserLogDB.question_id, UserLogDB.correct).filter(
             UserLogDB.google_id == data.google_id
         ).order_by(UserLogDB.created_at).all()
-        
+
+    if data.rec_type == 1 and len(logs) < RECOMMENDATION_MIN_HISTORY:
+        # 학습 기록이 거의 없으면 미리 만든 레벨별 대체 추천 목록에서 안 푼 문제를 고릅니다
+        with stage("fallback"):
+            recommendations = [
+                (question_id, 0.0)
+                for question_id in fallback_question_ids(
+                    db, data.google_id, RECOMMENDATION_TOP_K, exclude={log.question_id for log in logs}
+                )
+            ]
+    elif data.rec_type == 1:
+        # 학습 기록이 적으면 모델 대신 최근 오답과 내용이 비슷한 문제를 추천합니다
+        with stage("content_rank"):
+            recommendations = await run_in_threadpool(
+                content_recommend, db, [(log.question_id, log.correct) for log in logs], RECOMMENDATION_TOP_K
+            )
+        if len(recommendations) < RECOMMENDATION_TOP_K:
+            # 오답이 없거나 비슷한 문제가 부족하면 대체 추천 목록의 안 푼 문제로 채웁니다
+            record_recommendation_fallback("cold_start")
+            exclude = {log.question_id for log in logs} | {question_id for question_id, _ in recommendations}
+            recommendations += [
+                (question_id, 0.0)
+                for question_id in fallback_question_ids(db, data.google_id, RECOMMENDATION_TOP_K, exclude=exclude)
+                if question_id not in exclude
+            ][:RECOMMENDATION_TOP_K - len(recommendations)]
+    else:
         # 학습 시퀀스 생성 (문제 ID만 사용)
-        sequence = [log.question_id for log in log_data]
-        
+        sequence = [log.question_id for log in logs]
+
         # SasRec 모델을 사용한 추천
-        recommender = get_recommender(db)
-        recommendations = recommender.recommend(sequence, top_k=10)
-        
-        # 추천 결과 저장
-        result_data = []
+        with stage("inference"):
+            try:
+                recommendations = await recommend(db, sequence, top_k=RECOMMENDATION_TOP_K)
+            except InferenceUnavailableError:
+                # 다음 요청에서 다시 추론할 수 있도록 상태를 되돌립니다
+                data.rec_status = False
+                db.commit()
+                raise
+    
+    # 추천 결과 저장
+    with stage("insert"):
+        question_ids = []
         for idx, (question_id, score) in enumerate(recommendations):
-            question = db.query(QuestionDB).filter(
-                QuestionDB.question_id == question_id
-            ).first()
-            
-            result_data.append({
-                "question_id": question.question_id,
-                "wrong_sentence": question.wrong_sentence,
-                "right_sentence": question.right_sentence,
-                "wrong_word": question.wrong_word,
-                "right_word": question.right_word,
-                "location": question.location,
-                "difficulty_level": question.difficulty_level,
-                "explanation": question.explanation
-            })
-            
+            question_ids.append(question_id)
             data_rec = RecommendationQuestionsDB(
                 rec_id=data.rec_id,
                 question_id=question_id,
@@ -133,10 +131,67 @@ async def get_recommendation(item: RecommendationsSuccessForm, db: Session = Dep
             db.add(data_rec)
         
         db.commit()
+    recommendation_cache.set(data.rec_id, question_ids)
+    user_recommendations_cache.invalidate(data.google_id)
+    return question_ids
 
-    return JSONResponse({
+@router.post('/success')
+async def get_recommendation(item: RecommendationsSuccessForm, db: Session = Depends(get_db)):
+    """
+    추천 결과를 가져옵니다.
+    """
+    fallback = False
+    # 계산이 끝난 추천은 바뀌지 않으므로 다른 워커가 계산한 결과도 캐시에서 바로 사용합니다
+    with stage("rec_lookup"):
+        question_ids = recommendation_cache.get(item.rec_id)
+        data = None
+        if question_ids is None:
+            data = db.query(RecommendationsDB).filter(RecommendationsDB.rec_id == item.rec_id).first()
+            if data is None:
+                raise HTTPException(status_code=404, detail="Recommendation not found")
+
+    if question_ids is None and data.rec_status:
+        with stage("rec_lookup"):
+            question_ids = [
+                row.question_id
+                for row in db.query(RecommendationQuestionsDB.question_id).filter(
+                    RecommendationQuestionsDB.rec_id == item.rec_id
+                ).order_by(RecommendationQuestionsDB.order)
+            ]
+        
+        if len(question_ids) == 0:
+            raise HTTPException(status_code=404, detail="Recommendation questions is empty")
+        recommendation_cache.set(item.rec_id, question_ids)
+
+    elif question_ids is None and data.rec_type == 1:
+        # 내용 기반 추천은 모델을 쓰지 않고 가벼우므로 동시 처리 제한 없이 계산합니다
+        question_ids = await compute_recommendation(db, data)
+
+    elif question_ids is None:
+        # 추천 계산은 워커당 동시 처리 수를 제한하고, 넘치면 대체 추천 목록으로 대신 응답하거나 503을 반환합니다
+        try:
+            with stage("admission"):
+                await recommendation_limiter.acquire()
+        except ServiceOverloadedError:
+            if not RECOMMENDATION_SHED_FALLBACK:
+                raise
+            record_recommendation_fallback("overloaded")
+            with stage("fallback"):
+                question_ids = fallback_question_ids(db, data.google_id, RECOMMENDATION_TOP_K)
+            fallback = True
+        else:
+            try:
+                question_ids = await compute_recommendation(db, data)
+            finally:
+                recommendation_limiter.release()
+
+    with stage("hydrate"):
+        result_data = question_fragments(db, question_ids, QUESTION_SUMMARY_FIELDS)
+
+    return ORJSONResponse({
         "success": True,
-        "recommendation": result_data
+        "recommendation": result_data,
+        "fallback": fallback
     })
 
 @router.get('/')
@@ -149,6 +204,21 @@ async def get_recommendations(
     """
     사용자의 추천 목록을 조회합니다.
     """
+    if offset + limit <= USER_RECOMMENDATIONS_CACHE_SIZE:
+        recent = user_recommendations_cache.get(
+            google_id,
+            lambda: recommendation_summaries(db, google_id, 0, USER_RECOMMENDATIONS_CACHE_SIZE)
+        )
+        result = recent[offset:offset + limit]
+    else:
+        result = recommendation_summaries(db, google_id, offset, limit)
+    
+    return ORJSONResponse({
+        "success": True,
+        "recommendations": result
+    })
+
+def recommendation_summaries(db: Session, google_id: str, offset: int, limit: int) -> List[dict]:
     recommendations = db.query(RecommendationsDB).filter(
         RecommendationsDB.google_id == google_id
     ).order_by(RecommendationsDB.created_at.desc()).offset(offset).limit(limit).all()
@@ -161,11 +231,7 @@ async def get_recommendations(
             "rec_type": rec.rec_type,
             "created_at": rec.created_at
         })
-    
-    return JSONResponse({
-        "success": True,
-        "recommendations": result
-    })
+    return result
 
 @router.get('/{rec_id}')
 async def get_recommendation_detail(rec_id: str, db: Session = Depends(get_db)):
@@ -179,7 +245,7 @@ async def get_recommendation_detail(rec_id: str, db: Session = Depends(get_db)):
     if recommendation is None:
         raise HTTPException(status_code=404, detail="Recommendation not found")
     
-    return JSONResponse({
+    return ORJSONResponse({
         "success": True,
         "recommendation": {
             "rec_id": recommendation.rec_id,
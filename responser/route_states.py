@@ -1,14 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
 import datetime
+import orjson
 import models
+from database import SessionLocal
 from dbmanage import get_db
 from sqlalchemy.orm import Session
 from zoneinfo import ZoneInfo
-from uuid import uuid4
-import os
-from dotenv import load_dotenv
+from typing import Optional
+from responser.sessions import require_session
+from responser.stat_buckets import MAX_BUCKETS, question_chart, user_chart
 
 header = "/api/states"
 router = APIRouter(
@@ -17,42 +19,171 @@ router = APIRouter(
 )
 KST = ZoneInfo("Asia/Seoul")
 
+# 스트리밍 시 서버 사이드 커서에서 한 번에 가져올 행 수
+STREAM_FETCH_SIZE = 1000
+# 차트 기본 버킷 수
+DEFAULT_CHART_BUCKETS = {"hour": 24, "day": 30}
+
 @router.get('/')
 async def root():
     return {"success": "true"}
 
+def format_timestamp(value: datetime.datetime) -> str:
+    """UTC로 저장된 시각을 KST 문자열로 변환합니다."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value.astimezone(tz=KST).strftime("%Y-%m-%d %H:%M:%S")
+
+def user_state_item(row: models.UserLogDB) -> dict:
+    return {
+        "item": {
+            "question_id": row.question_id,
+            "rating":  (0 if row.correct else 1),
+            "timestamp": format_timestamp(row.created_at)
+        }
+    }
+
+def question_state_item(row: models.UserLogDB) -> dict:
+    return {
+        "item": {
+            "rating":  (0 if row.correct else 1),
+            "timestamp": format_timestamp(row.created_at)
+        }
+    }
+
+def chart_buckets(granularity: str, buckets: Optional[int]) -> int:
+    if granularity not in MAX_BUCKETS:
+        raise HTTPException(status_code=400, detail="granularity must be 'hour' or 'day'")
+    if buckets is None:
+        return DEFAULT_CHART_BUCKETS[granularity]
+    if not 1 <= buckets <= MAX_BUCKETS[granularity]:
+        raise HTTPException(status_code=400, detail=f"buckets must be between 1 and {MAX_BUCKETS[granularity]}")
+    return buckets
+
+def paginate_logs(query, cursor: Optional[int], limit: int):
+    """
+    log_id 기준 키셋(커서) 페이지네이션을 적용합니다.
+    limit + 1개를 조회해 다음 페이지 존재 여부를 판단합니다.
+    """
+    if cursor is not None:
+        query = query.filter(models.UserLogDB.log_id > cursor)
+    rows = query.order_by(models.UserLogDB.log_id).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1].log_id
+    return rows, next_cursor
+
+def stream_logs(criterion, serialize):
+    """
+    서버 사이드 커서로 학습 기록을 읽어 NDJSON 한 줄씩 내보냅니다.
+    요청 세션과 별도의 DB 세션을 사용해 응답이 끝날 때까지 연결을 유지합니다.
+    """
+    db = SessionLocal()
+    try:
+        query = db.query(models.UserLogDB).filter(criterion).order_by(
+            models.UserLogDB.log_id
+        ).execution_options(stream_results=True).yield_per(STREAM_FETCH_SIZE)
+        for row in query:
+            yield orjson.dumps(serialize(row)) + b"\n"
+    finally:
+        db.close()
+
 class StateUserForm(BaseModel):
     session_token: str
+    cursor: Optional[int] = None
+    limit: int = Field(100, ge=1, le=500)
 
 @router.post('/user')
 async def user(item: StateUserForm, db: Session = Depends(get_db)):
-    data_session = db.query(models.SessionDB).filter(models.SessionDB.session_token == item.session_token).first()
-    if data_session is None:
-        raise HTTPException(status_code=403, detail="User not found")   
-
-    data = db.query(models.UserLogDB).filter(models.UserLogDB.google_id == data_session.google_id).all()
-    log_data_result = []
-    for row in data:
-        log_data_result.append({
-            "item": {
-                "question_id": row.question_id,
-                "rating":  (0 if row.correct else 1),
-                "timestamp": row.timestamp.replace(tzinfo=datetime.timezone.utc).astimezone(tz=KST).surftime("%Y-%m-%d %H:%M:%S")
-            }
-        })
-    
-    return JSONResponse({"study_states": log_data_result})
+    """
+    사용자의 학습 기록을 log_id 커서 기반으로 페이지 단위 조회합니다.
+    """
+    google_id = require_session(db, item.session_token)
+
+    query = db.query(models.UserLogDB).filter(models.UserLogDB.google_id == google_id)
+    data, next_cursor = paginate_logs(query, item.cursor, item.limit)
+
+    return ORJSONResponse({
+        "study_states": [user_state_item(row) for row in data],
+        "next_cursor": next_cursor
+    })
+
+class StateUserStreamForm(BaseModel):
+    session_token: str
+
+@router.post('/user/stream')
+async def user_stream(item: StateUserStreamForm, db: Session = Depends(get_db)):
+    """
+    사용자의 전체 학습 기록을 NDJSON으로 스트리밍합니다.
+    """
+    google_id = require_session(db, item.session_token)
+
+    return StreamingResponse(
+        stream_logs(models.UserLogDB.google_id == google_id, user_state_item),
+        media_type="application/x-ndjson"
+    )
+
+class StateUserChartForm(BaseModel):
+    session_token: str
+    granularity: str = "day"
+    buckets: Optional[int] = None
+
+@router.post('/user/chart')
+async def user_chart_endpoint(item: StateUserChartForm, db: Session = Depends(get_db)):
+    """
+    사용자의 시간/일 단위 풀이 수, 정답률, 평균 풀이 시간을 집계 버킷에서 조회합니다 (KST 기준).
+    """
+    google_id = require_session(db, item.session_token)
+    buckets = chart_buckets(item.granularity, item.buckets)
+
+    return ORJSONResponse({
+        "granularity": item.granularity,
+        "chart": user_chart(db, google_id, item.granularity, buckets)
+    })
+
+@router.get('/questions/{question_id}/chart')
+async def question_chart_endpoint(
+    question_id: int,
+    granularity: str = "day",
+    buckets: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    문제의 시간/일 단위 풀이 수, 정답률, 평균 풀이 시간을 집계 버킷에서 조회합니다 (KST 기준).
+    """
+    buckets = chart_buckets(granularity, buckets)
+
+    return ORJSONResponse({
+        "granularity": granularity,
+        "chart": question_chart(db, question_id, granularity, buckets)
+    })
 
 @router.get('/questions/{question_id}')
-async def questions(question_id: int, db: Session = Depends(get_db)):
-    data = db.query(models.UserLogDB).filter(models.UserLogDB.question_id == question_id).all()
-    log_data_result = []
-    for row in data:
-        log_data_result.append({
-            "item": {
-                "rating":  (0 if row.correct else 1),
-                "timestamp": row.timestamp.replace(tzinfo=datetime.timezone.utc).astimezone(tz=KST).surftime("%Y-%m-%d %H:%M:%S")
-            }
-        })
-    
-    return JSONResponse({"question_states": log_data_result})
\ No newline at end of file
+async def questions(
+    question_id: int,
+    cursor: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """
+    문제의 풀이 기록을 log_id 커서 기반으로 페이지 단위 조회합니다.
+    """
+    query = db.query(models.UserLogDB).filter(models.UserLogDB.question_id == question_id)
+    data, next_cursor = paginate_logs(query, cursor, limit)
+
+    return ORJSONResponse({
+        "question_states": [question_state_item(row) for row in data],
+        "next_cursor": next_cursor
+    })
+
+@router.get('/questions/{question_id}/stream')
+async def questions_stream(question_id: int):
+    """
+    문제의 전체 풀이 기록을 NDJSON으로 스트리밍합니다.
+    """
+    return StreamingResponse(
+        stream_logs(models.UserLogDB.question_id == question_id, question_state_item),
+        media_type="application/x-ndjson"
+    )
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, Field
 import datetime
+from typing import List
 import models
 from dbmanage import get_db
 from sqlalchemy.orm import Session
@@ -9,6 +10,11 @@ from uuid import uuid4
 import os
 from dotenv import load_dotenv
 from sqlalchemy import func, case
+from responser.sessions import require_session
+from responser.userlog_archive import archived_accuracy, archived_time_totals
+from responser.tracing import stage
+from responser.review_scheduler import database_now, due_reviews, next_due_at, record_review, record_reviews
+from responser.serializers import QUESTION_SUMMARY_FIELDS, question_fragment_map
 
 header = "/api/study"
 router = APIRouter(
@@ -58,53 +64,120 @@ def update_study_level(db: Session, google_id: str):
 
 @router.post('/submit')
 async def submit(item: StudySubmitForm, db: Session = Depends(get_db)):
-    data_session = db.query(models.SessionDB).filter(models.SessionDB.session_token == item.session_token).first()
-    if data_session is None:
-        raise HTTPException(status_code=403, detail="User not found")   
+    with stage("session_lookup"):
+        google_id = require_session(db, item.session_token)
 
-    data_problem = db.query(models.QuestionDB).filter(models.QuestionDB.question_id == item.question_id).first()
+    with stage("question_lookup"):
+        data_problem = db.query(models.QuestionDB).filter(models.QuestionDB.question_id == item.question_id).first()
     if data_problem is None:
         raise HTTPException(status_code=404, detail="Question not found")
 
     # 학습 기록 저장
-    data = models.UserLogDB(
-        google_id=data_session.google_id,
-        question_id=item.question_id,
-        correct=item.correct,
-        delaytime=item.delaytime if hasattr(item, 'delaytime') else 0.0
-    )
-    db.add(data)
-    db.commit()
+    with stage("insert"):
+        data = models.UserLogDB(
+            google_id=google_id,
+            question_id=item.question_id,
+            correct=item.correct,
+            delaytime=item.delaytime if hasattr(item, 'delaytime') else 0.0
+        )
+        db.add(data)
+        # 복습 일정도 학습 기록과 같은 트랜잭션에서, 학습 기록의 created_at과 같은 DB 시계로 갱신합니다
+        record_review(db, google_id, item.question_id, item.correct, data.delaytime, database_now(db))
+        db.commit()
 
     # study level 업데이트
-    new_level = update_study_level(db, data_session.google_id)
-    user = db.query(models.UserDB).filter(models.UserDB.google_id == data_session.google_id).first()
-    if user and user.study_level != new_level:
-        user.study_level = new_level
-        db.commit()
+    with stage("level_update"):
+        new_level = update_study_level(db, google_id)
+        user = db.query(models.UserDB).filter(models.UserDB.google_id == google_id).first()
+        if user and user.study_level != new_level:
+            user.study_level = new_level
+            db.commit()
 
-    return JSONResponse({
+    return ORJSONResponse({
         "success": "true",
         "explanation": data_problem.explanation,
         "study_level": new_level
     })
 
+class StudyAnswer(BaseModel):
+    question_id: int
+    correct: bool
+    delaytime: float = 0.0
+
+class StudyBatchSubmitForm(BaseModel):
+    session_token: str
+    answers: List[StudyAnswer] = Field(..., min_items=1, max_items=100)
+
+@router.post('/submit-batch')
+async def submit_batch(item: StudyBatchSubmitForm, db: Session = Depends(get_db)):
+    """
+    여러 풀이 결과를 순서대로 한 번에 제출합니다 (오프라인/퀴즈 모드).
+    문제 확인, 학습 기록 저장, 복습 일정과 study level 갱신을 한 트랜잭션으로 처리하며,
+    없는 문제가 하나라도 있으면 아무것도 저장하지 않고 404를 반환합니다.
+    """
+    with stage("session_lookup"):
+        google_id = require_session(db, item.session_token)
+
+    with stage("question_lookup"):
+        question_ids = {answer.question_id for answer in item.answers}
+        explanations = dict(db.query(models.QuestionDB.question_id, models.QuestionDB.explanation).filter(
+            models.QuestionDB.question_id.in_(question_ids)
+        ).all())
+    missing = sorted(question_ids - explanations.keys())
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Question not found: {missing}")
+
+    with stage("insert"):
+        # /submit의 created_at 기본값과 같은 DB 시계를 쓰고,
+        # 같은 시각에 저장되더라도 최근 기록 조회에서 제출 순서가 유지되도록 1마이크로초씩 띄웁니다
+        now = database_now(db)
+        answers = [
+            (answer.question_id, answer.correct, answer.delaytime, now + datetime.timedelta(microseconds=index))
+            for index, answer in enumerate(item.answers)
+        ]
+        db.bulk_insert_mappings(models.UserLogDB, [
+            {"google_id": google_id, "question_id": question_id, "correct": correct, "delaytime": delaytime, "created_at": created_at}
+            for question_id, correct, delaytime, created_at in answers
+        ])
+        record_reviews(db, google_id, answers)
+
+    # study level은 마지막 제출 기준으로 한 번만 계산합니다
+    with stage("level_update"):
+        new_level = update_study_level(db, google_id)
+        user = db.query(models.UserDB).filter(models.UserDB.google_id == google_id).first()
+        if user and user.study_level != new_level:
+            user.study_level = new_level
+
+    with stage("insert"):
+        db.commit()
+
+    return ORJSONResponse({
+        "success": "true",
+        "results": [
+            {
+                "question_id": answer.question_id,
+                "correct": answer.correct,
+                "explanation": explanations[answer.question_id]
+            }
+            for answer in item.answers
+        ],
+        "study_level": new_level
+    })
+
 class StudyHistoryForm(BaseModel):
     session_token: str
     limit: int = 10
 
 @router.post('/recent-history')
 async def get_recent_history(item: StudyHistoryForm, db: Session = Depends(get_db)):
-    data_session = db.query(models.SessionDB).filter(models.SessionDB.session_token == item.session_token).first()
-    if data_session is None:
-        raise HTTPException(status_code=403, detail="User not found")   
+    google_id = require_session(db, item.session_token)
 
     # 최근 학습 기록
     recent_logs = db.query(models.UserLogDB, models.QuestionDB).join(
         models.QuestionDB,
         models.UserLogDB.question_id == models.QuestionDB.question_id
     ).filter(
-        models.UserLogDB.google_id == data_session.google_id
+        models.UserLogDB.google_id == google_id
     ).order_by(
         models.UserLogDB.created_at.desc()
     ).limit(item.limit).all()
@@ -115,8 +188,12 @@ async def get_recent_history(item: StudyHistoryForm, db: Session = Depends(get_d
         func.sum(models.UserLogDB.delaytime).label('total_time'),
         func.count(models.UserLogDB.log_id).label('total_questions')
     ).filter(
-        models.UserLogDB.google_id == data_session.google_id
+        models.UserLogDB.google_id == google_id
     ).first()
+    # 분리된 오래된 파티션의 기록은 월 요약에서 더합니다
+    archived_questions, archived_time = archived_time_totals(db, google_id)
+    total_questions = time_stats.total_questions + archived_questions
+    total_time = (time_stats.total_time or 0) + archived_time
 
     # 결과 포맷팅
     history_result = []
@@ -130,12 +207,12 @@ async def get_recent_history(item: StudyHistoryForm, db: Session = Depends(get_d
             "created_at": log.created_at.isoformat()
         })
 
-    return JSONResponse({
+    return ORJSONResponse({
         "recent_history": history_result,
         "time_stats": {
-            "average_time": round(time_stats.avg_time, 2) if time_stats.avg_time else 0,
-            "total_time": round(time_stats.total_time, 2) if time_stats.total_time else 0,
-            "total_questions": time_stats.total_questions
+            "average_time": round(total_time / total_questions, 2) if total_questions else 0,
+            "total_time": round(total_time, 2),
+            "total_questions": total_questions
         }
     })
 
@@ -145,16 +222,14 @@ class RecentWrongAnswersForm(BaseModel):
 
 @router.post('/recent-wrong')
 async def get_recent_wrong_answers(item: RecentWrongAnswersForm, db: Session = Depends(get_db)):
-    data_session = db.query(models.SessionDB).filter(models.SessionDB.session_token == item.session_token).first()
-    if data_session is None:
-        raise HTTPException(status_code=403, detail="User not found")   
+    google_id = require_session(db, item.session_token)
 
     # 최근에 틀린 문제들을 가져옵니다
     wrong_answers = db.query(models.UserLogDB, models.QuestionDB).join(
         models.QuestionDB,
         models.UserLogDB.question_id == models.QuestionDB.question_id
     ).filter(
-        models.UserLogDB.google_id == data_session.google_id,
+        models.UserLogDB.google_id == google_id,
         models.UserLogDB.correct == False
     ).order_by(
         models.UserLogDB.created_at.desc()
@@ -171,16 +246,51 @@ async def get_recent_wrong_answers(item: RecentWrongAnswersForm, db: Session = D
             "created_at": log.created_at.isoformat()
         })
 
-    return JSONResponse({"recent_wrong_answers": result})
+    return ORJSONResponse({"recent_wrong_answers": result})
+
+class ReviewQueueForm(BaseModel):
+    session_token: str
+    limit: int = Field(10, ge=1, le=50)
+
+@router.post('/review-queue')
+async def get_review_queue(item: ReviewQueueForm, db: Session = Depends(get_db)):
+    """
+    복습할 때가 된 문제를 오래 기다린 순으로 반환합니다.
+    학습 기록 대신 제출할 때마다 갱신되는 복습 일정의 (google_id, due_at) 인덱스 범위만 읽습니다.
+    """
+    with stage("session_lookup"):
+        google_id = require_session(db, item.session_token)
+
+    with stage("query"):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        states, due_count = due_reviews(db, google_id, item.limit, now)
+        upcoming = next_due_at(db, google_id, now) if due_count == 0 else None
+
+    with stage("hydrate"):
+        questions = question_fragment_map(db, [state.question_id for state in states], QUESTION_SUMMARY_FIELDS)
+
+    return ORJSONResponse({
+        "review_queue": [
+            {
+                "question": questions[state.question_id],
+                "due_at": state.due_at,
+                "repetitions": state.repetitions,
+                "lapses": state.lapses,
+                "interval_days": round(state.interval_days or 0.0, 2)
+            }
+            for state in states
+            if state.question_id in questions
+        ],
+        "due_count": due_count,
+        "next_due_at": upcoming
+    })
 
 class StudyStatsForm(BaseModel):
     session_token: str
 
 @router.post('/stats')
 async def get_study_stats(item: StudyStatsForm, db: Session = Depends(get_db)):
-    data_session = db.query(models.SessionDB).filter(models.SessionDB.session_token == item.session_token).first()
-    if data_session is None:
-        raise HTTPException(status_code=403, detail="User not found")   
+    google_id = require_session(db, item.session_token)
 
     # 카테고리별 통계
     category_stats = db.query(
@@ -194,7 +304,7 @@ async def get_study_stats(item: StudyStatsForm, db: Session = Depends(get_db)):
         models.UserLogDB,
         models.UserLogDB.question_id == models.QuestionDB.question_id
     ).filter(
-        models.UserLogDB.google_id == data_session.google_id
+        models.UserLogDB.google_id == google_id
     ).group_by(
         models.CategoryDB.name
     ).all()
@@ -208,11 +318,15 @@ async def get_study_stats(item: StudyStatsForm, db: Session = Depends(get_db)):
         models.UserLogDB,
         models.UserLogDB.question_id == models.QuestionDB.question_id
     ).filter(
-        models.UserLogDB.google_id == data_session.google_id
+        models.UserLogDB.google_id == google_id
     ).group_by(
         models.QuestionDB.difficulty_level
     ).all()
 
+    # 분리된 오래된 파티션의 기록은 월 요약에서 더합니다
+    category_stats = merge_accuracy(category_stats, archived_accuracy(db, google_id, models.CategoryDB.name))
+    difficulty_stats = merge_accuracy(difficulty_stats, archived_accuracy(db, google_id, models.QuestionDB.difficulty_level))
+
     # 결과 포맷팅
     category_result = []
     for name, total, correct in category_stats:
@@ -232,7 +346,17 @@ async def get_study_stats(item: StudyStatsForm, db: Session = Depends(get_db)):
             "correct_rate": round((correct / total) * 100, 2) if total > 0 else 0
         })
 
-    return JSONResponse({
+    return ORJSONResponse({
         "category_stats": category_result,
         "difficulty_stats": difficulty_result
-    })
\ No newline at end of file
+    })
+
+def merge_accuracy(rows, archived: dict) -> list:
+    """(key, total, correct) 행에 분리된 기간의 (total, correct)를 더합니다."""
+    if not archived:
+        return rows
+    merged = {key: (total, correct or 0) for key, total, correct in rows}
+    for key, (total, correct) in archived.items():
+        live_total, live_correct = merged.get(key, (0, 0))
+        merged[key] = (live_total + total, live_correct + correct)
+    return [(key, total, correct) for key, (total, correct) in merged.items()]
@@ -0,0 +1,82 @@
+from sqlalchemy.orm import Session
+from models.models import QuestionDB
+from responser.catalog import get_catalog_version
+from typing import Dict, List, Optional, Tuple
+import orjson
+import threading
+
+# 응답 종류별로 내보내는 QuestionDB 필드
+QUESTION_SUMMARY_FIELDS = (
+    "question_id",
+    "category_id",
+    "wrong_sentence",
+    "right_sentence",
+    "wrong_word",
+    "right_word",
+    "location",
+    "difficulty_level",
+    "explanation"
+)
+
+QUESTION_LIST_FIELDS = QUESTION_SUMMARY_FIELDS + (
+    "is_active",
+    "total_attempts",
+    "correct_rate",
+    "avg_time_spent",
+    "dropout_rate"
+)
+
+QUESTION_DETAIL_FIELDS = QUESTION_LIST_FIELDS + (
+    "daily_stats",
+    "stats_updated_at",
+    "created_at"
+)
+
+# (필드 셋, question_id) -> 인코딩된 JSON 조각. 카탈로그 버전이 바뀌면 비웁니다.
+_fragment_cache: Dict[Tuple[tuple, int], orjson.Fragment] = {}
+_fragment_version: Optional[str] = None
+_fragment_lock = threading.Lock()
+
+def serialize_question(question: QuestionDB, fields: tuple = QUESTION_LIST_FIELDS) -> dict:
+    """QuestionDB 객체를 응답용 dict로 변환합니다."""
+    return {field: getattr(question, field) for field in fields}
+
+def encode_question(question: QuestionDB, fields: tuple = QUESTION_LIST_FIELDS) -> orjson.Fragment:
+    """QuestionDB 객체를 미리 인코딩된 JSON 조각으로 변환합니다."""
+    return orjson.Fragment(orjson.dumps(serialize_question(question, fields)))
+
+def _cache_for(version: str) -> Dict[Tuple[tuple, int], orjson.Fragment]:
+    global _fragment_cache, _fragment_version
+    if _fragment_version != version:
+        with _fragment_lock:
+            if _fragment_version != version:
+                _fragment_cache = {}
+                _fragment_version = version
+    return _fragment_cache
+
+def question_fragment_map(db: Session, question_ids: List[int], fields: tuple = QUESTION_LIST_FIELDS) -> Dict[int, orjson.Fragment]:
+    """
+    question_id -> 인코딩된 문제 JSON 조각. 존재하지 않는 문제는 빠집니다.
+    캐시에 없는 문제만 한 번의 IN 쿼리로 읽어 인코딩합니다.
+    """
+    cache = _cache_for(get_catalog_version(db))
+
+    missing = [qid for qid in question_ids if (fields, qid) not in cache]
+    if missing:
+        rows = db.query(QuestionDB).filter(QuestionDB.question_id.in_(missing)).all()
+        for question in rows:
+            cache[(fields, question.question_id)] = encode_question(question, fields)
+
+    return {qid: cache[(fields, qid)] for qid in question_ids if (fields, qid) in cache}
+
+def question_fragments(db: Session, question_ids: List[int], fields: tuple = QUESTION_LIST_FIELDS) -> List[orjson.Fragment]:
+    """
+    question_ids 순서대로 인코딩된 문제 JSON 조각을 반환합니다. 존재하지 않는 문제는 건너뜁니다.
+    """
+    fragments = question_fragment_map(db, question_ids, fields)
+    return [fragments[qid] for qid in question_ids if qid in fragments]
+
+def question_fragment(db: Session, question_id: int, fields: tuple = QUESTION_DETAIL_FIELDS) -> Optional[orjson.Fragment]:
+    """단일 문제의 인코딩된 JSON 조각을 반환합니다. 문제가 없으면 None을 반환합니다."""
+    fragments = question_fragments(db, [question_id], fields)
+    return fragments[0] if fragments else None
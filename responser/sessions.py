@@ -0,0 +1,162 @@
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from models.models import SessionDB
+from responser.cache import session_cache
+from typing import List, Optional, Tuple
+from uuid import uuid4
+import base64
+import datetime
+import hashlib
+import hmac
+import orjson
+import os
+import time
+
+# 세션 유효 기간 (초). 사용할 때마다 다시 이 기간만큼 연장됩니다 (기본 14일)
+SESSION_TTL = float(os.environ.get("SESSION_TTL", str(14 * 24 * 3600)))
+# 만료 시각을 연장하는 최소 간격 (초). 요청마다 DB에 쓰지 않도록 이 간격이 지난 뒤에만 연장합니다
+SESSION_REFRESH_INTERVAL = float(os.environ.get("SESSION_REFRESH_INTERVAL", "3600"))
+# 설정하면 만료 시각을 담은 서명 토큰(HMAC-SHA256)을 발급해 요청 검증 시 DB를 조회하지 않습니다
+SESSION_SECRET = os.environ.get("SESSION_SECRET")
+
+SIGNED_TOKEN_PREFIX = "s1."
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+def _timestamp(value: datetime.datetime) -> float:
+    # SQLite는 시간대 정보 없이 UTC 시각을 돌려줍니다
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value.timestamp()
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+def _signature(payload: str) -> str:
+    return _b64encode(hmac.new(SESSION_SECRET.encode("utf-8"), payload.encode("ascii"), hashlib.sha256).digest())
+
+def sign_token(session_id: str, google_id: str, expires_at: float) -> str:
+    """세션 ID, google_id, 만료 시각을 담은 서명 토큰을 만듭니다."""
+    payload = SIGNED_TOKEN_PREFIX + _b64encode(orjson.dumps([session_id, google_id, int(expires_at)]))
+    return f"{payload}.{_signature(payload)}"
+
+def verify_token(token: str) -> Optional[Tuple[str, str, int]]:
+    """서명 토큰의 (세션 ID, google_id, 만료 시각)을 반환합니다. 서명이 틀리거나 만료되었으면 None입니다."""
+    # 발급한 토큰은 ASCII(base64url)만 담으므로 그 밖의 문자는 서명을 계산하지 않고 거절합니다
+    if not SESSION_SECRET or not token.startswith(SIGNED_TOKEN_PREFIX) or not token.isascii():
+        return None
+    payload, _, signature = token.rpartition(".")
+    if not hmac.compare_digest(signature, _signature(payload)):
+        return None
+    try:
+        session_id, google_id, expires_at = orjson.loads(_b64decode(payload[len(SIGNED_TOKEN_PREFIX):]))
+    except (ValueError, TypeError):
+        return None
+    if expires_at <= time.time():
+        return None
+    return session_id, google_id, expires_at
+
+def create_session(db: Session, google_id: str) -> str:
+    """새 세션을 만들고 클라이언트에 전달할 토큰을 반환합니다."""
+    now = _now()
+    session = SessionDB(
+        session_id=str(uuid4()),
+        google_id=google_id,
+        expires_at=now + datetime.timedelta(seconds=SESSION_TTL),
+        last_seen_at=now
+    )
+    db.add(session)
+    db.commit()
+    if SESSION_SECRET:
+        return sign_token(session.session_id, google_id, _timestamp(session.expires_at))
+    return session.session_id
+
+def session_id_of(session_token: str) -> Optional[str]:
+    """토큰이 가리키는 세션 ID. 서명 토큰이면 검증한 뒤 꺼내고, 검증에 실패하면 None입니다."""
+    if session_token.startswith(SIGNED_TOKEN_PREFIX):
+        claims = verify_token(session_token)
+        return claims[0] if claims else None
+    return session_token
+
+def _extend(db: Session, session_id: str) -> float:
+    now = _now()
+    expires_at = now + datetime.timedelta(seconds=SESSION_TTL)
+    db.query(SessionDB).filter(SessionDB.session_id == session_id).update(
+        {"expires_at": expires_at, "last_seen_at": now}, synchronize_session=False
+    )
+    db.commit()
+    return expires_at.timestamp()
+
+def _session_entry(db: Session, session_id: str) -> Optional[List]:
+    """세션의 [google_id, 만료 시각(unix time)]. 세션이 없으면 None입니다."""
+    def load() -> Optional[List]:
+        row = db.query(SessionDB.google_id, SessionDB.expires_at, SessionDB.created_at).filter(
+            SessionDB.session_id == session_id
+        ).first()
+        if row is None:
+            return None
+        # 만료 시각이 없는 이전 세션은 생성 시각부터 SESSION_TTL 동안 유효합니다
+        expires_at = _timestamp(row.expires_at) if row.expires_at else _timestamp(row.created_at) + SESSION_TTL
+        return [row.google_id, expires_at]
+
+    return session_cache.get(session_id, load)
+
+def resolve_session(db: Session, session_token: str) -> Optional[str]:
+    """
+    세션 토큰의 google_id를 반환합니다. 없거나 만료된 세션이면 None을 반환합니다.
+    서명 토큰은 서명과 만료 시각을 확인하고, 로그아웃 여부는 세션이 DB에 남아 있는지를 캐시해서 확인하므로
+    캐시에 있으면 DB를 조회하지 않습니다. 캐시에서 밀려났거나 Redis에 연결할 수 없으면 DB에서 확인하므로
+    로그아웃한 토큰이 다시 통과하지 않습니다.
+    일반 토큰은 만료 시각을 함께 캐시하고, SESSION_REFRESH_INTERVAL마다 만료 시각을 연장합니다.
+    """
+    if session_token.startswith(SIGNED_TOKEN_PREFIX):
+        claims = verify_token(session_token)
+        if claims is None or _session_entry(db, claims[0]) is None:
+            return None
+        return claims[1]
+
+    entry = _session_entry(db, session_token)
+    if entry is None:
+        return None
+    google_id, expires_at = entry
+    now = time.time()
+    if expires_at <= now:
+        session_cache.evict_local(session_token)
+        return None
+    if expires_at - now < SESSION_TTL - SESSION_REFRESH_INTERVAL:
+        session_cache.set(session_token, [google_id, _extend(db, session_token)])
+    return google_id
+
+def require_session(db: Session, session_token: str) -> str:
+    """세션 토큰의 google_id를 반환합니다. 없는 세션이면 403을 반환합니다."""
+    google_id = resolve_session(db, session_token)
+    if google_id is None:
+        raise HTTPException(status_code=403, detail="User not found")
+    return google_id
+
+def refresh_token(db: Session, session_token: str) -> Optional[str]:
+    """
+    서명 토큰의 남은 기간이 SESSION_TTL - SESSION_REFRESH_INTERVAL보다 짧으면 만료 시각을 연장한 새 토큰을 반환합니다.
+    서명 토큰은 스스로 만료 시각을 바꿀 수 없으므로 클라이언트가 새 토큰으로 교체해야 합니다.
+    """
+    claims = verify_token(session_token)
+    if claims is None:
+        return None
+    session_id, google_id, expires_at = claims
+    if expires_at - time.time() >= SESSION_TTL - SESSION_REFRESH_INTERVAL:
+        return None
+    return sign_token(session_id, google_id, _extend(db, session_id))
+
+def invalidate_session(session_token: str) -> bool:
+    """
+    로그아웃 등으로 세션이 삭제되었을 때 모든 워커의 세션 캐시에서 지웁니다.
+    공유 캐시에서 지우지 못했으면 False를 반환합니다 (다른 워커가 캐시된 세션을 계속 사용할 수 있음).
+    """
+    session_id = session_id_of(session_token)
+    if session_id is None:
+        return True
+    return session_cache.invalidate(session_id)
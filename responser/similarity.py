@@ -0,0 +1,182 @@
+from responser.logger import logger
+from starlette.concurrency import run_in_threadpool
+from responser.recommender import SASREC_CHECKPOINT, checkpoint_source, loaded_checkpoint_source, loaded_item_embeddings
+from typing import List, Optional, Tuple
+import asyncio
+import math
+import numpy as np
+import os
+import time
+import torch
+
+# 유사도 인덱스 방식. exact: 정규화한 임베딩 전체 내적, ann: k-means 클러스터(IVF) 안에서만 탐색
+SIMILARITY_INDEX = os.environ.get("SIMILARITY_INDEX", "exact").lower()
+# 문제마다 미리 계산해 두는 유사 문제 수 (요청 limit의 최댓값)
+SIMILARITY_TOP_K = int(os.environ.get("SIMILARITY_TOP_K", "50"))
+# ann 방식의 클러스터 수 (비워두면 sqrt(문제 수))와 탐색할 클러스터 수
+SIMILARITY_ANN_LISTS = os.environ.get("SIMILARITY_ANN_LISTS")
+SIMILARITY_ANN_PROBES = int(os.environ.get("SIMILARITY_ANN_PROBES", "8"))
+
+# exact 방식에서 한 번에 내적을 계산하는 문제 수 (메모리 사용량 제한)
+_EXACT_CHUNK = 1024
+
+class SimilarityIndex:
+    """
+    문제별 유사 문제 목록을 미리 계산해 둔 인덱스.
+    neighbors[i]는 question_id i와 코사인 유사도가 높은 순서의 question_id, scores[i]는 그 유사도입니다.
+    """
+    def __init__(self, neighbors: np.ndarray, scores: np.ndarray, source: Tuple, method: str):
+        self.neighbors = neighbors
+        self.scores = scores
+        self.source = source
+        self.method = method
+
+    @property
+    def num_items(self) -> int:
+        return self.neighbors.shape[0] - 1
+
+    def similar(self, question_id: int, limit: int) -> List[Tuple[int, float]]:
+        if question_id < 1 or question_id > self.num_items:
+            return []
+        return [
+            (int(neighbor), float(score))
+            for neighbor, score in zip(self.neighbors[question_id, :limit], self.scores[question_id, :limit])
+            if neighbor > 0
+        ]
+
+def normalize(embeddings: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.maximum(norms, 1e-12)
+
+def _top_k(similarities: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """행마다 유사도가 높은 top_k개의 (열 번호, 유사도)를 내림차순으로 반환합니다."""
+    k = min(top_k, similarities.shape[1])
+    if k <= 0:
+        empty = np.empty((similarities.shape[0], 0))
+        return empty.astype(np.int64), empty.astype(np.float32)
+    part = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+    part_scores = np.take_along_axis(similarities, part, axis=1)
+    order = np.argsort(-part_scores, axis=1)
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(part_scores, order, axis=1)
+
+def _exact_neighbors(vectors: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+    count = vectors.shape[0]
+    neighbors = np.zeros((count, top_k), dtype=np.int64)
+    scores = np.zeros((count, top_k), dtype=np.float32)
+    for start in range(0, count, _EXACT_CHUNK):
+        end = min(start + _EXACT_CHUNK, count)
+        similarities = vectors[start:end] @ vectors.T
+        # 자기 자신은 제외
+        similarities[np.arange(end - start), np.arange(start, end)] = -np.inf
+        columns, values = _top_k(similarities, min(top_k, count - 1))
+        neighbors[start:end, :columns.shape[1]] = columns + 1
+        scores[start:end, :values.shape[1]] = values
+    return neighbors, scores
+
+def _ann_neighbors(vectors: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    IVF 방식의 근사 탐색. 문제들을 k-means로 클러스터링하고,
+    각 클러스터의 문제는 그 클러스터 중심과 가까운 SIMILARITY_ANN_PROBES개 클러스터의 문제와만 비교합니다.
+    """
+    from sklearn.cluster import MiniBatchKMeans
+
+    count = vectors.shape[0]
+    lists = int(SIMILARITY_ANN_LISTS) if SIMILARITY_ANN_LISTS else max(1, int(math.sqrt(count)))
+    lists = min(lists, count)
+    kmeans = MiniBatchKMeans(n_clusters=lists, random_state=0, n_init=3).fit(vectors)
+    centroids = normalize(kmeans.cluster_centers_.astype(np.float32))
+    members = [np.flatnonzero(kmeans.labels_ == cluster) for cluster in range(lists)]
+    probes = min(SIMILARITY_ANN_PROBES, lists)
+    nearest_lists = np.argsort(-(centroids @ centroids.T), axis=1)[:, :probes]
+
+    neighbors = np.zeros((count, top_k), dtype=np.int64)
+    scores = np.zeros((count, top_k), dtype=np.float32)
+    for cluster in range(lists):
+        queries = members[cluster]
+        if len(queries) == 0:
+            continue
+        candidates = np.concatenate([members[probe] for probe in nearest_lists[cluster]])
+        similarities = vectors[queries] @ vectors[candidates].T
+        similarities[candidates[None, :] == queries[:, None]] = -np.inf
+        columns, values = _top_k(similarities, min(top_k, len(candidates) - 1))
+        neighbors[queries, :columns.shape[1]] = candidates[columns] + 1
+        scores[queries, :values.shape[1]] = values
+    return neighbors, scores
+
+def build_index(embeddings: np.ndarray, source: Tuple = (), method: str = SIMILARITY_INDEX, top_k: int = SIMILARITY_TOP_K) -> SimilarityIndex:
+    """
+    item_embeddings 가중치 (num_items + 1, d_model)로 인덱스를 만듭니다. 0번 행(패딩)은 제외합니다.
+    """
+    vectors = normalize(np.asarray(embeddings[1:], dtype=np.float32))
+    if method == "ann":
+        neighbors, scores = _ann_neighbors(vectors, top_k)
+    else:
+        neighbors, scores = _exact_neighbors(vectors, top_k)
+    # question_id로 바로 찾도록 0번(패딩) 행을 앞에 붙입니다
+    neighbors = np.vstack([np.zeros((1, top_k), dtype=np.int64), neighbors]).astype(np.int32)
+    scores = np.vstack([np.zeros((1, top_k), dtype=np.float32), scores])
+    return SimilarityIndex(neighbors, scores, source, method)
+
+_index: Optional[SimilarityIndex] = None
+_build_lock = asyncio.Lock()
+
+def _load_embeddings() -> np.ndarray:
+    """
+    체크포인트의 SasRec item_embeddings 가중치만 읽습니다.
+    파일을 메모리 매핑으로 열어 나머지 가중치는 메모리에 올리지 않고, 임베딩은 복사한 뒤 매핑을 닫습니다.
+    """
+    state = torch.load(SASREC_CHECKPOINT, map_location="cpu", mmap=True, weights_only=True)
+    try:
+        return state["item_embeddings.weight"].numpy().copy()
+    finally:
+        del state
+
+def _set_index(index: SimilarityIndex, started: float) -> SimilarityIndex:
+    global _index
+    _index = index
+    logger.info("similarity_index_built", extra={"event": {
+        "method": index.method,
+        "num_items": index.num_items,
+        "top_k": index.neighbors.shape[1],
+        "checkpoint": index.source,
+        "duration": round(time.perf_counter() - started, 3)
+    }})
+    return index
+
+def load_similarity_index() -> Optional[SimilarityIndex]:
+    """
+    체크포인트 파일로 인덱스를 만듭니다 (이미 있으면 그대로 반환). SASREC_CHECKPOINT가 없으면 None입니다.
+    gunicorn 마스터의 preload에서 fork 전에 호출합니다.
+    """
+    if not SASREC_CHECKPOINT:
+        return None
+    if _index is None:
+        started = time.perf_counter()
+        source = checkpoint_source()
+        _set_index(build_index(_load_embeddings(), source), started)
+    return _index
+
+async def get_similarity_index() -> Optional[SimilarityIndex]:
+    """
+    추천 모델과 같은 가중치로 만든 유사도 인덱스를 반환합니다. SASREC_CHECKPOINT가 없으면 None입니다.
+    추천 모델(추론 프로세스)은 시작할 때 읽은 체크포인트를 계속 쓰므로, 파일이 바뀌어도 모델이 새 체크포인트를
+    불러오기 전까지는 인덱스를 다시 만들지 않습니다. 모델이 불러온 체크포인트가 인덱스와 다르면
+    (파일이 그대로면 파일에서, 이미 바뀌었으면 모델의 임베딩으로) 다시 만들고, 그동안 다른 요청은 이전 인덱스를 사용합니다.
+    """
+    if not SASREC_CHECKPOINT:
+        return None
+    loaded = loaded_checkpoint_source()
+    if _index is not None and (loaded is None or _index.source == loaded):
+        return _index
+    if _index is not None and _build_lock.locked():
+        return _index
+    async with _build_lock:
+        loaded = loaded_checkpoint_source()
+        if _index is None or (loaded is not None and _index.source != loaded):
+            started = time.perf_counter()
+            if loaded is None or loaded == checkpoint_source():
+                embeddings, source = await run_in_threadpool(_load_embeddings), checkpoint_source()
+            else:
+                source, embeddings = await loaded_item_embeddings()
+            _set_index(await run_in_threadpool(build_index, embeddings, source), started)
+    return _index
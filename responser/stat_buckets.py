@@ -0,0 +1,72 @@
+from sqlalchemy.orm import Session
+from models.models import QuestionStatBucketDB, UserStatBucketDB
+from zoneinfo import ZoneInfo
+from typing import List, Optional
+import datetime
+
+KST = ZoneInfo("Asia/Seoul")
+
+# 집계 단위별 버킷 길이
+GRANULARITIES = {
+    "hour": datetime.timedelta(hours=1),
+    "day": datetime.timedelta(days=1)
+}
+# 차트 한 번에 반환할 수 있는 최대 버킷 수
+MAX_BUCKETS = {"hour": 24 * 14, "day": 366}
+
+def bucket_start(value: datetime.datetime, granularity: str) -> datetime.datetime:
+    """value가 속한 버킷의 시작 시각 (KST 기준으로 자른 뒤 UTC로 반환)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    local = value.astimezone(KST)
+    if granularity == "hour":
+        local = local.replace(minute=0, second=0, microsecond=0)
+    else:
+        local = local.replace(hour=0, minute=0, second=0, microsecond=0)
+    return local.astimezone(datetime.timezone.utc)
+
+def _as_utc(value: datetime.datetime) -> datetime.datetime:
+    # SQLite는 시간대 정보 없이 UTC 시각을 돌려줍니다
+    if value.tzinfo is None:
+        return value.replace(tzinfo=datetime.timezone.utc)
+    return value.astimezone(datetime.timezone.utc)
+
+def chart_series(db: Session, table, key_column, key, granularity: str, buckets: int, end: Optional[datetime.datetime] = None) -> List[dict]:
+    """
+    최근 buckets개 버킷의 집계를 시간순으로 반환합니다. 기록이 없는 버킷은 0으로 채웁니다.
+    (키, 단위, 시작 시각) 기본 키 범위만 읽으므로 기록 수와 관계없이 버킷 수만큼만 조회합니다.
+    """
+    step = GRANULARITIES[granularity]
+    last = bucket_start(end or datetime.datetime.now(datetime.timezone.utc), granularity)
+    # 일 단위는 서머타임이 없는 KST 기준이므로 고정 길이로 계산해도 경계가 맞습니다
+    first = last - step * (buckets - 1)
+
+    rows = db.query(table).filter(
+        key_column == key,
+        table.granularity == granularity,
+        table.bucket_start >= first,
+        table.bucket_start <= last
+    ).all()
+    by_start = {_as_utc(row.bucket_start): row for row in rows}
+
+    series = []
+    for index in range(buckets):
+        start = first + step * index
+        row = by_start.get(start)
+        attempts = row.attempts if row else 0
+        corrects = row.corrects if row else 0
+        delay_sum = row.delay_sum if row else 0.0
+        series.append({
+            "bucket": start.astimezone(KST).strftime("%Y-%m-%d %H:%M" if granularity == "hour" else "%Y-%m-%d"),
+            "attempts": attempts,
+            "corrects": corrects,
+            "correct_rate": round(corrects / attempts * 100, 2) if attempts else 0,
+            "average_time": round(delay_sum / attempts, 2) if attempts else 0
+        })
+    return series
+
+def question_chart(db: Session, question_id: int, granularity: str, buckets: int) -> List[dict]:
+    return chart_series(db, QuestionStatBucketDB, QuestionStatBucketDB.question_id, question_id, granularity, buckets)
+
+def user_chart(db: Session, google_id: str, granularity: str, buckets: int) -> List[dict]:
+    return chart_series(db, UserStatBucketDB, UserStatBucketDB.google_id, google_id, granularity, buckets)
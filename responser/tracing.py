@@ -0,0 +1,44 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+import os
+import time
+
+# 응답에 Server-Timing 헤더를 붙일지 여부
+SERVER_TIMING_ENABLED = os.environ.get("SERVER_TIMING", "false").lower() in ("1", "true", "yes")
+
+# 현재 요청의 단계별 누적 소요 시간 (초). 요청 밖에서는 None입니다.
+_stages: ContextVar[Optional[Dict[str, float]]] = ContextVar("narat_request_stages", default=None)
+
+def begin_request():
+    """요청 단위 단계 기록을 시작합니다. 반환된 토큰은 end_request에 넘깁니다."""
+    return _stages.set({})
+
+def end_request(token) -> Dict[str, float]:
+    """요청 단위 단계 기록을 끝내고 기록된 단계별 시간을 반환합니다."""
+    stages = _stages.get() or {}
+    _stages.reset(token)
+    return stages
+
+def current_stages() -> Dict[str, float]:
+    return _stages.get() or {}
+
+@contextmanager
+def stage(name: str):
+    """
+    with 블록의 소요 시간을 현재 요청의 name 단계에 누적합니다.
+    같은 이름의 단계가 여러 번 실행되면 합산됩니다. 요청 밖에서는 아무것도 기록하지 않습니다.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages = _stages.get()
+        if stages is not None:
+            stages[name] = stages.get(name, 0.0) + (time.perf_counter() - started)
+
+def server_timing_header(stages: Dict[str, float], total: float) -> str:
+    """단계별 시간을 Server-Timing 헤더 값으로 변환합니다 (밀리초 단위)."""
+    parts = [f"{name};dur={duration * 1000:.2f}" for name, duration in stages.items()]
+    parts.append(f"app;dur={total * 1000:.2f}")
+    return ", ".join(parts)
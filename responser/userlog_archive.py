@@ -0,0 +1,64 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from models.models import CategoryDB, QuestionDB, UserLogArchiveDB, UserLogSummaryDB
+from responser.cache import register_cache
+from typing import Dict, Optional, Tuple
+import datetime
+
+# 분리된 userlogs 파티션이 끝나는 시각 (unix time, 없으면 0). 이 시각 이전의 기록은 userlog_summaries에만 있습니다
+_archived_until_cache = register_cache("userlog_archived_until", l1_ttl=300, l2_ttl=300)
+
+def _load_archived_until(db: Session) -> float:
+    value = db.query(func.max(UserLogArchiveDB.range_end)).filter(UserLogArchiveDB.detached_at.isnot(None)).scalar()
+    if value is None:
+        return 0
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value.timestamp()
+
+def archived_until(db: Session) -> Optional[datetime.datetime]:
+    """분리된 파티션이 덮는 마지막 시각. 분리된 파티션이 없으면 None입니다."""
+    value = _archived_until_cache.get("current", lambda: _load_archived_until(db))
+    if not value:
+        return None
+    return datetime.datetime.fromtimestamp(value, datetime.timezone.utc)
+
+def invalidate_archived_until():
+    """파티션을 분리한 뒤 호출하면 모든 워커가 다음 요청에서 경계를 다시 읽습니다."""
+    _archived_until_cache.invalidate("current")
+
+def _archived_summaries(db: Session, google_id: str, *columns):
+    until = archived_until(db)
+    if until is None:
+        return None
+    return db.query(*columns).filter(
+        UserLogSummaryDB.google_id == google_id,
+        UserLogSummaryDB.month < until
+    )
+
+def archived_time_totals(db: Session, google_id: str) -> Tuple[int, float]:
+    """분리된 기간의 (풀이 수, 풀이 시간 합)"""
+    query = _archived_summaries(
+        db, google_id,
+        func.coalesce(func.sum(UserLogSummaryDB.attempts), 0),
+        func.coalesce(func.sum(UserLogSummaryDB.delay_sum), 0.0)
+    )
+    if query is None:
+        return 0, 0.0
+    attempts, delay_sum = query.one()
+    return int(attempts), float(delay_sum)
+
+def archived_accuracy(db: Session, google_id: str, key) -> Dict[object, Tuple[int, int]]:
+    """분리된 기간의 key(카테고리 이름, 난이도 등)별 (풀이 수, 정답 수)"""
+    query = _archived_summaries(
+        db, google_id,
+        key,
+        func.sum(UserLogSummaryDB.attempts),
+        func.sum(UserLogSummaryDB.corrects)
+    )
+    if query is None:
+        return {}
+    query = query.join(QuestionDB, QuestionDB.question_id == UserLogSummaryDB.question_id)
+    if key.class_ is CategoryDB:
+        query = query.join(CategoryDB, CategoryDB.category_id == QuestionDB.category_id)
+    return {value: (int(total), int(correct or 0)) for value, total, correct in query.group_by(key)}
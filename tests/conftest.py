@@ -0,0 +1,51 @@
+import os
+import sys
+import tempfile
+
+# 앱 모듈을 불러오기 전에 임시 SQLite DB와 로그 파일을 사용하도록 설정합니다
+_tmpdir = tempfile.mkdtemp(prefix="narat-test-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'test.db')}"
+os.environ["LOG_FILE"] = os.path.join(_tmpdir, "narat.log")
+os.environ["INFERENCE_WORKERS"] = "0"
+os.environ.pop("SESSION_SECRET", None)
+os.environ.pop("CACHE_URL", None)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import datetime
+import pytest
+from fastapi.testclient import TestClient
+
+@pytest.fixture(scope="session")
+def app():
+    from main import app
+    from database import SessionLocal
+    from models.models import CategoryDB, QuestionDB, SessionDB, UserDB
+    from responser.sessions import SESSION_TTL
+
+    db = SessionLocal()
+    db.add_all([CategoryDB(category_id=i, name=f"category {i}", description="") for i in range(3)])
+    db.add_all([
+        QuestionDB(
+            question_id=i, category_id=i % 3, wrong_sentence=f"wrong {i}", right_sentence=f"right {i}",
+            wrong_word=f"w{i}", right_word=f"r{i}", difficulty_level=i % 5 + 1, explanation=f"explanation {i}"
+        )
+        for i in range(1, 31)
+    ])
+    db.add(UserDB(google_id="test-user", email="test@example.com", display_name="test"))
+    # 만료 시각을 연장하지 않도록 방금 만든 세션으로 둡니다
+    db.add(SessionDB(
+        session_id="test-session", google_id="test-user",
+        expires_at=datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=SESSION_TTL)
+    ))
+    db.commit()
+    db.close()
+    return app
+
+@pytest.fixture
+def client(app):
+    from responser.cache import MemoryBackend, reset_backend
+
+    # 테스트마다 빈 캐시에서 시작합니다
+    reset_backend(MemoryBackend())
+    return TestClient(app)
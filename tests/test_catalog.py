@@ -0,0 +1,25 @@
+"""카탈로그 버전과 텍스트 버전"""
+import datetime
+
+from database import SessionLocal
+from models.models import QuestionDB
+from responser.catalog import compute_catalog_version, compute_text_version
+
+def test_text_version_ignores_stats_updates(app):
+    db = SessionLocal()
+    try:
+        catalog_version, text_version = compute_catalog_version(db), compute_text_version(db)
+        question = db.query(QuestionDB).filter(QuestionDB.question_id == 1).one()
+        # jobs/rollup_stats.py처럼 풀이 통계만 갱신
+        question.total_attempts = (question.total_attempts or 0) + 1
+        question.stats_updated_at = datetime.datetime.now(datetime.timezone.utc)
+        db.commit()
+        assert compute_catalog_version(db) != catalog_version
+        assert compute_text_version(db) == text_version
+
+        question.explanation = question.explanation + " (수정)"
+        db.commit()
+        assert compute_text_version(db) != text_version
+    finally:
+        db.rollback()
+        db.close()
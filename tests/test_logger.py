@@ -0,0 +1,26 @@
+"""큐 로그 핸들러와 로그 마스킹"""
+import json
+import logging
+import queue
+import sys
+
+from responser.logger import DroppingQueueHandler, JsonFormatter, redact_query
+
+def test_queued_record_keeps_traceback():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        record = logging.getLogger("narat.test").makeRecord(
+            "narat.test", logging.ERROR, __file__, 0, "실패 %s", (1,), sys.exc_info()
+        )
+    prepared = handler.prepare(record)
+    assert prepared.exc_info is None
+    output = JsonFormatter().format(prepared)
+    data = json.loads(output)
+    assert data["message"] == "실패 1"
+    assert "ZeroDivisionError" in data["exc_info"]
+
+def test_redact_query_masks_sensitive_params():
+    assert redact_query("session_token=abc&limit=3") == "session_token=***&limit=3"
+    assert redact_query("mytoken=1") == "mytoken=1"
@@ -0,0 +1,20 @@
+"""엔드포인트별 쿼리 수를 고정해 N+1 패턴이 다시 생기지 않게 합니다."""
+from responser.query_stats import assert_query_count
+
+def test_categories_cold_cache(client):
+    # 카탈로그 버전 계산 2번 + 문제 수를 조인한 카테고리 목록 1번
+    response = assert_query_count(client, "GET", "/api/categories/", 3)
+    assert response.status_code == 200
+    assert len(response.json()["categories"]) == 3
+
+def test_categories_warm_cache(client):
+    client.get("/api/categories/")
+    # 카탈로그 버전은 캐시에서 읽고 카테고리 수와 관계없이 쿼리 1번입니다
+    assert_query_count(client, "GET", "/api/categories/", 1)
+
+def test_verify_session(client):
+    # 세션 조회 1번 + 사용자 조회 1번 (session_owner 지연 로드 없음)
+    response = assert_query_count(client, "POST", "/api/auth/verify", 2, json={"session_token": "test-session"})
+    assert response.json()["is_valid"] is True
+    # 세션은 캐시에서 읽습니다
+    assert_query_count(client, "POST", "/api/auth/verify", 1, json={"session_token": "test-session"})
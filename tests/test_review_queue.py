@@ -0,0 +1,36 @@
+"""복습 목록 응답"""
+import datetime
+
+from database import SessionLocal
+from models.models import QuestionDB, ReviewStateDB
+
+def test_review_queue_skips_inactive_questions(client):
+    for question_id in (10, 11, 12):
+        response = client.post("/api/study/submit", json={
+            "session_token": "test-session", "question_id": question_id, "correct": False, "delaytime": 3.0
+        })
+        assert response.status_code == 200
+
+    db = SessionLocal()
+    try:
+        # 오래 기다린 순서가 10, 11, 12가 되도록 복습 시각을 과거로 옮기고 11번을 비활성화합니다
+        past = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(hours=1)
+        for offset, question_id in enumerate((10, 11, 12)):
+            db.query(ReviewStateDB).filter(
+                ReviewStateDB.google_id == "test-user", ReviewStateDB.question_id == question_id
+            ).update({"due_at": past + datetime.timedelta(minutes=offset)})
+        db.query(QuestionDB).filter(QuestionDB.question_id == 11).update({"is_active": False})
+        db.commit()
+
+        body = client.post("/api/study/review-queue", json={"session_token": "test-session"}).json()
+        assert [entry["question"]["question_id"] for entry in body["review_queue"]] == [10, 12]
+        assert body["due_count"] == 2
+        # 각 문제의 복습 일정이 그 문제와 함께 나옵니다
+        assert datetime.datetime.fromisoformat(body["review_queue"][1]["due_at"]).minute == (
+            past + datetime.timedelta(minutes=2)
+        ).minute
+    finally:
+        db.query(QuestionDB).filter(QuestionDB.question_id == 11).update({"is_active": True})
+        db.query(ReviewStateDB).filter(ReviewStateDB.google_id == "test-user").delete()
+        db.commit()
+        db.close()